@@ -1,73 +1,132 @@
-from lox.runtime_error import LoxRuntimeError
-import sys
-from typing import Union
-
-from lox.ast.printer import AstPrinter
-from lox.scanner import Scanner
-from lox.parser import Parser
-from lox.token import Token
-from lox.token_type import TokenType
-from lox.interpreter import Interpreter
-
-LOX_VERSION = "0.1.0"
-
-s_had_error = False
-s_had_runtime_error = False
-
-interpreter = Interpreter()
-
-
-def report(line: int, where: str, message: str) -> None:
-    print(f"[line {line}] Error{where}: {message}", file=sys.stderr)
-    global s_had_error
-    s_had_error = True
-
-
-def error(location: Union[int, Token], message: str) -> None:
-    if isinstance(location, int):
-        report(location, "", message)
-    elif isinstance(location, Token):
-        if location.type == TokenType.EOF:
-            report(location.line, " at end", message)
-        else:
-            report(location.line, f" at '{location.lexeme}'", message)
-
-
-def runtime_error(err: LoxRuntimeError):
-    print(f"{err}\n[line {err.token.line}]", file=sys.stderr)
-
-
-def run(source: str) -> None:
-    scanner = Scanner(source)
-    tokens = scanner.scan_tokens()
-    parser = Parser(tokens)
-    expr = parser.parse()
-
-    if s_had_error:
-        return
-
-    interpreter.interpret(expr)
-
-
-def run_file(file_name: str) -> None:
-    with open(file_name) as source_file:
-        contents = source_file.read()
-    run(contents)
-    if s_had_error:
-        exit(65)
-    if s_had_runtime_error:
-        exit(70)
-
-
-def run_prompt() -> None:
-    print(f"lox.py, version {LOX_VERSION}.")
-    while True:
-        try:
-            line = input("> ")
-        except EOFError:
-            break
-        run(line)
-
-        # Ignore errors in REPL.
-        global s_had_error
-        s_had_error = False
+from importlib import import_module
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+if TYPE_CHECKING:
+    from lox.ast import Expression
+    from lox.cache import CompileCache
+    from lox.runtime_error import LoxRuntimeError
+    from lox.session import LoxSession
+    from lox.token import Token
+
+LOX_VERSION = "0.1.0"
+
+s_had_error = False
+s_had_runtime_error = False
+
+# Importing the package does no work of its own: these names are imported
+# from their modules the first time they are used, so a script only pays
+# for the parts of the pipeline it runs.
+LAZY_ATTRIBUTES = {
+    "AstPrinter": "lox.ast.printer",
+    "BACKENDS": "lox.session",
+    "CompileCache": "lox.cache",
+    "Compiler": "lox.compiler",
+    "Diagnostics": "lox.diagnostics",
+    "Expression": "lox.ast",
+    "GLOBAL_DIAGNOSTICS": "lox.diagnostics",
+    "IncrementalDocument": "lox.incremental",
+    "Interpreter": "lox.interpreter",
+    "LoxRuntimeError": "lox.runtime_error",
+    "LoxSession": "lox.session",
+    "Optimizer": "lox.optimizer",
+    "Parser": "lox.parser",
+    "RegexScanner": "lox.regex_scanner",
+    "Scanner": "lox.scanner",
+    "Token": "lox.token",
+    "TokenType": "lox.token_type",
+    "VM": "lox.vm",
+    "minify": "lox.emitter",
+    "minify_source": "lox.emitter",
+    "prettify": "lox.emitter",
+    "prettify_source": "lox.emitter",
+    "run_lines": "lox.lines",
+    "stream_tokens": "lox.regex_scanner",
+}
+
+# Backends of the default session, also created on first use.
+SESSION_ATTRIBUTES = ("interpreter", "closure_interpreter", "vm", "optimizer")
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        value = getattr(import_module(LAZY_ATTRIBUTES[name]), name)
+    elif name == "default_session":
+        value = _default_session()
+    elif name in SESSION_ATTRIBUTES:
+        value = getattr(_default_session(), name)
+    else:
+        raise AttributeError(f"module 'lox' has no attribute '{name}'")
+    globals()[name] = value
+    return value
+
+
+def _default_session() -> "LoxSession":
+    # The module-level functions share this session, which reports through
+    # the s_had_error/s_had_runtime_error globals above. Use a LoxSession of
+    # your own to run several programs concurrently.
+    session = globals().get("default_session")
+    if session is None:
+        from lox.diagnostics import GLOBAL_DIAGNOSTICS
+        from lox.session import LoxSession
+        session = LoxSession(diagnostics=GLOBAL_DIAGNOSTICS)
+        globals()["default_session"] = session
+    return session
+
+
+def report(line: int, where: str, message: str) -> None:
+    from lox.diagnostics import GLOBAL_DIAGNOSTICS
+    GLOBAL_DIAGNOSTICS.report(line, where, message)
+
+
+def error(location: Union[int, "Token"], message: str) -> None:
+    from lox.diagnostics import GLOBAL_DIAGNOSTICS
+    GLOBAL_DIAGNOSTICS.error(location, message)
+
+
+def runtime_error(err: "LoxRuntimeError"):
+    from lox.diagnostics import GLOBAL_DIAGNOSTICS
+    GLOBAL_DIAGNOSTICS.runtime_error(err)
+
+
+def run(source: str, backend: str = "tree", optimize: bool = False) -> None:
+    _default_session().run(source, backend, optimize)
+
+
+def run_tokens(tokens: Iterable["Token"],
+               backend: str = "tree",
+               optimize: bool = False) -> None:
+    _default_session().run_tokens(tokens, backend, optimize)
+
+
+def parse_tokens(tokens: Iterable["Token"],
+                 optimize: bool = False) -> Optional["Expression"]:
+    return _default_session().parse_tokens(tokens, optimize)
+
+
+def evaluate(expr: "Expression", backend: str = "tree") -> None:
+    _default_session().evaluate(expr, backend)
+
+
+def run_file(file_name: str,
+             backend: str = "tree",
+             optimize: bool = False,
+             cache: Optional["CompileCache"] = None) -> None:
+    exit_code = _default_session().run_file(file_name, backend, optimize,
+                                            cache)
+    if exit_code:
+        exit(exit_code)
+
+
+def run_prompt(backend: str = "tree", optimize: bool = False) -> None:
+    print(f"lox.py, version {LOX_VERSION}.")
+    while True:
+        try:
+            line = input("> ")
+        except EOFError:
+            break
+        run(line, backend, optimize)
+
+        # Ignore errors in REPL.
+        global s_had_error, s_had_runtime_error
+        s_had_error = False
+        s_had_runtime_error = False
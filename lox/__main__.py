@@ -1,11 +1,163 @@
-from lox.interpreter import Interpreter
-import sys
-from lox import run_file, run_prompt
-
-if len(sys.argv) > 2:
-    print("Usage: lox.py [script]")
-    exit(64)
-elif len(sys.argv) == 2:
-    run_file(sys.argv[1])
-else:
-    run_prompt()
\ No newline at end of file
+import argparse
+import sys
+
+from lox import BACKENDS, default_session, run_file, run_prompt
+
+
+class ArgumentParser(argparse.ArgumentParser):
+
+    def error(self, message: str):
+        self.print_usage(sys.stderr)
+        print(f"{self.prog}: error: {message}", file=sys.stderr)
+        exit(64)
+
+
+def positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+if sys.argv[1:2] == ["serve"]:
+    from lox import server
+    server.main(sys.argv[2:], ArgumentParser(prog="lox.py serve"))
+    exit(0)
+
+parser = ArgumentParser(prog="lox.py")
+parser.add_argument("scripts", nargs="*", metavar="script")
+parser.add_argument("--manifest",
+                    action="append",
+                    default=[],
+                    help="file listing more scripts to run, one per line")
+parser.add_argument("-j",
+                    "--jobs",
+                    type=positive_int,
+                    help="worker processes for running several scripts")
+parser.add_argument("--backend", choices=BACKENDS, default="tree")
+parser.add_argument("-O", "--optimize", action="store_true")
+parser.add_argument("--cache",
+                    action="store_true",
+                    help="reuse parsed scripts from a __loxcache__ directory")
+parser.add_argument("--cache-dir", help="store cached scripts here instead")
+parser.add_argument("--profile",
+                    action="store_true",
+                    help="print evaluation time per node type to stderr")
+parser.add_argument("--profile-collapsed",
+                    metavar="FILE",
+                    help="write profiled stacks in collapsed format to FILE")
+parser.add_argument("--telemetry",
+                    metavar="FILE",
+                    help="append per-phase timings and memory use to FILE "
+                    "as JSON lines ('-' for stderr)")
+parser.add_argument("--each-line",
+                    action="store_true",
+                    help="evaluate every line of the script on its own")
+parser.add_argument("--format",
+                    choices=("text", "json"),
+                    default="text",
+                    help="how --each-line writes results and errors")
+parser.add_argument("--stats",
+                    action="store_true",
+                    help="print --each-line throughput to stderr")
+args = parser.parse_args()
+
+# Modules only some runs need are imported in the branches that use them,
+# so that running a single script starts quickly.
+scripts = list(args.scripts)
+if args.manifest:
+    from lox.batch import read_manifest
+    for manifest in args.manifest:
+        scripts += read_manifest(manifest)
+
+cache = None
+if args.cache_dir is not None:
+    from lox.cache import CompileCache
+    cache = CompileCache(args.cache_dir)
+
+profile = args.profile or args.profile_collapsed is not None
+if profile and (len(scripts) != 1 or args.manifest):
+    parser.error("profiling needs exactly one script")
+if profile and args.backend != "tree":
+    parser.error("profiling only supports the tree backend")
+if args.each_line and (len(scripts) != 1 or args.manifest):
+    parser.error("--each-line needs exactly one script ('-' for stdin)")
+if args.each_line and (profile or args.telemetry is not None
+                       or args.cache or cache is not None):
+    parser.error("--each-line cannot be combined with profiling, "
+                 "telemetry or caching")
+if args.telemetry is not None and (len(scripts) > 1 or args.manifest):
+    parser.error("telemetry needs at most one script")
+
+if args.each_line:
+    from lox.lines import run_lines
+    output = sys.stdout
+    if not sys.stdout.isatty():
+        from lox.output import FLUSH_INTERVAL, BufferedOutput
+        sys.stdout.flush()
+        # Lines on stdin may trickle in, so each result is flushed as soon
+        # as it is written rather than on the next write.
+        output = BufferedOutput(
+            sys.stdout.buffer,
+            flush_interval=0 if scripts[0] == "-" else FLUSH_INTERVAL)
+    try:
+        lines = sys.stdin if scripts[0] == "-" else open(scripts[0])
+    except OSError as e:
+        print(f"lox.py: {e}", file=sys.stderr)
+        exit(66)
+    with lines:
+        statistics = run_lines(lines, output, args.backend, args.optimize,
+                               args.format)
+    output.flush()
+    if args.stats:
+        print(f"{statistics.lines} lines, {statistics.results} results, "
+              f"{statistics.errors + statistics.runtime_errors} errors "
+              f"in {statistics.seconds:.3f} s "
+              f"({statistics.lines_per_second:,.0f} lines/s)",
+              file=sys.stderr)
+    exit(statistics.exit_code)
+elif len(scripts) > 1 or args.manifest:
+    from lox.batch import run_batch
+    exit(
+        run_batch(scripts, args.jobs, args.backend, args.optimize, cache,
+                  args.cache))
+else:
+    from contextlib import ExitStack
+    with ExitStack() as resources:
+        if args.telemetry is not None:
+            from lox.telemetry import Telemetry, json_lines_sink
+            telemetry_stream = (sys.stderr if args.telemetry == "-" else
+                                resources.enter_context(
+                                    open(args.telemetry, "a")))
+            default_session.telemetry = Telemetry(
+                json_lines_sink(telemetry_stream))
+        if scripts:
+            if cache is None and args.cache:
+                from lox.cache import CompileCache, cache_dir_for
+                cache = CompileCache(cache_dir_for(scripts[0]))
+            if profile:
+                from lox.profiler import ProfilingInterpreter
+                interpreter = ProfilingInterpreter(
+                    environment=default_session.environment,
+                    diagnostics=default_session.diagnostics)
+                default_session.interpreter = interpreter
+            if not sys.stdout.isatty():
+                from lox.output import BufferedOutput
+                # Results are batched into large writes, flushed at exit at the
+                # latest; a terminal still sees each result as it comes.
+                sys.stdout.flush()
+                default_session.output = BufferedOutput(sys.stdout.buffer)
+            if profile:
+                exit_code = default_session.run_file(scripts[0], args.backend,
+                                                     args.optimize, cache)
+                if default_session.output is not None:
+                    default_session.output.flush()
+                if args.profile:
+                    interpreter.profile.print_table(sys.stderr)
+                if args.profile_collapsed is not None:
+                    with open(args.profile_collapsed, "w") as collapsed:
+                        interpreter.profile.write_collapsed(collapsed)
+                exit(exit_code)
+            run_file(scripts[0], args.backend, args.optimize, cache)
+        else:
+            run_prompt(args.backend, args.optimize)
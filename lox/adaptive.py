@@ -0,0 +1,232 @@
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression
+from lox.interpreter import Interpreter
+from lox.object import divide, is_truthy
+from lox.token_type import TokenType
+
+# Evaluations with the same operand types before a node is specialized.
+SPECIALIZE_AFTER = 2
+FEEDBACK_SIZE = 4096
+
+
+def _same_fields(expr: Expression, other: object, base: type) -> object:
+    if not isinstance(other, base):
+        return NotImplemented
+    return all(
+        getattr(expr, name) == getattr(other, name)
+        for name in base.__slots__)
+
+
+class SpecializedBinaryExpression(BinaryExpression):
+    """A BinaryExpression rewritten for the operand types it has seen.
+
+    Both operands must be exactly `guard` (anything, if it is None) for
+    `operation` to apply; otherwise the node falls back to the generic path.
+    Rewritten nodes still compare equal to the node they started as.
+    """
+    __slots__ = ()
+    guard: Optional[type] = None
+    operation: Callable[[Any, Any], object]
+
+    def __eq__(self, other: object) -> object:
+        return _same_fields(self, other, BinaryExpression)
+
+
+class GenericBinaryExpression(BinaryExpression):
+    """A BinaryExpression that saw mixed types and is no longer specialized."""
+    __slots__ = ()
+
+    def __eq__(self, other: object) -> object:
+        return _same_fields(self, other, BinaryExpression)
+
+
+class SpecializedUnaryExpression(UnaryExpression):
+    __slots__ = ()
+    guard: Optional[type] = None
+    operation: Callable[[Any], object]
+
+    def __eq__(self, other: object) -> object:
+        return _same_fields(self, other, UnaryExpression)
+
+
+class GenericUnaryExpression(UnaryExpression):
+    __slots__ = ()
+
+    def __eq__(self, other: object) -> object:
+        return _same_fields(self, other, UnaryExpression)
+
+
+def _specialization(base: type, name: str, guard: Optional[type],
+                    operation: Callable) -> type:
+    return type(name, (base, ), {
+        "__slots__": (),
+        "guard": guard,
+        "operation": staticmethod(operation),
+    })
+
+
+Specializations = Dict[Tuple[TokenType, Optional[type]], type]
+
+BINARY_SPECIALIZATIONS: Specializations = {
+    (token_type, guard):
+    _specialization(SpecializedBinaryExpression, name, guard, operation)
+    for token_type, guard, name, operation in (
+        (TokenType.PLUS, float, "FloatAddExpression", operator.add),
+        (TokenType.MINUS, float, "FloatSubtractExpression", operator.sub),
+        (TokenType.STAR, float, "FloatMultiplyExpression", operator.mul),
+        (TokenType.SLASH, float, "FloatDivideExpression", divide),
+        (TokenType.GREATER, float, "FloatGreaterExpression", operator.gt),
+        (TokenType.GREATER_EQUAL, float, "FloatGreaterEqualExpression",
+         operator.ge),
+        (TokenType.LESS, float, "FloatLessExpression", operator.lt),
+        (TokenType.LESS_EQUAL, float, "FloatLessEqualExpression",
+         operator.le),
+        (TokenType.PLUS, str, "StringConcatExpression", operator.add),
+        # Equality never fails, so it needs no guard.
+        (TokenType.EQUAL_EQUAL, None, "EqualExpression", operator.eq),
+        (TokenType.BANG_EQUAL, None, "NotEqualExpression", operator.ne),
+    )
+}
+
+UNARY_SPECIALIZATIONS: Specializations = {
+    (token_type, guard):
+    _specialization(SpecializedUnaryExpression, name, guard, operation)
+    for token_type, guard, name, operation in (
+        (TokenType.MINUS, float, "FloatNegateExpression", operator.neg),
+        (TokenType.BANG, None, "NotExpression",
+         lambda value: not is_truthy(value)),
+    )
+}
+
+
+class AdaptiveInterpreter(Interpreter):
+    """A tree-walking Interpreter that specializes nodes as it runs.
+
+    Plain binary and unary nodes record the operand types they see. Once a
+    node has seen the same types SPECIALIZE_AFTER times in a row, its class
+    is rewritten to a specialized subclass that skips the operator dispatch
+    and type checks. A specialized node whose guard fails becomes generic
+    for good. The apply method for each node class is cached as well.
+    """
+    specializations: int
+    deoptimizations: int
+    _feedback: Dict[int, Tuple[Expression, Tuple[type, ...], int]]
+    _methods: Dict[type, Callable[..., object]]
+
+    def __init__(self, **kwargs):
+        kwargs["closures"] = False
+        super().__init__(**kwargs)
+        self.specializations = 0
+        self.deoptimizations = 0
+        self._feedback = {}
+        self._methods = {}
+
+    def _apply_BinaryExpression(self, expr: BinaryExpression, left: object,
+                                right: object) -> object:
+        if expr.__class__ is BinaryExpression:
+            observed = (type(left), type(right))
+            guard = observed[0] if observed[0] is observed[1] else None
+            self._observe(expr, observed, guard, BINARY_SPECIALIZATIONS,
+                          GenericBinaryExpression)
+        return self._binary(expr.operator, left, right)
+
+    def _apply_UnaryExpression(self, expr: UnaryExpression,
+                               right: object) -> object:
+        if expr.__class__ is UnaryExpression:
+            self._observe(expr, (type(right), ), type(right),
+                          UNARY_SPECIALIZATIONS, GenericUnaryExpression)
+        return self._unary(expr.operator, right)
+
+    def _apply_SpecializedBinaryExpression(self,
+                                           expr: SpecializedBinaryExpression,
+                                           left: object,
+                                           right: object) -> object:
+        guard = expr.guard
+        if guard is None or (type(left) is guard and type(right) is guard):
+            return expr.operation(left, right)
+        self.deoptimizations += 1
+        expr.__class__ = GenericBinaryExpression
+        return self._binary(expr.operator, left, right)
+
+    def _apply_SpecializedUnaryExpression(self,
+                                          expr: SpecializedUnaryExpression,
+                                          right: object) -> object:
+        guard = expr.guard
+        if guard is None or type(right) is guard:
+            return expr.operation(right)
+        self.deoptimizations += 1
+        expr.__class__ = GenericUnaryExpression
+        return self._unary(expr.operator, right)
+
+    def _apply_GenericBinaryExpression(self, expr: BinaryExpression,
+                                       left: object, right: object) -> object:
+        return self._binary(expr.operator, left, right)
+
+    def _apply_GenericUnaryExpression(self, expr: UnaryExpression,
+                                      right: object) -> object:
+        return self._unary(expr.operator, right)
+
+    def _observe(self, expr: Any, observed: Tuple[type, ...],
+                 guard: Optional[type], specializations: Specializations,
+                 generic: type) -> None:
+        # Nodes are unhashable, so feedback is kept by identity, holding on
+        # to the node so that its id cannot be reused.
+        entry = self._feedback.get(id(expr))
+        count = 1
+        if entry is not None and entry[0] is expr and entry[1] == observed:
+            count = entry[2] + 1
+        if count < SPECIALIZE_AFTER:
+            if len(self._feedback) >= FEEDBACK_SIZE:
+                self._feedback.clear()
+            self._feedback[id(expr)] = (expr, observed, count)
+            return
+
+        self._feedback.pop(id(expr), None)
+        specialized = specializations.get((expr.operator.type, guard))
+        if specialized is None:
+            specialized = specializations.get((expr.operator.type, None),
+                                              generic)
+        if specialized is not generic:
+            self.specializations += 1
+        expr.__class__ = specialized
+
+    def _evaluate(self, expr: Expression) -> object:
+        # The same post-order walk as Interpreter._evaluate, except that a
+        # finished operator node goes through the apply method of its
+        # current class, which may rewrite that class.
+        values: List[object] = []
+        pending: List[Optional[Expression]] = [expr]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                node = pending.pop()
+                try:
+                    apply = self._methods[node.__class__]
+                except KeyError:
+                    apply = self._resolve(node.__class__)
+                if isinstance(node, BinaryExpression):
+                    right = values.pop()
+                    values[-1] = apply(node, values[-1], right)
+                else:
+                    values[-1] = apply(node, values[-1])
+            elif isinstance(node, LiteralExpression):
+                values.append(node.value)
+            elif isinstance(node, BinaryExpression):
+                pending.extend((node, None, node.right, node.left))
+            elif isinstance(node, GroupingExpression):
+                pending.append(node.expression)
+            elif isinstance(node, UnaryExpression):
+                pending.extend((node, None, node.right))
+            else:
+                values.append(self.visit(node))
+        return values[0]
+
+    def _resolve(self, cls: type) -> Callable[..., object]:
+        for base in cls.__mro__:
+            method = getattr(self, f"_apply_{base.__name__}", None)
+            if method is not None:
+                self._methods[cls] = method
+                return method
+        raise NotImplementedError(f"cannot apply {cls.__name__}")
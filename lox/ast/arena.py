@@ -0,0 +1,194 @@
+from array import array
+from enum import IntEnum
+from typing import Any, Dict, List, Tuple
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+from lox.ast.factory import NodeFactory
+from lox.syntax_facts import KIND_TEXTS
+from lox.token import Token
+from lox.token_buffer import TOKEN_TYPES
+from lox.token_type import TokenType
+
+NO_NODE = -1
+
+
+class NodeKind(IntEnum):
+    BINARY = 0
+    GROUPING = 1
+    LITERAL = 2
+    UNARY = 3
+    VARIABLE = 4
+
+
+class AstArena(NodeFactory):
+    """Stores expression nodes in parallel arrays, addressed by index.
+
+    Binary nodes use `lefts` and `rights`, groupings use `lefts` and
+    unary nodes use `rights`. Literal values and variable names live once
+    each in `literals` and are referenced through `literal_indices`. Use `node` to get a
+    slotted view that behaves like the regular expression classes.
+    """
+    kinds: array
+    operators: array
+    lefts: array
+    rights: array
+    literal_indices: array
+    lines: array
+    literals: List[Any]
+    _literal_pool: Dict[Tuple[type, Any], int]
+
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.operators = array("B")
+        self.lefts = array("i")
+        self.rights = array("i")
+        self.literal_indices = array("i")
+        self.lines = array("I")
+        self.literals = []
+        self._literal_pool = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def node(self, index: int) -> Expression:
+        return VIEWS[self.kinds[index]](self, index)
+
+    def operator(self, index: int) -> Token:
+        kind = self.operators[index]
+        return Token(TOKEN_TYPES[kind], KIND_TEXTS[kind], None,
+                     self.lines[index])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            buffer.itemsize * len(buffer)
+            for buffer in (self.kinds, self.operators, self.lefts,
+                           self.rights, self.literal_indices, self.lines))
+
+    def binary(self, left: int, operator: Token, right: int) -> int:
+        return self._add(NodeKind.BINARY, operator, left, right, NO_NODE)
+
+    def grouping(self, expression: int) -> int:
+        return self._add(NodeKind.GROUPING, None, expression, NO_NODE,
+                         NO_NODE)
+
+    def literal(self, value: Any) -> int:
+        return self._add(NodeKind.LITERAL, None, NO_NODE, NO_NODE,
+                         self._pool(value))
+
+    def unary(self, operator: Token, right: int) -> int:
+        return self._add(NodeKind.UNARY, operator, NO_NODE, right, NO_NODE)
+
+    def variable(self, name: Token) -> int:
+        return self._add(NodeKind.VARIABLE, name, NO_NODE, NO_NODE,
+                         self._pool(name.lexeme))
+
+    def finish(self, root: int) -> Expression:
+        return self.node(root)
+
+    def _pool(self, value: Any) -> int:
+        # Key on the type too, since 1.0 == True would share a slot.
+        key = (type(value), value)
+        try:
+            return self._literal_pool[key]
+        except KeyError:
+            self.literals.append(value)
+            self._literal_pool[key] = len(self.literals) - 1
+            return len(self.literals) - 1
+
+    def _add(self, kind: NodeKind, operator: Any, left: int, right: int,
+             literal_index: int) -> int:
+        self.kinds.append(kind)
+        if operator is None:
+            self.operators.append(0)
+            self.lines.append(0)
+        else:
+            self.operators.append(operator.type.value)
+            self.lines.append(operator.line)
+        self.lefts.append(left)
+        self.rights.append(right)
+        self.literal_indices.append(literal_index)
+        return len(self.kinds) - 1
+
+
+class ArenaBinaryExpression(BinaryExpression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: AstArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def left(self) -> Expression:
+        return self.arena.node(self.arena.lefts[self.index])
+
+    @property
+    def operator(self) -> Token:
+        return self.arena.operator(self.index)
+
+    @property
+    def right(self) -> Expression:
+        return self.arena.node(self.arena.rights[self.index])
+
+
+class ArenaGroupingExpression(GroupingExpression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: AstArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def expression(self) -> Expression:
+        return self.arena.node(self.arena.lefts[self.index])
+
+
+class ArenaLiteralExpression(LiteralExpression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: AstArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def value(self) -> Any:
+        return self.arena.literals[self.arena.literal_indices[self.index]]
+
+
+class ArenaUnaryExpression(UnaryExpression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: AstArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def operator(self) -> Token:
+        return self.arena.operator(self.index)
+
+    @property
+    def right(self) -> Expression:
+        return self.arena.node(self.arena.rights[self.index])
+
+
+class ArenaVariableExpression(VariableExpression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: AstArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def name(self) -> Token:
+        name = self.arena.literals[self.arena.literal_indices[self.index]]
+        return Token(TokenType.IDENTIFIER, name, None,
+                     self.arena.lines[self.index])
+
+
+VIEWS = {
+    NodeKind.BINARY: ArenaBinaryExpression,
+    NodeKind.GROUPING: ArenaGroupingExpression,
+    NodeKind.LITERAL: ArenaLiteralExpression,
+    NodeKind.UNARY: ArenaUnaryExpression,
+    NodeKind.VARIABLE: ArenaVariableExpression,
+}
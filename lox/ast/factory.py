@@ -0,0 +1,30 @@
+from typing import Any
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+from lox.token import Token
+
+
+class NodeFactory:
+    """Builds the nodes for Parser.
+
+    Subclasses can return any handle they like from the node methods, as
+    long as `finish` turns the root handle back into an Expression.
+    """
+
+    def binary(self, left: Any, operator: Token, right: Any) -> Any:
+        return BinaryExpression(left, operator, right)
+
+    def grouping(self, expression: Any) -> Any:
+        return GroupingExpression(expression)
+
+    def literal(self, value: Any) -> Any:
+        return LiteralExpression(value)
+
+    def unary(self, operator: Token, right: Any) -> Any:
+        return UnaryExpression(operator, right)
+
+    def variable(self, name: Token) -> Any:
+        return VariableExpression(name)
+
+    def finish(self, root: Any) -> Expression:
+        return root
@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from lox.ast import Expression
+from lox.ast.arena import NodeKind
+from lox.ast.factory import NodeFactory
+from lox.token import Token
+
+
+@dataclass
+class SharingStatistics:
+    requested: int = 0
+    distinct: int = 0
+
+    @property
+    def shared(self) -> int:
+        """Nodes that were handed out again instead of being built."""
+        return self.requested - self.distinct
+
+    @property
+    def ratio(self) -> float:
+        return self.distinct / self.requested if self.requested else 1.0
+
+
+class HashConsingFactory(NodeFactory):
+    """Builds each structurally distinct subtree once and shares it.
+
+    Children are already shared, so a node is identified by its kind, its
+    operator or value and the identities of its children. A shared node
+    keeps the operator token of its first, leftmost occurrence; since a
+    subtree always evaluates the same way, that is also where it would
+    first raise. Pair it with `Interpreter(memoize=True)` to evaluate each
+    shared subtree once.
+    """
+    statistics: SharingStatistics
+    _nodes: Dict[Tuple, Expression]
+
+    def __init__(self) -> None:
+        self.statistics = SharingStatistics()
+        self._nodes = {}
+
+    def binary(self, left: Any, operator: Token, right: Any) -> Any:
+        key = (NodeKind.BINARY, id(left), operator.type, id(right))
+        return self._lookup(key) or self._store(
+            key, super().binary(left, operator, right))
+
+    def grouping(self, expression: Any) -> Any:
+        key = (NodeKind.GROUPING, id(expression))
+        return self._lookup(key) or self._store(key,
+                                                super().grouping(expression))
+
+    def literal(self, value: Any) -> Any:
+        key = (NodeKind.LITERAL, type(value), value)
+        return self._lookup(key) or self._store(key, super().literal(value))
+
+    def unary(self, operator: Token, right: Any) -> Any:
+        key = (NodeKind.UNARY, operator.type, id(right))
+        return self._lookup(key) or self._store(key,
+                                                super().unary(operator, right))
+
+    def variable(self, name: Token) -> Any:
+        key = (NodeKind.VARIABLE, name.lexeme)
+        return self._lookup(key) or self._store(key, super().variable(name))
+
+    def _lookup(self, key: Tuple) -> Optional[Expression]:
+        self.statistics.requested += 1
+        return self._nodes.get(key)
+
+    def _store(self, key: Tuple, node: Expression) -> Expression:
+        # The table keeps every node alive, so the ids in keys stay unique.
+        self.statistics.distinct += 1
+        self._nodes[key] = node
+        return node
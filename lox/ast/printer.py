@@ -1,37 +1,61 @@
-from lox.token_type import TokenType
-from lox.token import Token
-from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression
-
-
-class AstPrinter(Expression.Visitor):
-
-    def _parenthesize(self, name, *exprs):
-        builder = f"({name}"
-        for expr in exprs:
-            builder += f" {self.visit(expr)}"
-        return builder + ")"
-
-    def visit_BinaryExpression(self, expr):
-        return self._parenthesize(expr.operator.lexeme, expr.left, expr.right)
-
-    def visit_GroupingExpression(self, expr):
-        return self._parenthesize("group", expr.expression)
-
-    def visit_LiteralExpression(self, expr):
-        if expr.value is None:
-            return "nil"
-        return str(expr.value).replace(".0", "")
-
-    def visit_UnaryExpression(self, expr):
-        return self._parenthesize(expr.operator.lexeme, expr.right)
-
-
-if __name__ == "__main__":
-    expression = BinaryExpression(
-        UnaryExpression(
-            Token(TokenType.MINUS, "-", None, 1),
-            LiteralExpression(123),
-        ), Token(TokenType.STAR, "*", None, 1),
-        GroupingExpression(LiteralExpression(45.67)))
-
-    print(AstPrinter().visit(expression))
+from typing import List, Union
+
+from lox.object import format_value
+from lox.token_type import TokenType
+from lox.token import Token
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+
+
+class AstPrinter(Expression.Visitor):
+
+    def visit(self, expr: Expression) -> str:
+        # Pieces of output and nodes still to print share one explicit
+        # stack, so deep trees do not hit the recursion limit.
+        parts: List[str] = []
+        pending: List[Union[str, Expression]] = [expr]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif isinstance(node, BinaryExpression):
+                pending.extend((")", node.right, " ", node.left,
+                                f"({node.operator.lexeme} "))
+            elif isinstance(node, GroupingExpression):
+                pending.extend((")", node.expression, "(group "))
+            elif isinstance(node, UnaryExpression):
+                pending.extend((")", node.right, f"({node.operator.lexeme} "))
+            else:
+                parts.append(super().visit(node))
+        return "".join(parts)
+
+    def _parenthesize(self, name, *exprs):
+        builder = f"({name}"
+        for expr in exprs:
+            builder += f" {self.visit(expr)}"
+        return builder + ")"
+
+    def visit_BinaryExpression(self, expr):
+        return self._parenthesize(expr.operator.lexeme, expr.left, expr.right)
+
+    def visit_GroupingExpression(self, expr):
+        return self._parenthesize("group", expr.expression)
+
+    def visit_LiteralExpression(self, expr):
+        return format_value(expr.value)
+
+    def visit_UnaryExpression(self, expr):
+        return self._parenthesize(expr.operator.lexeme, expr.right)
+
+    def visit_VariableExpression(self, expr):
+        return expr.name.lexeme
+
+
+if __name__ == "__main__":
+    expression = BinaryExpression(
+        UnaryExpression(
+            Token(TokenType.MINUS, "-", None, 1),
+            LiteralExpression(123),
+        ), Token(TokenType.STAR, "*", None, 1),
+        GroupingExpression(LiteralExpression(45.67)))
+
+    print(AstPrinter().visit(expression))
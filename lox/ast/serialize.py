@@ -0,0 +1,166 @@
+import struct
+from typing import Dict, List, Tuple
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+from lox.syntax_facts import KIND_TEXTS
+from lox.token import Token
+from lox.token_buffer import TOKEN_TYPES
+from lox.token_type import TokenType
+
+# Nodes are written in postfix order so that both directions only need an
+# explicit stack, however deep the tree is. An operator or grouping node
+# that was already written, as in a hash-consed tree, is written again as
+# SHARED and its index among the operator and grouping nodes so far.
+BINARY = ord("B")
+GROUPING = ord("G")
+UNARY = ord("U")
+VARIABLE = ord("V")
+NIL = ord("n")
+TRUE = ord("t")
+FALSE = ord("f")
+NUMBER = ord("d")
+STRING = ord("s")
+SHARED = ord("r")
+
+OPERATOR = struct.Struct("<BI")
+LINE = struct.Struct("<I")
+DOUBLE = struct.Struct("<d")
+LENGTH = struct.Struct("<I")
+
+
+class SerializationError(ValueError):
+    pass
+
+
+def dumps(expr: Expression) -> bytes:
+    out = bytearray()
+    written: Dict[int, int] = {}
+    stack: List[Tuple[Expression, bool]] = [(expr, False)]
+
+    while stack:
+        node, children_done = stack.pop()
+        if isinstance(node, LiteralExpression):
+            _write_literal(out, node.value)
+        elif isinstance(node, VariableExpression):
+            out.append(VARIABLE)
+            out += LINE.pack(node.name.line)
+            _write_string(out, node.name.lexeme)
+        elif children_done:
+            if isinstance(node, BinaryExpression):
+                out.append(BINARY)
+                out += OPERATOR.pack(node.operator.type.value,
+                                     node.operator.line)
+            elif isinstance(node, UnaryExpression):
+                out.append(UNARY)
+                out += OPERATOR.pack(node.operator.type.value,
+                                     node.operator.line)
+            else:
+                out.append(GROUPING)
+            written[id(node)] = len(written)
+        elif id(node) in written:
+            out.append(SHARED)
+            out += LENGTH.pack(written[id(node)])
+        else:
+            stack.append((node, True))
+            if isinstance(node, BinaryExpression):
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            elif isinstance(node, UnaryExpression):
+                stack.append((node.right, False))
+            elif isinstance(node, GroupingExpression):
+                stack.append((node.expression, False))
+            else:
+                raise SerializationError(f"cannot serialize {node!r}")
+
+    return bytes(out)
+
+
+def _write_literal(out: bytearray, value: object) -> None:
+    if value is None:
+        out.append(NIL)
+    elif value is True:
+        out.append(TRUE)
+    elif value is False:
+        out.append(FALSE)
+    elif type(value) is float:
+        out.append(NUMBER)
+        out += DOUBLE.pack(value)
+    elif type(value) is str:
+        out.append(STRING)
+        _write_string(out, value)
+    else:
+        raise SerializationError(f"cannot serialize literal {value!r}")
+
+
+def _write_string(out: bytearray, value: str) -> None:
+    encoded = value.encode("utf-8")
+    out += LENGTH.pack(len(encoded))
+    out += encoded
+
+
+def _read_string(data: bytes, offset: int) -> Tuple[str, int]:
+    (length, ) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    if offset + length > len(data):
+        raise SerializationError("truncated string")
+    return data[offset:offset + length].decode("utf-8"), offset + length
+
+
+def _read_operator(data: bytes, offset: int) -> Tuple[Token, int]:
+    type_code, line = OPERATOR.unpack_from(data, offset)
+    token = Token(TOKEN_TYPES[type_code], KIND_TEXTS[type_code], None, line)
+    return token, offset + OPERATOR.size
+
+
+def loads(data: bytes) -> Expression:
+    stack: List[Expression] = []
+    push = stack.append
+    pop = stack.pop
+    shared: List[Expression] = []
+    offset = 0
+
+    try:
+        while offset < len(data):
+            tag = data[offset]
+            offset += 1
+            if tag == NUMBER:
+                push(LiteralExpression(DOUBLE.unpack_from(data, offset)[0]))
+                offset += DOUBLE.size
+            elif tag == BINARY:
+                operator, offset = _read_operator(data, offset)
+                right = pop()
+                stack[-1] = BinaryExpression(stack[-1], operator, right)
+                shared.append(stack[-1])
+            elif tag == UNARY:
+                operator, offset = _read_operator(data, offset)
+                stack[-1] = UnaryExpression(operator, stack[-1])
+                shared.append(stack[-1])
+            elif tag == GROUPING:
+                stack[-1] = GroupingExpression(stack[-1])
+                shared.append(stack[-1])
+            elif tag == SHARED:
+                push(shared[LENGTH.unpack_from(data, offset)[0]])
+                offset += LENGTH.size
+            elif tag == STRING:
+                value, offset = _read_string(data, offset)
+                push(LiteralExpression(value))
+            elif tag == VARIABLE:
+                (line, ) = LINE.unpack_from(data, offset)
+                name, offset = _read_string(data, offset + LINE.size)
+                push(
+                    VariableExpression(
+                        Token(TokenType.IDENTIFIER, name, None, line)))
+            elif tag == NIL:
+                push(LiteralExpression(None))
+            elif tag == TRUE:
+                push(LiteralExpression(True))
+            elif tag == FALSE:
+                push(LiteralExpression(False))
+            else:
+                raise SerializationError(f"unknown tag {tag:#x}")
+    except (IndexError, KeyError, struct.error, UnicodeDecodeError) as e:
+        raise SerializationError(str(e)) from e
+
+    if len(stack) != 1:
+        raise SerializationError("malformed expression stream")
+    return stack[0]
@@ -0,0 +1,132 @@
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+from lox.cache import CompileCache, cache_dir_for
+from lox.runtime_error import LoxRuntimeError
+from lox.session import LoxSession
+
+
+@dataclass(frozen=True)
+class ScriptResult:
+    path: str
+    exit_code: int
+    stdout: str
+    stderr: str
+    seconds: float
+
+
+def read_manifest(manifest: str) -> List[str]:
+    """Script paths listed one per line, relative to the manifest.
+
+    Blank lines and lines starting with '#' are skipped.
+    """
+    base = Path(manifest).parent
+    paths = []
+    with open(manifest) as manifest_file:
+        for line in manifest_file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(str(base / line))
+    return paths
+
+
+def run_script(path: str,
+               backend: str = "tree",
+               optimize: bool = False,
+               cache: Optional[CompileCache] = None,
+               local_cache: bool = False) -> ScriptResult:
+    """Runs one script, turning its errors into a ScriptResult.
+
+    With `local_cache` and no `cache`, the script uses the cache directory
+    next to it, as `--cache` does for a single script.
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    session = LoxSession(backend, optimize, output=stdout, errors=stderr)
+    start = time.perf_counter()
+    try:
+        if cache is None and local_cache:
+            cache = CompileCache(cache_dir_for(path))
+        exit_code = session.run_file(path, cache=cache)
+    except OSError as e:
+        print(f"lox.py: {e}", file=stderr)
+        exit_code = 66
+    except LoxRuntimeError as e:
+        session.diagnostics.runtime_error(e)
+        exit_code = session.exit_code
+    return ScriptResult(path, exit_code, stdout.getvalue(), stderr.getvalue(),
+                        time.perf_counter() - start)
+
+
+def run_scripts(paths: Iterable[str],
+                jobs: Optional[int] = None,
+                backend: str = "tree",
+                optimize: bool = False,
+                cache: Optional[CompileCache] = None,
+                chunk_size: int = 1,
+                local_cache: bool = False) -> Iterator[ScriptResult]:
+    """Runs scripts on a pool of worker processes, yielding results in order.
+
+    With `jobs` set to 1 the scripts run one after another in this process.
+    """
+    worker = partial(run_script,
+                     backend=backend,
+                     optimize=optimize,
+                     cache=cache,
+                     local_cache=local_cache)
+    if jobs == 1:
+        yield from map(worker, paths)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(worker, paths, chunksize=chunk_size)
+
+
+def batch_exit_code(results: Iterable[ScriptResult]) -> int:
+    return max((result.exit_code for result in results), default=0)
+
+
+def print_summary(results: List[ScriptResult], seconds: float,
+                  file: TextIO) -> None:
+    """Per-script times, then the batch's wall time in `seconds`."""
+    width = max((len(result.path) for result in results), default=0)
+    for result in results:
+        status = "ok" if result.exit_code == 0 else f"exit {result.exit_code}"
+        print(f"{result.path:<{width}}  {status:<7}  "
+              f"{result.seconds * 1000:9.2f} ms",
+              file=file)
+    failed = sum(1 for result in results if result.exit_code != 0)
+    print(f"{len(results)} scripts, {failed} failed, "
+          f"{seconds * 1000:.2f} ms wall time",
+          file=file)
+
+
+def run_batch(paths: List[str],
+              jobs: Optional[int] = None,
+              backend: str = "tree",
+              optimize: bool = False,
+              cache: Optional[CompileCache] = None,
+              local_cache: bool = False) -> int:
+    results = []
+    start = time.perf_counter()
+    # Hand each worker several scripts at a time so large batches don't pay
+    # one round trip per script.
+    chunk_size = max(1, len(paths) // ((jobs or os.cpu_count() or 1) * 4))
+    for result in run_scripts(paths, jobs, backend, optimize, cache,
+                              chunk_size, local_cache):
+        print(f"==> {result.path} <==")
+        sys.stdout.write(result.stdout)
+        if result.stderr:
+            sys.stdout.flush()
+            print(f"==> {result.path} <==", file=sys.stderr)
+            sys.stderr.write(result.stderr)
+        results.append(result)
+    sys.stdout.flush()
+    print_summary(results, time.perf_counter() - start, sys.stderr)
+    return batch_exit_code(results)
@@ -0,0 +1,2 @@
+from lox.bench.corpus import Corpus, generate, generate_all
+from lox.bench.runner import Comparison, Measurement, compare, regressions, run_benchmarks, to_json
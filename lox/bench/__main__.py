@@ -0,0 +1,72 @@
+import argparse
+import json
+import sys
+
+from lox.bench.corpus import DEFAULT_SEED, GENERATORS, generate
+from lox.bench.runner import PHASES, compare, regressions, run_benchmarks, to_json
+
+parser = argparse.ArgumentParser(prog="python -m lox.bench")
+parser.add_argument("--corpus",
+                    action="append",
+                    choices=sorted(GENERATORS),
+                    help="corpora to run (default: all)")
+parser.add_argument("--phase",
+                    action="append",
+                    choices=PHASES,
+                    help="phases to time (default: all)")
+parser.add_argument("--scale", type=float, default=1.0)
+parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument("--warmup", type=int, default=1)
+parser.add_argument("--no-memory",
+                    dest="memory",
+                    action="store_false",
+                    help="skip measuring allocated and peak bytes")
+parser.add_argument("--output", help="write results as JSON to this file")
+parser.add_argument("--baseline", help="compare against this results file")
+parser.add_argument("--tolerance",
+                    type=float,
+                    default=0.25,
+                    help="allowed slowdown against the baseline (0.25 = 25%%)")
+args = parser.parse_args()
+
+corpora = [
+    generate(name, args.scale, args.seed)
+    for name in (args.corpus or GENERATORS)
+]
+
+
+def progress(measurement):
+    line = (f"{measurement.key:<32} {measurement.median * 1e3:10.3f} ms "
+            f"± {measurement.stdev * 1e3:.3f}")
+    if measurement.peak_bytes is not None:
+        line += f"  peak {measurement.peak_bytes / 1024:10.1f} KiB"
+    print(line, file=sys.stderr)
+
+
+results = to_json(
+    run_benchmarks(corpora,
+                   args.phase or PHASES,
+                   args.repeat,
+                   args.warmup,
+                   progress=progress,
+                   memory=args.memory))
+
+if args.output:
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+else:
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+if args.baseline:
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    failed = regressions(compare(results, baseline), args.tolerance)
+    for comparison in failed:
+        print(f"REGRESSION {comparison.key}: {comparison.ratio:.2f}x slower "
+              f"({comparison.baseline * 1e3:.3f} ms -> "
+              f"{comparison.current * 1e3:.3f} ms)",
+              file=sys.stderr)
+    if failed:
+        exit(1)
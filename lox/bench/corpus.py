@@ -0,0 +1,77 @@
+import random
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+from lox.syntax_facts import text_for_type
+from lox.token_type import TokenType
+
+DEFAULT_SEED = 1234
+
+OPERATORS = ("+", "-", "*", "/")
+KEYWORDS = tuple(
+    text_for_type(type) for type in TokenType
+    if type != TokenType.EOF and (text_for_type(type) or "").isalpha())
+
+
+@dataclass(frozen=True)
+class Corpus:
+    name: str
+    source: str
+    # Scanner-only corpora are token soup that does not parse.
+    parses: bool = True
+
+
+def _number(rng: random.Random) -> str:
+    return f"{rng.randint(1, 999)}.{rng.randint(0, 99)}"
+
+
+def deep_nesting(rng: random.Random, size: int) -> str:
+    parts = []
+    for _ in range(size):
+        parts.append(f"{_number(rng)} {rng.choice(OPERATORS)} (")
+    return "".join(parts) + "1" + ")" * size
+
+
+def wide_sum(rng: random.Random, size: int) -> str:
+    return " + ".join(_number(rng) for _ in range(size))
+
+
+def string_concatenation(rng: random.Random, size: int) -> str:
+    return " + ".join(
+        '"' + "".join(rng.choice("abcdefgh ") for _ in range(rng.randint(0, 12))) +
+        '"' for _ in range(size))
+
+
+def comment_heavy(rng: random.Random, size: int) -> str:
+    lines = []
+    for _ in range(size):
+        lines.append("// " + " ".join(
+            rng.choice(("lorem", "ipsum", "dolor", "sit", "amet"))
+            for _ in range(rng.randint(3, 12))))
+        lines.append(f"{_number(rng)} *")
+    lines.append("1")
+    return "\n".join(lines)
+
+
+def keyword_dense(rng: random.Random, size: int) -> str:
+    return " ".join(rng.choice(KEYWORDS) for _ in range(size))
+
+
+GENERATORS: Dict[str, Tuple[Callable[[random.Random, int], str], int, bool]] = {
+    "deep_nesting": (deep_nesting, 150, True),
+    "wide_sum": (wide_sum, 2000, True),
+    "string_concatenation": (string_concatenation, 1000, True),
+    "comment_heavy": (comment_heavy, 1000, True),
+    "keyword_dense": (keyword_dense, 5000, False),
+}
+
+
+def generate(name: str, scale: float = 1.0,
+             seed: int = DEFAULT_SEED) -> Corpus:
+    generator, size, parses = GENERATORS[name]
+    rng = random.Random(f"{seed}:{name}")
+    return Corpus(name, generator(rng, max(1, int(size * scale))), parses)
+
+
+def generate_all(scale: float = 1.0, seed: int = DEFAULT_SEED) -> Dict[str, Corpus]:
+    return {name: generate(name, scale, seed) for name in GENERATORS}
@@ -0,0 +1,209 @@
+import statistics
+import sys
+import timeit
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import lox
+from lox.adaptive import AdaptiveInterpreter
+from lox.ast.printer import AstPrinter
+from lox.bench.corpus import Corpus
+from lox.diagnostics import Diagnostics
+from lox.emitter import minify_source, prettify_source
+from lox.incremental import IncrementalDocument
+from lox.interpreter import Interpreter
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.token_type import TokenType
+
+PHASES = ("scan", "minify", "pretty", "parse", "pratt", "interpret",
+          "adaptive", "print", "edit")
+
+# Generated inputs nest far deeper than hand-written scripts.
+RECURSION_LIMIT = 100000
+
+
+class NullOutput:
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+@dataclass(frozen=True)
+class Measurement:
+    corpus: str
+    phase: str
+    number: int
+    repeat: int
+    min: float
+    median: float
+    mean: float
+    stdev: float
+    allocated_bytes: Optional[int] = None
+    peak_bytes: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.corpus}/{self.phase}"
+
+
+def phase_callables(corpus: Corpus) -> Dict[str, Callable[[], object]]:
+    """One zero-argument callable per phase, each fed the previous output."""
+    diagnostics = Diagnostics(NullOutput(), record=False)
+    source = corpus.source
+    tokens = Scanner(source, diagnostics).scan_tokens()
+    phases: Dict[str, Callable[[], object]] = {
+        "scan": lambda: Scanner(source, diagnostics).scan_tokens(),
+        "minify": lambda: minify_source(source),
+        "pretty": lambda: prettify_source(source, diagnostics=diagnostics),
+    }
+    if not corpus.parses:
+        return phases
+
+    expr = Parser(tokens, diagnostics=diagnostics).parse()
+    interpreter = Interpreter(diagnostics=diagnostics, output=NullOutput())
+    # The adaptive interpreter rewrites the nodes it runs, so it gets a tree
+    # of its own.
+    adaptive_expr = Parser(tokens, diagnostics=diagnostics).parse()
+    adaptive = AdaptiveInterpreter(diagnostics=diagnostics,
+                                   output=NullOutput())
+    printer = AstPrinter()
+    phases["parse"] = lambda: Parser(tokens, diagnostics=diagnostics).parse()
+    phases["pratt"] = lambda: Parser(
+        tokens, diagnostics=diagnostics, pratt=True).parse()
+    phases["interpret"] = lambda: interpreter.interpret(expr)
+    phases["adaptive"] = lambda: adaptive.interpret(adaptive_expr)
+    phases["print"] = lambda: printer.visit(expr)
+    phases["edit"] = _literal_edit(IncrementalDocument(source, diagnostics))
+    return phases
+
+
+def _literal_edit(document: IncrementalDocument) -> Callable[[], object]:
+    """Types a digit into the literal nearest the middle and removes it."""
+    index = len(document.tokens) // 2
+    while document.tokens[index].type not in (TokenType.NUMBER,
+                                              TokenType.STRING):
+        index += 1
+    offset = document.token_offset(index) + 1
+
+    def edit() -> None:
+        document.edit(offset, 0, "1")
+        document.edit(offset, 1, "")
+
+    return edit
+
+
+def measure_memory(function: Callable[[], object]) -> Tuple[int, int]:
+    """Bytes one call leaves allocated (its result included) and its peak.
+
+    This runs separately from the timed calls, which tracing would slow
+    down several times over.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        if started:
+            tracemalloc.stop()
+    return current - before, peak - before
+
+
+def measure(corpus: str,
+            phase: str,
+            function: Callable[[], object],
+            repeat: int,
+            warmup: int,
+            number: Optional[int] = None,
+            memory: bool = False) -> Measurement:
+    timer = timeit.Timer(function)
+    if number is None:
+        number, _ = timer.autorange()
+    for _ in range(warmup):
+        timer.timeit(number)
+    times = [total / number for total in timer.repeat(repeat, number)]
+    allocated, peak = measure_memory(function) if memory else (None, None)
+    return Measurement(corpus, phase, number, repeat, min(times),
+                       statistics.median(times), statistics.fmean(times),
+                       statistics.stdev(times) if len(times) > 1 else 0.0,
+                       allocated, peak)
+
+
+def run_benchmarks(corpora: Iterable[Corpus],
+                   phases: Iterable[str] = PHASES,
+                   repeat: int = 5,
+                   warmup: int = 1,
+                   number: Optional[int] = None,
+                   progress: Optional[Callable[[Measurement], None]] = None,
+                   memory: bool = True) -> List[Measurement]:
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+    try:
+        wanted = set(phases)
+        results = []
+        for corpus in corpora:
+            for phase, function in phase_callables(corpus).items():
+                if phase not in wanted:
+                    continue
+                measurement = measure(corpus.name, phase, function, repeat,
+                                      warmup, number, memory)
+                results.append(measurement)
+                if progress is not None:
+                    progress(measurement)
+        return results
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def to_json(results: Iterable[Measurement]) -> dict:
+    return {
+        "version": lox.LOX_VERSION,
+        "python": sys.version.split()[0],
+        "results": {
+            measurement.key: {
+                name: value
+                for name, value in asdict(measurement).items()
+                if name not in ("corpus", "phase")
+            }
+            for measurement in results
+        },
+    }
+
+
+@dataclass(frozen=True)
+class Comparison:
+    key: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def compare(current: dict, baseline: dict,
+            metric: str = "median") -> List[Comparison]:
+    comparisons = []
+    for key, values in current["results"].items():
+        if key in baseline["results"]:
+            comparisons.append(
+                Comparison(key, baseline["results"][key][metric],
+                           values[metric]))
+    return comparisons
+
+
+def regressions(comparisons: Iterable[Comparison],
+                tolerance: float) -> List[Comparison]:
+    return [
+        comparison for comparison in comparisons
+        if comparison.ratio > 1 + tolerance
+    ]
@@ -0,0 +1,137 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# A single short script should add at most this many milliseconds to the
+# start of a bare interpreter (`python -c pass`), timed in the same run.
+DEFAULT_TARGET_MS = 50.0
+DEFAULT_SCRIPT = "1 + 2 * 3\n"
+
+
+@dataclass(frozen=True)
+class StartupMeasurement:
+    """Wall time of `python -m lox script`, and where the imports went.
+
+    `baseline` is the median wall time of `python -c pass`, timed between
+    the lox runs so that both see the same machine load. `imports` holds
+    (module, cumulative microseconds) for the top-level imports, slowest
+    first. They come from one extra run under -X importtime, which is not
+    timed, since reporting every import slows startup down.
+    """
+    repeat: int
+    min: float
+    median: float
+    baseline: float
+    imports: List[Tuple[str, int]]
+
+    @property
+    def overhead(self) -> float:
+        """How much longer than a bare interpreter lox takes to start."""
+        return self.median - self.baseline
+
+
+def parse_import_times(report: str) -> List[Tuple[str, int]]:
+    """Top-level modules and their cumulative times from -X importtime."""
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below the module that made them.
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        imports.append((name.strip(), int(cumulative)))
+    imports.sort(key=lambda entry: entry[1], reverse=True)
+    return imports
+
+
+def measure_startup(script: str,
+                    repeat: int = 10,
+                    python: str = sys.executable,
+                    args: Sequence[str] = ()) -> StartupMeasurement:
+    """Times `python -m lox script` and `python -c pass` `repeat` times each.
+
+    One more run under -X importtime, which is not timed, finds the imports.
+    """
+    command = [python, "-m", "lox", *args, script]
+    bare = [python, "-c", "pass"]
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    timings = []
+    baselines = []
+    for _ in range(repeat):
+        baselines.append(_time(bare, env))
+        timings.append(_time(command, env))
+    report = _run([python, "-X", "importtime", *command[1:]], env)
+    return StartupMeasurement(repeat, min(timings),
+                              statistics.median(timings),
+                              statistics.median(baselines),
+                              parse_import_times(report))
+
+
+def _time(command: List[str], env: Dict[str, str]) -> float:
+    start = perf_counter()
+    _run(command, env)
+    return perf_counter() - start
+
+
+def _run(command: List[str], env: Dict[str, str]) -> str:
+    """Runs `command` and returns what it wrote to stderr."""
+    result = subprocess.run(command,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE,
+                            env=env,
+                            text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} exited with "
+                           f"{result.returncode}:\n{result.stderr}")
+    return result.stderr
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m lox.bench.startup")
+    parser.add_argument("script",
+                        nargs="?",
+                        help="script to run (default: a one-line script)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top",
+                        type=int,
+                        default=10,
+                        help="slowest top-level imports to list")
+    parser.add_argument("--target-ms",
+                        type=float,
+                        default=DEFAULT_TARGET_MS,
+                        help="fail if lox adds more than this to the median "
+                        "wall time of a bare interpreter")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        script = args.script
+        if script is None:
+            script = os.path.join(directory, "startup.lox")
+            with open(script, "w") as script_file:
+                script_file.write(DEFAULT_SCRIPT)
+        measurement = measure_startup(script, args.repeat)
+
+    print(f"startup: min {measurement.min * 1e3:.1f} ms, "
+          f"median {measurement.median * 1e3:.1f} ms "
+          f"over {measurement.repeat} runs, "
+          f"{measurement.overhead * 1e3:.1f} ms over a bare interpreter")
+    for name, microseconds in measurement.imports[:args.top]:
+        print(f"  {name:<32} {microseconds / 1e3:8.1f} ms")
+    if measurement.overhead * 1e3 > args.target_ms:
+        print(f"SLOW STARTUP: more than the {args.target_ms:.0f} ms target "
+              "over a bare interpreter",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
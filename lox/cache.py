@@ -0,0 +1,144 @@
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Optional, Union
+
+import lox
+from lox.ast import Expression
+from lox.ast.serialize import SerializationError, dumps, loads
+
+MAGIC = b"LOXC\x01"
+HEADER = struct.Struct("<32sBII")
+CACHE_SUFFIX = ".loxc"
+DEFAULT_CACHE_DIR_NAME = "__loxcache__"
+DEFAULT_MAX_BYTES = 64 << 20
+
+OPTIMIZED = 1
+
+
+def cache_dir_for(script: Union[str, Path]) -> Path:
+    return Path(script).resolve().parent / DEFAULT_CACHE_DIR_NAME
+
+
+class CompileCache:
+    """Parsed programs stored on disk, keyed by source hash and version.
+
+    Each entry records the interpreter version, its key and a CRC of the
+    encoded tree; anything that fails to check out is deleted and treated
+    as a miss. Once the directory outgrows `max_bytes`, the least recently
+    used entries are evicted.
+    """
+    directory: Path
+    max_bytes: int
+
+    def __init__(self,
+                 directory: Union[str, Path],
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def key(self, file_name: Union[str, Path], optimized: bool) -> bytes:
+        with open(file_name, "rb") as source_file:
+            return self.source_key(source_file.read(), optimized)
+
+    def source_key(self, source: bytes, optimized: bool) -> bytes:
+        """The key for a script whose contents are `source`.
+
+        Callers that go on to parse the script should hash and parse the
+        same bytes, so that an entry is never stored under the key of a
+        different version of the file.
+        """
+        digest = hashlib.sha256()
+        digest.update(lox.LOX_VERSION.encode())
+        digest.update(b"\0O" if optimized else b"\0-")
+        digest.update(source)
+        return digest.digest()
+
+    def load(self, key: bytes, optimized: bool) -> Optional[Expression]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        expr = self._decode(data, key, optimized)
+        if expr is None:
+            self._unlink(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return expr
+
+    def store(self, key: bytes, optimized: bool, expr: Expression) -> None:
+        payload = dumps(expr)
+        version = lox.LOX_VERSION.encode()
+        header = HEADER.pack(key, OPTIMIZED if optimized else 0,
+                             zlib.crc32(payload), len(payload))
+        data = (MAGIC + bytes([len(version)]) + version + header + payload)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_name, self._path(key))
+        except BaseException:
+            self._unlink(Path(temp_name))
+            raise
+        self._evict()
+
+    def _path(self, key: bytes) -> Path:
+        return self.directory / (key.hex() + CACHE_SUFFIX)
+
+    def _decode(self, data: bytes, key: bytes,
+                optimized: bool) -> Optional[Expression]:
+        if not data.startswith(MAGIC) or len(data) <= len(MAGIC):
+            return None
+        offset = len(MAGIC)
+        version_length = data[offset]
+        offset += 1
+        version = data[offset:offset + version_length]
+        offset += version_length
+        if version != lox.LOX_VERSION.encode():
+            return None
+        try:
+            stored_key, flags, crc, length = HEADER.unpack_from(data, offset)
+        except struct.error:
+            return None
+        offset += HEADER.size
+        payload = data[offset:]
+        if (stored_key != key or flags != (OPTIMIZED if optimized else 0)
+                or len(payload) != length or zlib.crc32(payload) != crc):
+            return None
+        try:
+            return loads(payload)
+        except SerializationError:
+            return None
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.directory.glob("*" + CACHE_SUFFIX):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._unlink(path)
+            total -= size
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
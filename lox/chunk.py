@@ -0,0 +1,72 @@
+from array import array
+from enum import IntEnum
+from typing import List, Optional
+
+from lox.token import Token
+
+
+class OpCode(IntEnum):
+    CONSTANT = 0
+    ADD = 1
+    SUBTRACT = 2
+    MULTIPLY = 3
+    DIVIDE = 4
+    NEGATE = 5
+    NOT = 6
+    EQUAL = 7
+    NOT_EQUAL = 8
+    GREATER = 9
+    GREATER_EQUAL = 10
+    LESS = 11
+    LESS_EQUAL = 12
+    GET_VARIABLE = 13
+
+    def __str__(self) -> str:
+        return f"OP_{self.name}"
+
+
+# Every instruction is a single word: the opcode lives in the low byte and
+# the operand (a constant or token index) in the remaining bits.
+OPCODE_BITS = 8
+OPCODE_MASK = (1 << OPCODE_BITS) - 1
+
+
+class Chunk:
+    code: array
+    constants: List[Optional[object]]
+    tokens: List[Token]
+
+    def __init__(self) -> None:
+        self.code = array("L")
+        self.constants = []
+        self.tokens = []
+
+    def write(self, op: OpCode, operand: int = 0) -> None:
+        self.code.append(op | operand << OPCODE_BITS)
+
+    def add_constant(self, value: Optional[object]) -> int:
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def add_token(self, token: Token) -> int:
+        self.tokens.append(token)
+        return len(self.tokens) - 1
+
+    def disassemble(self) -> str:
+        lines = []
+        for offset, instruction in enumerate(self.code):
+            op = OpCode(instruction & OPCODE_MASK)
+            operand = instruction >> OPCODE_BITS
+            if op == OpCode.CONSTANT:
+                lines.append(
+                    f"{offset:04} {op} {operand} '{self.constants[operand]!r}'")
+            elif op == OpCode.GET_VARIABLE:
+                token = self.tokens[operand]
+                lines.append(
+                    f"{offset:04} {op} '{token.lexeme}' [line {token.line}]")
+            elif op in (OpCode.NOT, OpCode.EQUAL, OpCode.NOT_EQUAL):
+                lines.append(f"{offset:04} {op}")
+            else:
+                token = self.tokens[operand]
+                lines.append(f"{offset:04} {op} [line {token.line}]")
+        return "\n".join(lines)
@@ -0,0 +1,195 @@
+import operator as op
+from typing import Callable, Dict, List, Optional
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+from lox.object import divide, is_truthy
+from lox.runtime_error import LoxRuntimeError
+from lox.token import Token
+from lox.token_type import TokenType
+
+Closure = Callable[[], object]
+
+# How deeply compiled closures may call into each other.
+MAX_NESTING = 100
+
+NUMERIC_OPERATORS = {
+    TokenType.MINUS: op.sub,
+    TokenType.STAR: op.mul,
+    TokenType.SLASH: divide,
+    TokenType.GREATER: op.gt,
+    TokenType.GREATER_EQUAL: op.ge,
+    TokenType.LESS: op.lt,
+    TokenType.LESS_EQUAL: op.le,
+}
+
+EQUALITY_OPERATORS = {
+    TokenType.EQUAL_EQUAL: op.eq,
+    TokenType.BANG_EQUAL: op.ne,
+}
+
+
+class ClosureCompiler(Expression.Visitor):
+    """Compiles an expression into nested closures.
+
+    Calling a closure calls its operands' closures, so a tree is cut into
+    segments at most MAX_NESTING closures deep. The compiled closure runs
+    the segments in evaluation order, each storing its value in a slot
+    that the rest of the tree reads, so deep trees do not hit the
+    recursion limit. A compiled closure is not meant to be called from
+    several threads at once.
+    """
+    _environment: Dict[str, object]
+
+    def __init__(self, environment: Optional[Dict[str, object]] = None):
+        self._environment = environment if environment is not None else {}
+
+    def compile(self, expr: Expression) -> Closure:
+        # A post-order walk over an explicit stack. A None on `pending`
+        # means the operator beneath it has its operands on top of
+        # `closures`; `depths` holds how deeply each of those nests, and
+        # the first `spilled` of them only read slots.
+        segments: List[Closure] = []
+        slots: List[object] = []
+        closures: List[Closure] = []
+        depths: List[int] = []
+        spilled = 0
+        pending: List[Optional[Expression]] = [expr]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                node = pending.pop()
+                if isinstance(node, BinaryExpression):
+                    right = closures.pop()
+                    depth = max(depths.pop(), depths.pop()) + 1
+                    closure = self._binary(node.operator, closures.pop(),
+                                           right)
+                else:
+                    depth = depths.pop() + 1
+                    closure = self._unary(node.operator, closures.pop())
+                closures.append(closure)
+                depths.append(depth)
+                spilled = min(spilled, len(closures) - 1)
+                if depth >= MAX_NESTING:
+                    _spill(closures, depths, spilled, segments, slots)
+                    spilled = len(closures)
+            elif isinstance(node, BinaryExpression):
+                pending.extend((node, None, node.right, node.left))
+            elif isinstance(node, GroupingExpression):
+                pending.append(node.expression)
+            elif isinstance(node, UnaryExpression):
+                pending.extend((node, None, node.right))
+            else:
+                closures.append(self.visit(node))
+                depths.append(1)
+
+        root = closures[0]
+        if not segments:
+            return root
+
+        def run():
+            for index, segment in enumerate(segments):
+                slots[index] = segment()
+            return root()
+
+        return run
+
+    def visit_LiteralExpression(self, expr: LiteralExpression) -> Closure:
+        value = expr.value
+        return lambda: value
+
+    def visit_VariableExpression(self, expr: VariableExpression) -> Closure:
+        environment = self._environment
+        name = expr.name
+
+        def lookup():
+            try:
+                return environment[name.lexeme]
+            except KeyError:
+                raise LoxRuntimeError(name,
+                                      f"Undefined variable '{name.lexeme}'.")
+
+        return lookup
+
+    def visit_GroupingExpression(self, expr: GroupingExpression) -> Closure:
+        return self.compile(expr)
+
+    def visit_UnaryExpression(self, expr: UnaryExpression) -> Closure:
+        return self.compile(expr)
+
+    def visit_BinaryExpression(self, expr: BinaryExpression) -> Closure:
+        return self.compile(expr)
+
+    def _unary(self, operator: Token, right: Closure) -> Closure:
+        if operator.type == TokenType.BANG:
+            return lambda: not is_truthy(right())
+        elif operator.type == TokenType.MINUS:
+
+            def negate():
+                value = right()
+                if type(value) is float:
+                    return -value
+                raise LoxRuntimeError(operator, "Operand must be a number.")
+
+            return negate
+
+        raise RuntimeError("this was supposed to be unreachable")
+
+    def _binary(self, operator: Token, left: Closure,
+                right: Closure) -> Closure:
+        if operator.type in NUMERIC_OPERATORS:
+            return _numeric(NUMERIC_OPERATORS[operator.type], operator, left,
+                            right)
+        elif operator.type == TokenType.PLUS:
+            return _add(operator, left, right)
+        elif operator.type in EQUALITY_OPERATORS:
+            function = EQUALITY_OPERATORS[operator.type]
+            return lambda: function(left(), right())
+
+        raise RuntimeError("this was supposed to be unreachable")
+
+
+def _spill(closures: List[Closure], depths: List[int], start: int,
+           segments: List[Closure], slots: List[object]) -> None:
+    """Turns the closures from `start` on into segments and slot reads.
+
+    The operands still waiting below the top one come before it in
+    evaluation order, so they are spilled too, to keep errors raising in
+    the same order.
+    """
+    for position in range(start, len(closures)):
+        index = len(segments)
+        segments.append(closures[position])
+        slots.append(None)
+        closures[position] = _slot(slots, index)
+        depths[position] = 0
+
+
+def _slot(slots: List[object], index: int) -> Closure:
+    return lambda: slots[index]
+
+
+def _numeric(function: Callable[[float, float], object], operator: Token,
+             left: Closure, right: Closure) -> Closure:
+
+    def evaluate():
+        a = left()
+        b = right()
+        if type(a) is float and type(b) is float:
+            return function(a, b)
+        raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+    return evaluate
+
+
+def _add(operator: Token, left: Closure, right: Closure) -> Closure:
+
+    def evaluate():
+        a = left()
+        b = right()
+        if type(a) is float and type(b) is float or type(a) is str and type(
+                b) is str:
+            return a + b
+        raise LoxRuntimeError(operator,
+                              "Operands must be two numbers or two strings.")
+
+    return evaluate
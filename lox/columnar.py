@@ -0,0 +1,210 @@
+from typing import Any, Dict, Mapping, NamedTuple, Set
+
+import numpy as np
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+from lox.closure_compiler import ClosureCompiler
+from lox.runtime_error import LoxRuntimeError
+from lox.token_type import TokenType
+
+NUMBER = "number"
+BOOL = "bool"
+STRING = "string"
+NIL = "nil"
+
+ARITHMETIC_UFUNCS = {
+    TokenType.MINUS: np.subtract,
+    TokenType.STAR: np.multiply,
+    TokenType.SLASH: np.divide,
+}
+
+COMPARISON_UFUNCS = {
+    TokenType.GREATER: np.greater,
+    TokenType.GREATER_EQUAL: np.greater_equal,
+    TokenType.LESS: np.less,
+    TokenType.LESS_EQUAL: np.less_equal,
+}
+
+ARRAY_KINDS = {"f": NUMBER, "b": BOOL, "U": STRING, "S": STRING, "T": STRING}
+
+
+class ColumnarResult(NamedTuple):
+    values: np.ndarray
+    # Row index to the error that row raised; only filled in when an
+    # object column forced row-by-row evaluation.
+    errors: Dict[int, LoxRuntimeError]
+
+
+def kind_of(value: Any) -> str:
+    if isinstance(value, np.ndarray):
+        return ARRAY_KINDS[value.dtype.kind]
+    if value is None:
+        return NIL
+    if isinstance(value, bool):
+        return BOOL
+    if isinstance(value, float):
+        return NUMBER
+    return STRING
+
+
+def bind_column(name: str, values: Any) -> np.ndarray:
+    column = np.asarray(values)
+    if column.ndim != 1:
+        raise ValueError(f"column '{name}' must be one-dimensional")
+    kind = column.dtype.kind
+    # Lox numbers are doubles, whatever width the column was stored in.
+    if kind in "iuf":
+        return column.astype(np.float64, copy=False)
+    if kind not in ARRAY_KINDS and kind != "O":
+        raise ValueError(
+            f"column '{name}' has unsupported dtype {column.dtype}")
+    return column
+
+
+class ColumnarEvaluator(Expression.Visitor):
+    """Evaluates an expression over whole columns of variable bindings.
+
+    Typed columns (float, int, bool or string) are evaluated with NumPy
+    ufuncs, and a type error raises LoxRuntimeError for the whole column.
+    If any column has object dtype the expression is evaluated row by row
+    instead, and errors are reported per row. Division by zero follows
+    IEEE rules on either path.
+    """
+    _columns: Dict[str, np.ndarray]
+    # Ids of intermediate float arrays, which can be overwritten in place
+    # the way NumPy elides temporaries in hand-written expressions.
+    _temporaries: Set[int]
+
+    def evaluate(self, expr: Expression,
+                 columns: Mapping[str, Any]) -> ColumnarResult:
+        self._columns = {
+            name: bind_column(name, values)
+            for name, values in columns.items()
+        }
+        lengths = {len(column) for column in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("columns must all have the same length")
+        rows = lengths.pop() if lengths else 1
+        self._temporaries = set()
+
+        if any(column.dtype.kind == "O"
+               for column in self._columns.values()):
+            return self._evaluate_rows(expr, rows)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = self.visit(expr)
+        if not isinstance(value, np.ndarray):
+            value = np.full(rows, value, dtype=object if isinstance(
+                value, (str, type(None))) else None)
+        return ColumnarResult(value, {})
+
+    def _evaluate_rows(self, expr: Expression, rows: int) -> ColumnarResult:
+        environment: Dict[str, object] = {}
+        closure = ClosureCompiler(environment).compile(expr)
+        columns = {
+            name: [
+                float(value) if type(value) is int else value
+                for value in column.tolist()
+            ]
+            for name, column in self._columns.items()
+        }
+        values = np.empty(rows, dtype=object)
+        errors = {}
+        for row in range(rows):
+            for name, column in columns.items():
+                environment[name] = column[row]
+            try:
+                values[row] = closure()
+            except LoxRuntimeError as e:
+                errors[row] = e
+        return ColumnarResult(values, errors)
+
+    def visit_LiteralExpression(self, expr: LiteralExpression) -> Any:
+        return expr.value
+
+    def visit_GroupingExpression(self, expr: GroupingExpression) -> Any:
+        return self.visit(expr.expression)
+
+    def visit_VariableExpression(self, expr: VariableExpression) -> Any:
+        try:
+            return self._columns[expr.name.lexeme]
+        except KeyError:
+            raise LoxRuntimeError(expr.name,
+                                  f"Undefined variable '{expr.name.lexeme}'.")
+
+    def visit_UnaryExpression(self, expr: UnaryExpression) -> Any:
+        right = self.visit(expr.right)
+        if not isinstance(right, np.ndarray):
+            return self._scalar(UnaryExpression(expr.operator,
+                                                LiteralExpression(right)))
+
+        kind = kind_of(right)
+        if expr.operator.type == TokenType.BANG:
+            if kind == BOOL:
+                return np.logical_not(right)
+            if kind == NUMBER:
+                # Mirrors is_truthy, where 0 compares equal to False.
+                return right == 0
+            return np.zeros(right.shape, dtype=bool)
+        elif expr.operator.type == TokenType.MINUS:
+            if kind != NUMBER:
+                raise LoxRuntimeError(expr.operator,
+                                      "Operand must be a number.")
+            return self._arithmetic(np.negative, right)
+
+        raise RuntimeError("this was supposed to be unreachable")
+
+    def visit_BinaryExpression(self, expr: BinaryExpression) -> Any:
+        left = self.visit(expr.left)
+        right = self.visit(expr.right)
+        if not isinstance(left, np.ndarray) and not isinstance(
+                right, np.ndarray):
+            return self._scalar(
+                BinaryExpression(LiteralExpression(left), expr.operator,
+                                 LiteralExpression(right)))
+
+        operator = expr.operator.type
+        left_kind = kind_of(left)
+        right_kind = kind_of(right)
+
+        if operator in ARITHMETIC_UFUNCS or operator in COMPARISON_UFUNCS:
+            if left_kind != NUMBER or right_kind != NUMBER:
+                raise LoxRuntimeError(expr.operator,
+                                      "Operands must be numbers.")
+            if operator in COMPARISON_UFUNCS:
+                return COMPARISON_UFUNCS[operator](left, right)
+            return self._arithmetic(ARITHMETIC_UFUNCS[operator], left, right)
+        elif operator == TokenType.PLUS:
+            if left_kind == NUMBER and right_kind == NUMBER:
+                return self._arithmetic(np.add, left, right)
+            if left_kind == STRING and right_kind == STRING:
+                return np.char.add(left, right)
+            raise LoxRuntimeError(
+                expr.operator, "Operands must be two numbers or two strings.")
+        elif operator in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL):
+            equal = self._equal(left, left_kind, right, right_kind)
+            if operator == TokenType.BANG_EQUAL:
+                return np.logical_not(equal)
+            return equal
+
+        raise RuntimeError("this was supposed to be unreachable")
+
+    def _arithmetic(self, ufunc: np.ufunc, *operands: Any) -> np.ndarray:
+        for operand in operands:
+            if id(operand) in self._temporaries:
+                return ufunc(*operands, out=operand)
+        result = ufunc(*operands)
+        self._temporaries.add(id(result))
+        return result
+
+    def _equal(self, left: Any, left_kind: str, right: Any,
+               right_kind: str) -> np.ndarray:
+        numeric = (NUMBER, BOOL)
+        if (left_kind in numeric and right_kind in numeric
+                or left_kind == STRING and right_kind == STRING):
+            return np.equal(left, right)
+        shape = left.shape if isinstance(left, np.ndarray) else right.shape
+        return np.zeros(shape, dtype=bool)
+
+    def _scalar(self, expr: Expression) -> Any:
+        return ClosureCompiler().compile(expr)()
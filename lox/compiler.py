@@ -0,0 +1,77 @@
+from typing import List, Optional
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+from lox.chunk import Chunk, OpCode
+from lox.token_type import TokenType
+
+BINARY_OPCODES = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+}
+
+UNARY_OPCODES = {
+    TokenType.MINUS: OpCode.NEGATE,
+    TokenType.BANG: OpCode.NOT,
+}
+
+
+class Compiler(Expression.Visitor):
+    _chunk: Chunk
+
+    def compile(self, expr: Expression) -> Chunk:
+        # Operands are emitted before their operator in a walk over an
+        # explicit stack, so deep trees do not hit the recursion limit. A
+        # None on `pending` means the operator beneath it comes next.
+        self._chunk = Chunk()
+        pending: List[Optional[Expression]] = [expr]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                node = pending.pop()
+                if isinstance(node, BinaryExpression):
+                    self._emit_operator(BINARY_OPCODES, node)
+                else:
+                    self._emit_operator(UNARY_OPCODES, node)
+            elif isinstance(node, BinaryExpression):
+                pending.extend((node, None, node.right, node.left))
+            elif isinstance(node, GroupingExpression):
+                pending.append(node.expression)
+            elif isinstance(node, UnaryExpression):
+                pending.extend((node, None, node.right))
+            else:
+                self.visit(node)
+        return self._chunk
+
+    def visit_LiteralExpression(self, expr: LiteralExpression) -> None:
+        self._chunk.write(OpCode.CONSTANT, self._chunk.add_constant(expr.value))
+
+    def visit_VariableExpression(self, expr: VariableExpression) -> None:
+        self._chunk.write(OpCode.GET_VARIABLE,
+                          self._chunk.add_token(expr.name))
+
+    def visit_GroupingExpression(self, expr: GroupingExpression) -> None:
+        self.visit(expr.expression)
+
+    def visit_UnaryExpression(self, expr: UnaryExpression) -> None:
+        self.visit(expr.right)
+        self._emit_operator(UNARY_OPCODES, expr)
+
+    def visit_BinaryExpression(self, expr: BinaryExpression) -> None:
+        self.visit(expr.left)
+        self.visit(expr.right)
+        self._emit_operator(BINARY_OPCODES, expr)
+
+    def _emit_operator(self, opcodes, expr) -> None:
+        try:
+            op = opcodes[expr.operator.type]
+        except KeyError:
+            raise RuntimeError("this was supposed to be unreachable")
+        self._chunk.write(op, self._chunk.add_token(expr.operator))
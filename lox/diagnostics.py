@@ -0,0 +1,106 @@
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, TextIO, Union
+
+import lox
+from lox.runtime_error import LoxRuntimeError
+from lox.token import Token
+from lox.token_type import TokenType
+
+# The most diagnostics `records` holds; older ones are dropped first.
+RECORD_LIMIT = 1000
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    line: int
+    where: str
+    message: str
+    runtime: bool = False
+
+    def __str__(self) -> str:
+        if self.runtime:
+            return f"{self.message}\n[line {self.line}]"
+        return f"[line {self.line}] Error{self.where}: {self.message}"
+
+
+class Diagnostics:
+    """Collects the errors reported while scanning, parsing and evaluating.
+
+    Each diagnostic is printed to `stream` (stderr if unset) and, if
+    `record` is set, also kept in `records`, which holds the last
+    RECORD_LIMIT of them. If `output` is set, it is flushed first, so that
+    results it buffers come out before the errors that followed them.
+    """
+    had_error: bool
+    had_runtime_error: bool
+    records: Optional[List[Diagnostic]]
+    output: Optional[TextIO]
+    _stream: Optional[TextIO]
+
+    def __init__(self, stream: Optional[TextIO] = None, record: bool = True):
+        self._stream = stream
+        self.records = [] if record else None
+        self.output = None
+        self.had_error = False
+        self.had_runtime_error = False
+
+    def reset(self) -> None:
+        self.had_error = False
+        self.had_runtime_error = False
+        if self.records is not None:
+            self.records.clear()
+
+    def report(self, line: int, where: str, message: str) -> None:
+        self._emit(Diagnostic(line, where, message))
+        self.had_error = True
+
+    def error(self, location: Union[int, Token], message: str) -> None:
+        if isinstance(location, int):
+            self.report(location, "", message)
+        elif isinstance(location, Token):
+            if location.type == TokenType.EOF:
+                self.report(location.line, " at end", message)
+            else:
+                self.report(location.line, f" at '{location.lexeme}'",
+                            message)
+
+    def runtime_error(self, err: LoxRuntimeError) -> None:
+        self._emit(Diagnostic(err.token.line, "", str(err), runtime=True))
+        self.had_runtime_error = True
+
+    def _emit(self, diagnostic: Diagnostic) -> None:
+        if self.output is not None:
+            self.output.flush()
+        stream = self._stream if self._stream is not None else sys.stderr
+        print(diagnostic, file=stream)
+        if self.records is not None:
+            if len(self.records) >= RECORD_LIMIT:
+                del self.records[0]
+            self.records.append(diagnostic)
+
+
+class GlobalDiagnostics(Diagnostics):
+    """The process-wide sink behind lox.error, backed by lox.s_had_error."""
+
+    def __init__(self) -> None:
+        super().__init__(record=False)
+
+    @property
+    def had_error(self) -> bool:
+        return lox.s_had_error
+
+    @had_error.setter
+    def had_error(self, value: bool) -> None:
+        lox.s_had_error = value
+
+    @property
+    def had_runtime_error(self) -> bool:
+        return lox.s_had_runtime_error
+
+    @had_runtime_error.setter
+    def had_runtime_error(self, value: bool) -> None:
+        lox.s_had_runtime_error = value
+
+
+GLOBAL_DIAGNOSTICS = GlobalDiagnostics()
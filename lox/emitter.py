@@ -0,0 +1,251 @@
+import argparse
+import re
+import sys
+from typing import Iterable, Iterator, List, Optional, Pattern, Sequence, TextIO, Tuple
+
+from lox.diagnostics import Diagnostics
+from lox.regex_scanner import RegexScanner
+from lox.syntax_facts import KIND_COUNT, SEPARATORS
+from lox.token import Token
+from lox.token_type import TokenType
+
+# Emitters hand out their text in pieces of about this many tokens.
+BATCH_SIZE = 1 << 12
+
+EOF = TokenType.EOF.value
+STRING = TokenType.STRING.value
+MINUS = TokenType.MINUS.value
+OPENING = frozenset((TokenType.LEFT_PAREN.value, TokenType.LEFT_BRACE.value))
+CLOSING = frozenset((TokenType.RIGHT_PAREN.value, TokenType.RIGHT_BRACE.value))
+
+# Tokens after which a '-' subtracts rather than negates.
+_OPERAND_ENDS = frozenset(type.value for type in (
+    TokenType.RIGHT_PAREN,
+    TokenType.IDENTIFIER,
+    TokenType.STRING,
+    TokenType.NUMBER,
+    TokenType.FALSE,
+    TokenType.NIL,
+    TokenType.THIS,
+    TokenType.TRUE,
+))
+_NO_SPACE_AFTER = (TokenType.LEFT_PAREN, TokenType.BANG, TokenType.DOT)
+_NO_SPACE_BEFORE = (TokenType.RIGHT_PAREN, TokenType.COMMA,
+                    TokenType.SEMICOLON, TokenType.DOT)
+_CALLEES = (TokenType.IDENTIFIER, TokenType.RIGHT_PAREN, TokenType.THIS)
+
+# A negating '-' is looked up under this extra kind code.
+UNARY_MINUS = KIND_COUNT
+
+
+def _pretty_space(left: int, right: int) -> str:
+    if left == UNARY_MINUS or right == EOF:
+        return ""
+    if SEPARATORS[left * KIND_COUNT + right]:
+        return " "
+    left_type = TokenType(left)
+    right_type = TokenType(right)
+    if left_type in _NO_SPACE_AFTER or right_type in _NO_SPACE_BEFORE:
+        return ""
+    if right_type == TokenType.LEFT_PAREN and left_type in _CALLEES:
+        return ""
+    return " "
+
+
+# PRETTY_SPACES[left * KIND_COUNT + right] is what pretty output puts
+# between two tokens on the same line.
+PRETTY_SPACES = tuple(
+    _pretty_space(left, right) if left and right else ""
+    for left in range(UNARY_MINUS + 1) for right in range(KIND_COUNT))
+
+
+def minify(tokens: Iterable[Token], keep_lines: bool = False) -> Iterator[str]:
+    """Yields compact source that scans back to the same tokens.
+
+    With `keep_lines`, tokens that started a new line still do.
+    """
+    separators = SEPARATORS
+    stride = KIND_COUNT
+    pieces: List[str] = []
+    append = pieces.append
+    previous = EOF
+    last_line = 0
+    for token in tokens:
+        kind = token.type.value
+        if kind == EOF:
+            break
+        if keep_lines:
+            line = token.line
+            if kind == STRING:
+                line -= token.lexeme.count("\n")
+            if line != last_line and previous != EOF:
+                append("\n")
+                previous = EOF
+            last_line = token.line
+        append(separators[previous * stride + kind])
+        append(token.lexeme)
+        previous = kind
+        if len(pieces) >= BATCH_SIZE:
+            yield "".join(pieces)
+            pieces.clear()
+    if keep_lines and previous != EOF:
+        append("\n")
+    if pieces:
+        yield "".join(pieces)
+
+
+def prettify(tokens: Iterable[Token], indent: str = "    ") -> Iterator[str]:
+    """Yields the tokens respaced in a consistent style, without comments.
+
+    Line breaks are kept, and continuation lines are indented by how many
+    brackets are open.
+    """
+    return _prettify(((token.type.value, token.lexeme, token.line)
+                      for token in tokens), indent)
+
+
+def prettify_source(source: str,
+                    indent: str = "    ",
+                    diagnostics: Optional[Diagnostics] = None) -> str:
+    """`prettify` for a whole source string, without building Tokens."""
+    buffer = RegexScanner(source, diagnostics).scan_buffer()
+    lexemes = map(source.__getitem__, map(slice, buffer.starts, buffer.ends))
+    return "".join(
+        _prettify(zip(buffer.kinds, lexemes, buffer.lines), indent))
+
+
+def _prettify(entries: Iterable[Tuple[int, str, int]],
+              indent: str) -> Iterator[str]:
+    """The loop behind `prettify`, over (kind code, lexeme, line)."""
+    spaces = PRETTY_SPACES
+    stride = KIND_COUNT
+    operand_ends = _OPERAND_ENDS
+    pieces: List[str] = []
+    append = pieces.append
+    previous = EOF
+    last_line = 0
+    depth = 0
+    for kind, lexeme, line in entries:
+        if kind == EOF:
+            break
+        start_line = line
+        if kind == STRING:
+            start_line -= lexeme.count("\n")
+        if kind in CLOSING and depth:
+            depth -= 1
+        if start_line != last_line:
+            if previous != EOF:
+                append("\n\n" if start_line > last_line + 1 else "\n")
+            append(indent * depth)
+        else:
+            append(spaces[previous * stride + kind])
+        append(lexeme)
+        last_line = line
+        if kind in OPENING:
+            depth += 1
+        if kind == MINUS and previous not in operand_ends:
+            kind = UNARY_MINUS
+        previous = kind
+        if len(pieces) >= BATCH_SIZE:
+            yield "".join(pieces)
+            pieces.clear()
+    if previous != EOF:
+        append("\n")
+    if pieces:
+        yield "".join(pieces)
+
+
+# Strings are copied as they are and comments dropped; both are matched in
+# one pass so that neither is mistaken for the other.
+_LITERALS = re.compile(r'("[^"]*"?)|//[^\n]*')
+_LINE_BREAKS = re.compile(r"\n[ \t\r\n]*")
+_DELETE_SPACES = str.maketrans("", "", " \t\r\n")
+_DELETE_LINE_SPACES = str.maketrans("", "", " \t\r")
+
+
+def _kept_spaces(space: str) -> Pattern[str]:
+    """Runs of `space` between characters that SEPARATORS keeps apart."""
+    return re.compile(
+        rf"""
+        {space} (?<=[A-Za-z0-9_!=<>/.].)
+        (?: (?<=[A-Za-z0-9_].) {space}* (?=[A-Za-z0-9_])
+          | (?<=[!=<>].) {space}* (?==)
+          | (?<=/.) {space}* (?=/)
+          | (?<=[0-9].) {space}* (?=\.)
+          | (?<=[0-9]\..) {space}* (?=[0-9])
+        )""", re.VERBOSE | re.DOTALL)
+
+
+_KEPT_SPACES = _kept_spaces(r"[ \t\r\n]")
+_KEPT_LINE_SPACES = _kept_spaces(r"[ \t\r]")
+
+
+def _minify_code(code: str, keep_lines: bool) -> str:
+    if keep_lines:
+        code = _LINE_BREAKS.sub("\n", code)
+        pieces = _KEPT_LINE_SPACES.split(code)
+        return " ".join([piece.translate(_DELETE_LINE_SPACES)
+                         for piece in pieces])
+    pieces = _KEPT_SPACES.split(code)
+    return " ".join([piece.translate(_DELETE_SPACES) for piece in pieces])
+
+
+def minify_source(source: str, keep_lines: bool = False) -> str:
+    """`minify` for a whole source string, by regex instead of scanning.
+
+    The source is not checked, and a space may be kept that `minify` drops.
+    """
+    parts = _LITERALS.split(source)
+    minified = []
+    code = []
+    for index, part in enumerate(parts):
+        if index % 2 == 0:
+            code.append(part)
+        elif part is not None:
+            minified.append(_minify_code("".join(code), keep_lines))
+            minified.append(part)
+            code = []
+    minified.append(_minify_code("".join(code), keep_lines))
+    if not keep_lines:
+        return "".join(minified)
+    minified[0] = minified[0].lstrip("\n")
+    minified[-1] = minified[-1].rstrip("\n")
+    text = "".join(minified)
+    return text + "\n" if text else text
+
+
+def main(argv: Optional[Sequence[str]] = None,
+         output: TextIO = sys.stdout) -> int:
+    parser = argparse.ArgumentParser(prog="python -m lox.emitter")
+    parser.add_argument("script", help="script to rewrite ('-' for stdin)")
+    style = parser.add_mutually_exclusive_group()
+    style.add_argument("--minify",
+                       action="store_true",
+                       help="drop every space the tokens do not need")
+    style.add_argument("--pretty",
+                       action="store_true",
+                       help="respace the tokens consistently (the default)")
+    parser.add_argument("--keep-lines",
+                        action="store_true",
+                        help="with --minify, keep tokens on their own lines")
+    args = parser.parse_args(argv)
+
+    diagnostics = Diagnostics(sys.stderr)
+    try:
+        source = sys.stdin if args.script == "-" else open(args.script)
+        with source:
+            text = source.read()
+    except OSError as e:
+        print(f"lox.py: {e}", file=sys.stderr)
+        return 66
+    if args.minify:
+        # Minifying does not check the script, so it can skip scanning.
+        output.write(minify_source(text, args.keep_lines))
+    else:
+        output.write(prettify_source(text, diagnostics=diagnostics))
+    output.flush()
+    return 65 if diagnostics.had_error else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,513 @@
+import io
+from bisect import bisect_right
+from copy import copy
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+from lox.diagnostics import GLOBAL_DIAGNOSTICS, Diagnostics
+from lox.parser import BINARY_PRECEDENCE, PREFIX_BINDING_POWERS, Parser
+from lox.regex_scanner import LOOKAHEAD, OPERATORS, TOKEN_PATTERN
+from lox.scanner import KEYWORDS
+from lox.token import Token
+from lox.token_type import TokenType
+
+# Nodes that always sit in an operand slot on their own, so any one of them
+# can replace any other without changing how the tokens around it parse.
+PRIMARY_EXPRESSIONS = (LiteralExpression, VariableExpression,
+                       GroupingExpression)
+
+# The source is kept in chunks of about this many characters, so an edit
+# copies one chunk rather than the whole text, and is rescanned through a
+# window that starts this small and doubles until a match fits.
+TEXT_CHUNK_SIZE = 1 << 14
+SCAN_WINDOW = 1 << 10
+
+_ENTER, _TOKEN, _EXIT = range(3)
+
+
+@dataclass
+class EditStatistics:
+    """How much of the document one edit scanned and parsed again."""
+    rescanned: int = 0
+    reparsed: int = 0
+    full_reparse: bool = False
+
+
+class IncrementalDocument:
+    """Source text that stays scanned and parsed while it is edited.
+
+    An edit is rescanned from the last token it cannot have changed until
+    the new tokens line up with the old ones again, and the tokens after it
+    are moved to their new lines. The tree is then patched by reparsing the
+    smallest part of it that parses the same way on its own: a literal,
+    variable or parenthesized group, or an operator swapped for one of the
+    same precedence. Any other edit parses the whole document again.
+
+    Patched nodes are updated in place, but `expression` is a new object
+    after every edit so that caches keyed by the root see a new tree.
+    """
+    expression: Optional[Expression]
+    statistics: EditStatistics
+    _chunks: List[str]
+    _chunk_starts: List[int]
+    _source: Optional[str]
+    _length: int
+    _tokens: List[Token]
+    # Token start offsets. Those from `_gap` on are stored relative to the
+    # end of the source, so an edit only moves the ones between the
+    # previous edit and this one.
+    _starts: List[int]
+    _gap: int
+    _errors: List[int]
+    # The node each token belongs to, or None outside the tree.
+    _owners: List[Optional[Expression]]
+    _parents: Dict[int, Optional[Expression]]
+    _widths: Dict[int, int]
+    _diagnostics: Diagnostics
+    _scratch: Diagnostics
+
+    def __init__(self,
+                 source: str = "",
+                 diagnostics: Optional[Diagnostics] = None):
+        self.expression = None
+        self.statistics = EditStatistics()
+        self._chunks = [""]
+        self._chunk_starts = [0]
+        self._source = ""
+        self._length = 0
+        self._tokens = [Token(TokenType.EOF, "", None, 1)]
+        self._starts = [0]
+        self._gap = 1
+        self._errors = []
+        self._owners = [None]
+        self._parents = {}
+        self._widths = {}
+        self._diagnostics = (diagnostics if diagnostics is not None else
+                             GLOBAL_DIAGNOSTICS)
+        # Trial parses of part of the document report nothing.
+        self._scratch = Diagnostics(io.StringIO(), record=False)
+        self.edit(0, 0, source)
+
+    @property
+    def source(self) -> str:
+        if self._source is None:
+            self._source = "".join(self._chunks)
+        return self._source
+
+    @property
+    def tokens(self) -> Sequence[Token]:
+        """The current tokens, ending with EOF. Do not modify them."""
+        return self._tokens
+
+    @property
+    def had_error(self) -> bool:
+        return bool(self._errors) or self.expression is None
+
+    def token_offset(self, index: int) -> int:
+        """Where the token at `index` starts in the source."""
+        if index < 0:
+            index += len(self._tokens)
+        return self._start(index)
+
+    def edit(self, offset: int, removed: int, inserted: str) -> None:
+        """Replaces `removed` characters at `offset` with `inserted`."""
+        if not 0 <= offset <= offset + removed <= self._length:
+            raise ValueError(f"edit {offset}+{removed} outside the source")
+        self.statistics = EditStatistics()
+        self._edit_text(offset, removed, inserted)
+        first, last, tokens, starts, shift = self._rescan(
+            offset, removed, len(inserted))
+
+        changed = bool(tokens) or first < last
+        anchor = None
+        if changed and self.expression is not None:
+            anchor = self._anchor(first, last)
+        replaced = self._tokens[first:last]
+        self._splice(first, last, tokens, starts, shift,
+                     len(inserted) - removed)
+
+        if self.expression is None or changed and (
+                anchor is None or not self._patch(anchor, first, last,
+                                                  replaced, len(tokens))):
+            self._parse_all()
+        if self.expression is not None:
+            self._renew_root()
+
+    def _edit_text(self, offset: int, removed: int, inserted: str) -> None:
+        chunks = self._chunks
+        chunk_starts = self._chunk_starts
+        first = bisect_right(chunk_starts, offset) - 1
+        last = bisect_right(chunk_starts, offset + removed) - 1
+        start = chunk_starts[first]
+        text = "".join(chunks[first:last + 1])
+        text = (text[:offset - start] + inserted +
+                text[offset + removed - start:])
+        if len(text) > 2 * TEXT_CHUNK_SIZE:
+            pieces = [
+                text[i:i + TEXT_CHUNK_SIZE]
+                for i in range(0, len(text), TEXT_CHUNK_SIZE)
+            ]
+        elif text or len(chunks) == last + 1 - first:
+            pieces = [text]
+        else:
+            pieces = []
+        chunks[first:last + 1] = pieces
+        del chunk_starts[first:]
+        for chunk in chunks[first:]:
+            chunk_starts.append(start)
+            start += len(chunk)
+        self._source = None
+
+    def _text(self, start: int, end: int) -> str:
+        chunks = self._chunks
+        chunk_starts = self._chunk_starts
+        index = bisect_right(chunk_starts, start) - 1
+        pieces = []
+        while start < end and index < len(chunks):
+            base = chunk_starts[index]
+            pieces.append(chunks[index][start - base:end - base])
+            start = base + len(chunks[index])
+            index += 1
+        return "".join(pieces)
+
+    def _matches(self, position: int,
+                 length: int) -> Iterator[Tuple[str, int, str]]:
+        """Yields the kind, start and text of each match from `position`.
+
+        Like `stream_tokens`, a match that might run on past the end of the
+        window is scanned again from a larger window.
+        """
+        size = SCAN_WINDOW
+        while True:
+            text = self._text(position, position + size)
+            final = position + len(text) >= length
+            limit = len(text) if final else len(text) - LOOKAHEAD
+            for match in TOKEN_PATTERN.finditer(text):
+                if match.end() > limit:
+                    position += match.start()
+                    size *= 2
+                    break
+                yield match.lastgroup, position + match.start(), match.group()
+            else:
+                return
+
+    def _rescan(self, offset: int, removed: int,
+                inserted: int) -> Tuple[int, int, List[Token], List[int], int]:
+        """Scans the edited region of the new text.
+
+        Returns the range of old tokens to replace, the tokens and offsets
+        replacing them and how many lines the tokens after them moved.
+        """
+        delta = inserted - removed
+        edit_end = offset + inserted
+        # A token ending within LOOKAHEAD characters of the edit might have
+        # scanned differently had the edit been there already.
+        before = self._index_at(offset - LOOKAHEAD)
+        while before >= 0 and self._end(before) + LOOKAHEAD > offset:
+            before -= 1
+        position = self._end(before) if before >= 0 else 0
+        line = self._tokens[before].line if before >= 0 else 1
+        first = before + 1
+
+        tokens: List[Token] = []
+        starts: List[int] = []
+        errors: List[int] = []
+        last = len(self._tokens) - 1
+        old = first
+        for kind, start, lexeme in self._matches(position,
+                                                 self._length + delta):
+            if kind == "SPACE":
+                line += lexeme.count("\n")
+                continue
+            if kind == "COMMENT":
+                continue
+            if start >= edit_end:
+                # Past the edit, scanning is back in step with the old
+                # tokens once a token starts where one started before.
+                while self._start(old) < start - delta:
+                    old += 1
+                if self._start(old) == start - delta:
+                    last = old
+                    break
+            if kind == "OPERATOR":
+                token = Token(OPERATORS[lexeme], lexeme, None, line)
+            elif kind == "NUMBER":
+                token = Token(TokenType.NUMBER, lexeme, float(lexeme), line)
+            elif kind == "IDENTIFIER":
+                token = Token(KEYWORDS.get(lexeme, TokenType.IDENTIFIER),
+                              lexeme, None, line)
+            elif kind == "STRING":
+                line += lexeme.count("\n")
+                token = Token(TokenType.STRING, lexeme, lexeme[1:-1], line)
+            else:
+                if kind == "UNTERMINATED":
+                    line += lexeme.count("\n")
+                    self._diagnostics.error(line, "Unterminated string.")
+                else:
+                    self._diagnostics.error(line, "Unexpected character.")
+                errors.append(start)
+                continue
+            tokens.append(token)
+            starts.append(start)
+
+        shift = line - self._line_before(last)
+        boundary = self._start(last)
+        self._errors = ([error for error in self._errors if error < position]
+                        + errors + [
+                            error + delta
+                            for error in self._errors if error >= boundary
+                        ])
+        self.statistics.rescanned = len(tokens)
+        # Tokens rescanned in front of the edit usually come out unchanged.
+        same = 0
+        while (same < len(tokens) and first + same < last
+               and starts[same] == self._start(first + same)
+               and tokens[same] == self._tokens[first + same]):
+            same += 1
+        return first + same, last, tokens[same:], starts[same:], shift
+
+    def _splice(self, first: int, last: int, tokens: List[Token],
+                starts: List[int], shift: int, delta: int) -> None:
+        self._move_gap(first)
+        self._length += delta
+        self._starts[first:last] = [start - self._length for start in starts]
+
+        if shift:
+            # Tokens carry absolute lines, so every token after a change in
+            # the number of lines is replaced, in the tree as well.
+            owners = self._owners
+            moved = self._tokens[last:]
+            for index, token in enumerate(moved):
+                moved[index] = relined = Token(token.type, token.lexeme,
+                                               token.literal,
+                                               token.line + shift)
+                owner = owners[last + index]
+                if isinstance(owner, VariableExpression):
+                    owner.name = relined
+                elif isinstance(owner, (BinaryExpression, UnaryExpression)):
+                    owner.operator = relined
+            self._tokens[last:] = moved
+        self._tokens[first:last] = tokens
+        self._owners[first:last] = [None] * len(tokens)
+
+    def _anchor(self, first: int,
+                last: int) -> Optional[Tuple[Expression, int]]:
+        """The node owning the first token of the edit, or the one before
+        an insertion."""
+        index = first if first < last or first == 0 else first - 1
+        owner = self._owners[index]
+        if owner is None:
+            return None
+        if isinstance(owner, BinaryExpression):
+            return owner, index - self._widths[id(owner.left)]
+        if (isinstance(owner, GroupingExpression)
+                and self._tokens[index].type == TokenType.RIGHT_PAREN):
+            return owner, index - self._widths[id(owner)] + 1
+        return owner, index
+
+    def _patch(self, anchor: Tuple[Expression, int], first: int, last: int,
+               replaced: List[Token], inserted: int) -> bool:
+        """Reparses the smallest subtree around the edit that stands alone.
+
+        `anchor` and the spans walked from it are in old token positions;
+        the edit replaced old tokens [first, last) with `inserted` tokens.
+        """
+        grown = inserted - (last - first)
+        node, start = anchor
+        while True:
+            end = start + self._widths[id(node)]
+            if start <= first and last <= end:
+                if isinstance(node, (BinaryExpression, UnaryExpression)):
+                    if (inserted == 1 and len(replaced) == 1
+                            and node.operator is replaced[0]
+                            and self._swap_operator(node, first)):
+                        return True
+                elif (isinstance(node, GroupingExpression) and start < first
+                      and last <= end - 1):
+                    inner = self._parse_range(start + 1, end - 1 + grown)
+                    if inner is None:
+                        return False
+                    self._replace(node, GroupingExpression(inner), start, end,
+                                  grown)
+                    return True
+                else:
+                    expr = self._parse_range(start, end + grown)
+                    if expr is None:
+                        return False
+                    if isinstance(expr, PRIMARY_EXPRESSIONS):
+                        self._replace(node, expr, start, end, grown)
+                        return True
+
+            parent = self._parents[id(node)]
+            if parent is None:
+                return False
+            if isinstance(parent, BinaryExpression) and parent.right is node:
+                start -= self._widths[id(parent.left)] + 1
+            elif not isinstance(parent, BinaryExpression):
+                start -= 1
+            node = parent
+
+    def _swap_operator(self, node: Expression, index: int) -> bool:
+        operator = self._tokens[index]
+        if isinstance(node, BinaryExpression):
+            precedence = BINARY_PRECEDENCE
+            swapped = BinaryExpression(node.left, operator, node.right)
+        else:
+            precedence = PREFIX_BINDING_POWERS
+            swapped = UnaryExpression(operator, node.right)
+        if precedence.get(operator.type) != precedence[node.operator.type]:
+            return False
+        parent = self._parents.pop(id(node))
+        self._parents[id(swapped)] = parent
+        self._widths[id(swapped)] = self._widths.pop(id(node))
+        for child in _children(swapped):
+            self._parents[id(child)] = swapped
+        self._owners[index] = swapped
+        self._attach(parent, node, swapped)
+        return True
+
+    def _replace(self, node: Expression, expr: Expression, start: int,
+                 end: int, grown: int) -> None:
+        parent = self._parents[id(node)]
+        self._forget(node)
+        self._index(expr, parent, start)
+        self._attach(parent, node, expr)
+        if grown:
+            while parent is not None:
+                self._widths[id(parent)] += grown
+                parent = self._parents[id(parent)]
+
+    def _attach(self, parent: Optional[Expression], node: Expression,
+                expr: Expression) -> None:
+        if parent is None:
+            self.expression = expr
+        elif isinstance(parent, BinaryExpression):
+            if parent.left is node:
+                parent.left = expr
+            else:
+                parent.right = expr
+        elif isinstance(parent, UnaryExpression):
+            parent.right = expr
+        elif isinstance(parent, GroupingExpression):
+            parent.expression = expr
+
+    def _parse_range(self, start: int, end: int) -> Optional[Expression]:
+        """Parses tokens [start, end), or returns None if they do not
+        make exactly one expression."""
+        tokens = self._tokens[start:end]
+        self.statistics.reparsed += len(tokens)
+        line = tokens[-1].line if tokens else 1
+        stream = iter(tokens + [Token(TokenType.EOF, "", None, line)])
+        expr = Parser(stream, diagnostics=self._scratch, pratt=True).parse()
+        if next(stream, None) is not None:
+            return None
+        return expr
+
+    def _parse_all(self) -> None:
+        self.statistics.reparsed = len(self._tokens)
+        self.statistics.full_reparse = True
+        self._owners = [None] * len(self._tokens)
+        self._parents.clear()
+        self._widths.clear()
+        self.expression = Parser(self._tokens,
+                                 diagnostics=self._diagnostics,
+                                 pratt=True).parse()
+        if self.expression is not None:
+            self._index(self.expression, None, 0)
+
+    def _renew_root(self) -> None:
+        root = self.expression
+        renewed = copy(root)
+        self._parents.pop(id(root))
+        self._parents[id(renewed)] = None
+        width = self._widths.pop(id(root))
+        self._widths[id(renewed)] = width
+        for child in _children(renewed):
+            self._parents[id(child)] = renewed
+        # The root starts at the first token.
+        if isinstance(root, BinaryExpression):
+            owned = (self._widths[id(root.left)], )
+        elif isinstance(root, GroupingExpression):
+            owned = (0, width - 1)
+        else:
+            owned = (0, )
+        for index in owned:
+            self._owners[index] = renewed
+        self.expression = renewed
+
+    def _index(self, expr: Expression, parent: Optional[Expression],
+               start: int) -> None:
+        """Records parents, widths and token owners for a new subtree."""
+        owners = self._owners
+        position = start
+        stack: List[Tuple[int, Expression, object]] = [(_ENTER, expr, parent)]
+        while stack:
+            action, node, extra = stack.pop()
+            if action == _TOKEN:
+                owners[position] = node
+                position += 1
+            elif action == _EXIT:
+                self._widths[id(node)] = position - extra
+            else:
+                self._parents[id(node)] = extra
+                stack.append((_EXIT, node, position))
+                if isinstance(node, BinaryExpression):
+                    stack += ((_ENTER, node.right, node),
+                              (_TOKEN, node, None), (_ENTER, node.left, node))
+                elif isinstance(node, UnaryExpression):
+                    stack += ((_ENTER, node.right, node), (_TOKEN, node, None))
+                elif isinstance(node, GroupingExpression):
+                    stack += ((_TOKEN, node, None),
+                              (_ENTER, node.expression, node),
+                              (_TOKEN, node, None))
+                else:
+                    stack.append((_TOKEN, node, None))
+
+    def _forget(self, expr: Expression) -> None:
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            del self._parents[id(node)]
+            del self._widths[id(node)]
+            stack.extend(_children(node))
+
+    def _index_at(self, offset: int) -> int:
+        """The last token starting at or before `offset`, or -1."""
+        index = bisect_right(self._starts, offset, 0, self._gap)
+        if index == self._gap:
+            index = bisect_right(self._starts, offset - self._length,
+                                 self._gap, len(self._starts))
+        return index - 1
+
+    def _start(self, index: int) -> int:
+        if index < self._gap:
+            return self._starts[index]
+        return self._starts[index] + self._length
+
+    def _end(self, index: int) -> int:
+        return self._start(index) + len(self._tokens[index].lexeme)
+
+    def _line_before(self, index: int) -> int:
+        # Only strings span lines, and a token carries its last line.
+        token = self._tokens[index]
+        return token.line - token.lexeme.count("\n")
+
+    def _move_gap(self, index: int) -> None:
+        starts = self._starts
+        length = self._length
+        for i in range(index, self._gap):
+            starts[i] -= length
+        for i in range(self._gap, index):
+            starts[i] += length
+        self._gap = index
+
+
+def _children(expr: Expression) -> Tuple[Expression, ...]:
+    if isinstance(expr, BinaryExpression):
+        return expr.left, expr.right
+    if isinstance(expr, UnaryExpression):
+        return (expr.right, )
+    if isinstance(expr, GroupingExpression):
+        return (expr.expression, )
+    return ()
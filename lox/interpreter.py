@@ -1,109 +1,232 @@
-from typing import cast
-
-import lox
-from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression
-from lox.runtime_error import LoxRuntimeError
-from lox.token import Token
-from lox.token_type import TokenType
-from lox.object import LoxObject
-
-
-def is_truthy(value: object) -> bool:
-    return value is not None and value != False
-
-
-class Interpreter(Expression.Visitor):
-
-    def interpret(self, expr: Expression) -> None:
-        try:
-            value = self._evaluate(expr)
-            print(str(value))
-        except LoxRuntimeError as e:
-            lox.runtime_error(e)
-
-    def visit_LiteralExpression(self, expr: LiteralExpression) -> LoxObject:
-        return LoxObject(expr.value)
-
-    def visit_GroupingExpression(self, expr: GroupingExpression) -> LoxObject:
-        return self._evaluate(expr.expression)
-
-    def visit_UnaryExpression(self, expr: UnaryExpression) -> LoxObject:
-        right = self._evaluate(expr.right).value
-
-        if expr.operator.type == TokenType.BANG:
-            return LoxObject(not is_truthy(right))
-        elif expr.operator.type == TokenType.MINUS:
-            self._check_number_operand(expr.operator, right)
-            right = cast(float, right)
-            return LoxObject(-right)
-
-        raise RuntimeError("this was supposed to be unreachable")
-
-    def visit_BinaryExpression(self, expr: BinaryExpression) -> LoxObject:
-        left = self._evaluate(expr.left).value
-        right = self._evaluate(expr.right).value
-
-        if expr.operator.type == TokenType.GREATER:
-            self._check_number_operands(expr.operator, left, right)
-            left = cast(float, left)
-            right = cast(float, right)
-            return LoxObject(left > right)
-        elif expr.operator.type == TokenType.GREATER_EQUAL:
-            self._check_number_operands(expr.operator, left, right)
-            left = cast(float, left)
-            right = cast(float, right)
-            return LoxObject(left >= right)
-        if expr.operator.type == TokenType.LESS:
-            self._check_number_operands(expr.operator, left, right)
-            left = cast(float, left)
-            right = cast(float, right)
-            return LoxObject(left < right)
-        elif expr.operator.type == TokenType.LESS_EQUAL:
-            self._check_number_operands(expr.operator, left, right)
-            left = cast(float, left)
-            right = cast(float, right)
-            return LoxObject(left <= right)
-        elif expr.operator.type == TokenType.MINUS:
-            self._check_number_operands(expr.operator, left, right)
-            left = cast(float, left)
-            right = cast(float, right)
-            return LoxObject(left - right)
-        elif expr.operator.type == TokenType.SLASH:
-            self._check_number_operands(expr.operator, left, right)
-            left = cast(float, left)
-            right = cast(float, right)
-            return LoxObject(left / right)
-        elif expr.operator.type == TokenType.STAR:
-            self._check_number_operands(expr.operator, left, right)
-            left = cast(float, left)
-            right = cast(float, right)
-            return LoxObject(left * right)
-        elif expr.operator.type == TokenType.PLUS:
-            if isinstance(left, float) and isinstance(right, float):
-                return LoxObject(left + right)
-            elif isinstance(left, str) and isinstance(right, str):
-                return LoxObject(left + right)
-            else:
-                raise LoxRuntimeError(
-                    expr.operator,
-                    "Operands must be two numbers or two strings.")
-        elif expr.operator.type == TokenType.EQUAL_EQUAL:
-            return LoxObject(left == right)
-        elif expr.operator.type == TokenType.BANG_EQUAL:
-            return LoxObject(left != right)
-
-        raise RuntimeError("this was supposed to be unreachable")
-
-    def _evaluate(self, expr: Expression) -> LoxObject:
-        return self.visit(expr)
-
-    def _check_number_operand(self, operator: Token, operand: object):
-        if isinstance(operand, float):
-            return
-        raise LoxRuntimeError(operator, "Operand must be a number.")
-
-    def _check_number_operands(self, operator: Token, left: object,
-                               right: object):
-        if isinstance(left, float) and isinstance(right, float):
-            return
-        raise LoxRuntimeError(operator, "Operands must be numbers.")
+import sys
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, TextIO, Tuple, cast
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+from lox.runtime_error import LoxRuntimeError
+from lox.token import Token
+from lox.token_type import TokenType
+from lox.object import divide, format_value, is_truthy
+from lox.diagnostics import GLOBAL_DIAGNOSTICS, Diagnostics
+
+# The closure compiler is imported when closures are first asked for.
+if TYPE_CHECKING:
+    from lox.closure_compiler import ClosureCompiler
+
+COMPILED_CACHE_SIZE = 256
+
+
+class Interpreter(Expression.Visitor):
+    environment: Dict[str, object]
+    _diagnostics: Diagnostics
+    _output: Optional[TextIO]
+    _closure_compiler: Optional["ClosureCompiler"]
+    _compiled: Dict[int, Tuple[Expression, Callable[[], object]]]
+    memoize: bool
+    memo_hits: int
+
+    def __init__(self,
+                 closures: bool = False,
+                 environment: Optional[Dict[str, object]] = None,
+                 diagnostics: Optional[Diagnostics] = None,
+                 output: Optional[TextIO] = None,
+                 memoize: bool = False):
+        self.environment = environment if environment is not None else {}
+        self._diagnostics = (diagnostics if diagnostics is not None else
+                             GLOBAL_DIAGNOSTICS)
+        self._output = output
+        self._closure_compiler = None
+        if closures:
+            from lox.closure_compiler import ClosureCompiler
+            self._closure_compiler = ClosureCompiler(self.environment)
+        self._compiled = {}
+        self.memoize = memoize
+        self.memo_hits = 0
+
+    def interpret(self, expr: Expression) -> None:
+        try:
+            if self._closure_compiler is not None:
+                value = self._compiled_closure(expr)()
+            else:
+                value = self._evaluate(expr)
+            output = self._output if self._output is not None else sys.stdout
+            output.write(format_value(value) + "\n")
+        except LoxRuntimeError as e:
+            self._diagnostics.runtime_error(e)
+
+    def compile(self, expr: Expression) -> Callable[[], object]:
+        compiler = self._closure_compiler
+        if compiler is None:
+            from lox.closure_compiler import ClosureCompiler
+            compiler = ClosureCompiler(self.environment)
+        return compiler.compile(expr)
+
+    def _compiled_closure(self, expr: Expression) -> Callable[[], object]:
+        # Expressions are unhashable dataclasses, so cache them by identity
+        # and keep the expression alive to stop its id from being reused.
+        try:
+            cached_expr, closure = self._compiled[id(expr)]
+            if cached_expr is expr:
+                return closure
+        except KeyError:
+            pass
+        if len(self._compiled) >= COMPILED_CACHE_SIZE:
+            self._compiled.clear()
+        closure = self.compile(expr)
+        self._compiled[id(expr)] = (expr, closure)
+        return closure
+
+    def visit_LiteralExpression(self, expr: LiteralExpression) -> object:
+        return expr.value
+
+    def visit_GroupingExpression(self, expr: GroupingExpression) -> object:
+        return self._evaluate(expr.expression)
+
+    def visit_VariableExpression(self, expr: VariableExpression) -> object:
+        try:
+            return self.environment[expr.name.lexeme]
+        except KeyError:
+            raise LoxRuntimeError(expr.name,
+                                  f"Undefined variable '{expr.name.lexeme}'.")
+
+    def visit_UnaryExpression(self, expr: UnaryExpression) -> object:
+        return self._unary(expr.operator, self._evaluate(expr.right))
+
+    def visit_BinaryExpression(self, expr: BinaryExpression) -> object:
+        return self._binary(expr.operator, self._evaluate(expr.left),
+                            self._evaluate(expr.right))
+
+    def _unary(self, operator: Token, right: object) -> object:
+        if operator.type == TokenType.BANG:
+            return not is_truthy(right)
+        elif operator.type == TokenType.MINUS:
+            self._check_number_operand(operator, right)
+            right = cast(float, right)
+            return -right
+
+        raise RuntimeError("this was supposed to be unreachable")
+
+    def _binary(self, operator: Token, left: object, right: object) -> object:
+        if operator.type == TokenType.GREATER:
+            self._check_number_operands(operator, left, right)
+            left = cast(float, left)
+            right = cast(float, right)
+            return left > right
+        elif operator.type == TokenType.GREATER_EQUAL:
+            self._check_number_operands(operator, left, right)
+            left = cast(float, left)
+            right = cast(float, right)
+            return left >= right
+        if operator.type == TokenType.LESS:
+            self._check_number_operands(operator, left, right)
+            left = cast(float, left)
+            right = cast(float, right)
+            return left < right
+        elif operator.type == TokenType.LESS_EQUAL:
+            self._check_number_operands(operator, left, right)
+            left = cast(float, left)
+            right = cast(float, right)
+            return left <= right
+        elif operator.type == TokenType.MINUS:
+            self._check_number_operands(operator, left, right)
+            left = cast(float, left)
+            right = cast(float, right)
+            return left - right
+        elif operator.type == TokenType.SLASH:
+            self._check_number_operands(operator, left, right)
+            left = cast(float, left)
+            right = cast(float, right)
+            return divide(left, right)
+        elif operator.type == TokenType.STAR:
+            self._check_number_operands(operator, left, right)
+            left = cast(float, left)
+            right = cast(float, right)
+            return left * right
+        elif operator.type == TokenType.PLUS:
+            if isinstance(left, float) and isinstance(right, float):
+                return left + right
+            elif isinstance(left, str) and isinstance(right, str):
+                return left + right
+            else:
+                raise LoxRuntimeError(
+                    operator,
+                    "Operands must be two numbers or two strings.")
+        elif operator.type == TokenType.EQUAL_EQUAL:
+            return left == right
+        elif operator.type == TokenType.BANG_EQUAL:
+            return left != right
+
+        raise RuntimeError("this was supposed to be unreachable")
+
+    def _evaluate(self, expr: Expression) -> object:
+        if self.memoize:
+            return self._evaluate_shared(expr)
+        # A post-order walk over an explicit stack, so deep trees do not hit
+        # the recursion limit. A None on `pending` means the operator node
+        # beneath it has its operands on top of `values`.
+        values: List[object] = []
+        pending: List[Optional[Expression]] = [expr]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                node = pending.pop()
+                if isinstance(node, BinaryExpression):
+                    right = values.pop()
+                    values[-1] = self._binary(node.operator, values[-1],
+                                              right)
+                else:
+                    values[-1] = self._unary(node.operator, values[-1])
+            elif isinstance(node, LiteralExpression):
+                values.append(node.value)
+            elif isinstance(node, BinaryExpression):
+                pending.extend((node, None, node.right, node.left))
+            elif isinstance(node, GroupingExpression):
+                pending.append(node.expression)
+            elif isinstance(node, UnaryExpression):
+                pending.extend((node, None, node.right))
+            else:
+                values.append(self.visit(node))
+        return values[0]
+
+    def _evaluate_shared(self, expr: Expression) -> object:
+        # Like `_evaluate`, but remembers each operator node's value for the
+        # rest of this evaluation, so subtrees shared by a hash-consed tree
+        # are evaluated once.
+        memo: Dict[int, object] = {}
+        values: List[object] = []
+        pending: List[Optional[Expression]] = [expr]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                node = pending.pop()
+                if isinstance(node, BinaryExpression):
+                    right = values.pop()
+                    values[-1] = self._binary(node.operator, values[-1],
+                                              right)
+                else:
+                    values[-1] = self._unary(node.operator, values[-1])
+                memo[id(node)] = values[-1]
+            elif isinstance(node, LiteralExpression):
+                values.append(node.value)
+            elif id(node) in memo:
+                self.memo_hits += 1
+                values.append(memo[id(node)])
+            elif isinstance(node, BinaryExpression):
+                pending.extend((node, None, node.right, node.left))
+            elif isinstance(node, GroupingExpression):
+                pending.append(node.expression)
+            elif isinstance(node, UnaryExpression):
+                pending.extend((node, None, node.right))
+            else:
+                values.append(self.visit(node))
+        return values[0]
+
+    def _check_number_operand(self, operator: Token, operand: object):
+        if isinstance(operand, float):
+            return
+        raise LoxRuntimeError(operator, "Operand must be a number.")
+
+    def _check_number_operands(self, operator: Token, left: object,
+                               right: object):
+        if isinstance(left, float) and isinstance(right, float):
+            return
+        raise LoxRuntimeError(operator, "Operands must be numbers.")
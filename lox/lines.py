@@ -0,0 +1,118 @@
+import json
+import time
+from dataclasses import dataclass
+from typing import Iterable, TextIO
+
+from lox.diagnostics import Diagnostics
+from lox.parser import Parser
+from lox.regex_scanner import RegexScanner
+from lox.runtime_error import LoxRuntimeError
+from lox.session import LoxSession
+
+FORMATS = ("text", "json")
+
+
+class _LastWrite:
+    """A sink that keeps only the text most recently written to it."""
+    text: str
+
+    def __init__(self) -> None:
+        self.text = ""
+
+    def write(self, text: str) -> int:
+        self.text = text
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+@dataclass
+class LineStatistics:
+    lines: int = 0
+    results: int = 0
+    errors: int = 0
+    runtime_errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+    @property
+    def exit_code(self) -> int:
+        if self.errors:
+            return 65
+        if self.runtime_errors:
+            return 70
+        return 0
+
+
+def run_lines(lines: Iterable[str],
+              output: TextIO,
+              backend: str = "tree",
+              optimize: bool = False,
+              format: str = "text") -> LineStatistics:
+    """Evaluates each line of `lines` as an expression of its own.
+
+    For every line, its result or its first error is written to `output`
+    with the line number, as `<line>\\t<result>` or `<line>\\terror...`
+    for "text" and as one JSON object for "json". Blank and comment-only
+    lines produce nothing. Only the current line is held
+    in memory.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"unknown format {format!r}")
+    result = _LastWrite()
+    diagnostics = Diagnostics(_LastWrite())
+    session = LoxSession(backend,
+                         optimize,
+                         output=result,
+                         diagnostics=diagnostics)
+    records = diagnostics.records
+    statistics = LineStatistics()
+    write = output.write
+    start = time.perf_counter()
+
+    for number, line in enumerate(lines, 1):
+        statistics.lines = number
+        if diagnostics.had_error or diagnostics.had_runtime_error:
+            diagnostics.reset()
+        try:
+            tokens = RegexScanner(line, diagnostics).scan_tokens()
+            if len(tokens) == 1 and not records:
+                continue
+            expr = Parser(tokens, diagnostics=diagnostics,
+                          pratt=True).parse_to_end()
+            if not records:
+                if optimize:
+                    expr = session.optimizer.optimize(expr)
+                session.evaluate(expr)
+        except LoxRuntimeError as e:
+            diagnostics.runtime_error(e)
+
+        where = ""
+        failure = None
+        if records:
+            where, failure = records[0].where, records[0].message
+            if records[0].runtime:
+                statistics.runtime_errors += 1
+            else:
+                statistics.errors += 1
+        if failure is not None:
+            if format == "json":
+                error = f"Error{where}: {failure}" if where else failure
+                write(json.dumps({"line": number, "error": error}) + "\n")
+            else:
+                write(f"{number}\terror{where}: {failure}\n")
+        else:
+            statistics.results += 1
+            if format == "json":
+                write(json.dumps({"line": number,
+                                  "value": result.text[:-1]}) + "\n")
+            else:
+                write(f"{number}\t{result.text}")
+
+    statistics.seconds = time.perf_counter() - start
+    return statistics
+
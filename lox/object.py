@@ -1,15 +1,49 @@
-from typing import Optional
-
-
-class LoxObject:
-    value: Optional[object]
-
-    def __init__(self, obj: Optional[object]):
-        self.value = obj
-
-    def __str__(self) -> str:
-        if self.value is None:
-            return "nil"
-        if isinstance(self.value, float):
-            return str(self.value).replace(".0", "")
-        return str(self.value)
+import math
+from typing import Optional
+
+
+def is_truthy(value: object) -> bool:
+    return value is not None and value != False
+
+
+def divide(left: float, right: float) -> float:
+    """Lox division, which follows IEEE rules: x / 0 is inf, -inf or nan."""
+    try:
+        return left / right
+    except ZeroDivisionError:
+        if left == 0 or left != left:
+            return math.nan
+        return math.copysign(math.inf, left) * math.copysign(1.0, right)
+
+
+def format_number(value: float) -> str:
+    """Formats a Lox number, dropping the fraction of whole numbers."""
+    text = repr(value)
+    if text[-2:] == ".0":
+        return text[:-2]
+    return text
+
+
+def format_value(value: object) -> str:
+    """How a native Lox value is printed."""
+    if value is None:
+        return "nil"
+    if isinstance(value, float):
+        return format_number(value)
+    return str(value)
+
+
+class LoxObject:
+    """A boxed Lox value.
+
+    The backends work on native values and only format them on output; this
+    wrapper is kept for callers that want a value that prints like Lox.
+    """
+    __slots__ = ("value", )
+    value: Optional[object]
+
+    def __init__(self, obj: Optional[object]):
+        self.value = obj
+
+    def __str__(self) -> str:
+        return format_value(self.value)
@@ -0,0 +1,265 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, LiteralExpression, UnaryExpression, VariableExpression
+from lox.closure_compiler import ClosureCompiler
+from lox.runtime_error import LoxRuntimeError
+from lox.token_type import TokenType
+
+NUMERIC_RESULT_OPERATORS = (TokenType.MINUS, TokenType.STAR, TokenType.SLASH)
+
+BOOLEAN_RESULT_OPERATORS = (
+    TokenType.BANG_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+)
+
+
+def _operands(expr: Expression) -> Tuple[Expression, ...]:
+    if isinstance(expr, BinaryExpression):
+        return (expr.left, expr.right)
+    if isinstance(expr, GroupingExpression):
+        return (expr.expression, )
+    if isinstance(expr, UnaryExpression):
+        return (expr.right, )
+    return ()
+
+
+def count_nodes(expr: Expression) -> int:
+    """The number of nodes in `expr`, counting a shared subtree each time.
+
+    The walk uses an explicit stack, so deep trees do not hit the
+    recursion limit, and counts each distinct node once, so a hash-consed
+    tree takes time in proportion to its distinct nodes.
+    """
+    counts: Dict[int, int] = {}
+    pending = [expr]
+    while pending:
+        node = pending[-1]
+        if id(node) in counts:
+            pending.pop()
+            continue
+        operands = _operands(node)
+        missing = [
+            operand for operand in operands if id(operand) not in counts
+        ]
+        if missing:
+            pending.extend(missing)
+            continue
+        pending.pop()
+        counts[id(node)] = 1 + sum(counts[id(operand)] for operand in operands)
+    return counts[id(expr)]
+
+
+def static_type(expr: Expression) -> Optional[type]:
+    """The type `expr` evaluates to whenever it does not raise, if known."""
+    # Only groupings and '+' depend on their operands. Their chains are
+    # followed over an explicit stack, so deep trees do not hit the
+    # recursion limit; a None on `pending` means the '+' beneath it has
+    # the types of its operands on top of `types`. Each '+' is typed once,
+    # however often a hash-consed tree shares it.
+    known: Dict[int, Optional[type]] = {}
+    types: List[Optional[type]] = []
+    pending: List[Optional[Expression]] = [expr]
+    while pending:
+        node = pending.pop()
+        if node is None:
+            node = pending.pop()
+            right = types.pop()
+            left = types.pop()
+            types.append(left if left in (float, str) and right == left else
+                         None)
+            known[id(node)] = types[-1]
+        elif isinstance(node, LiteralExpression):
+            types.append(type(node.value))
+        elif isinstance(node, GroupingExpression):
+            pending.append(node.expression)
+        elif isinstance(node, UnaryExpression):
+            minus = node.operator.type == TokenType.MINUS
+            types.append(float if minus else bool)
+        elif isinstance(node, BinaryExpression):
+            if node.operator.type in NUMERIC_RESULT_OPERATORS:
+                types.append(float)
+            elif node.operator.type in BOOLEAN_RESULT_OPERATORS:
+                types.append(bool)
+            elif id(node) in known:
+                types.append(known[id(node)])
+            else:
+                pending.extend((node, None, node.right, node.left))
+        else:
+            types.append(None)
+    return types[0]
+
+
+def is_literal(expr: Expression, value: object) -> bool:
+    return (isinstance(expr, LiteralExpression)
+            and type(expr.value) is type(value) and expr.value == value)
+
+
+class Pass(Expression.Visitor):
+    """Rebuilds a tree bottom-up; subclasses rewrite the nodes they know.
+
+    `run` rebuilds the operands of a node before the node itself, and
+    hands each node to its visit method with its operands already
+    rewritten. The walk uses an explicit stack, so deep trees do not hit
+    the recursion limit.
+    """
+
+    def run(self, expr: Expression) -> Expression:
+        # A None on `pending` means the node beneath it has its rewritten
+        # operands on top of `values`. Rewrites are remembered by the id of
+        # the original node, so a subtree shared by a hash-consed tree is
+        # rewritten once and stays shared.
+        rewritten: Dict[int, Expression] = {}
+        values: List[Expression] = []
+        pending: List[Optional[Expression]] = [expr]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                original = pending.pop()
+                if isinstance(original, BinaryExpression):
+                    right = values.pop()
+                    node = BinaryExpression(values.pop(), original.operator,
+                                            right)
+                elif isinstance(original, GroupingExpression):
+                    node = GroupingExpression(values.pop())
+                else:
+                    node = UnaryExpression(original.operator, values.pop())
+                node = self.visit(node)
+                rewritten[id(original)] = node
+                values.append(node)
+            elif id(node) in rewritten:
+                values.append(rewritten[id(node)])
+            elif isinstance(node, BinaryExpression):
+                pending.extend((node, None, node.right, node.left))
+            elif isinstance(node, GroupingExpression):
+                pending.extend((node, None, node.expression))
+            elif isinstance(node, UnaryExpression):
+                pending.extend((node, None, node.right))
+            else:
+                values.append(self.visit(node))
+        return values[0]
+
+    def visit_BinaryExpression(self, expr: BinaryExpression) -> Expression:
+        return expr
+
+    def visit_GroupingExpression(self,
+                                 expr: GroupingExpression) -> Expression:
+        return expr
+
+    def visit_LiteralExpression(self, expr: LiteralExpression) -> Expression:
+        return expr
+
+    def visit_UnaryExpression(self, expr: UnaryExpression) -> Expression:
+        return expr
+
+    def visit_VariableExpression(self,
+                                 expr: VariableExpression) -> Expression:
+        return expr
+
+
+class GroupingElimination(Pass):
+
+    def visit_GroupingExpression(self,
+                                 expr: GroupingExpression) -> Expression:
+        return expr.expression
+
+
+class ConstantFolding(Pass):
+    """Evaluates operators whose operands are all literals.
+
+    Anything that raises while folding is left in place so the error
+    still happens at run time, on the operator's line.
+    """
+
+    def visit_BinaryExpression(self, expr: BinaryExpression) -> Expression:
+        return self._fold(expr)
+
+    def visit_UnaryExpression(self, expr: UnaryExpression) -> Expression:
+        return self._fold(expr)
+
+    def visit_GroupingExpression(self,
+                                 expr: GroupingExpression) -> Expression:
+        if isinstance(expr.expression, LiteralExpression):
+            return expr.expression
+        return expr
+
+    def _fold(self, expr: Expression) -> Expression:
+        operands = ((expr.left, expr.right) if isinstance(
+            expr, BinaryExpression) else (expr.right, ))
+        if not all(isinstance(operand, LiteralExpression)
+                   for operand in operands):
+            return expr
+        try:
+            return LiteralExpression(ClosureCompiler().compile(expr)())
+        except LoxRuntimeError:
+            return expr
+
+
+class AlgebraicSimplification(Pass):
+    """Drops double negations and operations with identity elements.
+
+    A rewrite is only made when the operand's static type guarantees the
+    removed operator could not have raised, and the identity is exact for
+    every value of that type (so `x + 0` is kept, as it turns -0 into 0).
+    """
+
+    def visit_UnaryExpression(self, expr: UnaryExpression) -> Expression:
+        inner = expr.right
+        while isinstance(inner, GroupingExpression):
+            inner = inner.expression
+        if (isinstance(inner, UnaryExpression)
+                and inner.operator.type == expr.operator.type):
+            wanted = float if expr.operator.type == TokenType.MINUS else bool
+            if static_type(inner.right) == wanted:
+                return inner.right
+        return expr
+
+    def visit_BinaryExpression(self, expr: BinaryExpression) -> Expression:
+        left, right = expr.left, expr.right
+        operator = expr.operator.type
+
+        if operator in (TokenType.MINUS, TokenType.STAR, TokenType.SLASH):
+            if static_type(left) == float:
+                if operator == TokenType.MINUS and is_literal(right, 0.0):
+                    return left
+                if operator != TokenType.MINUS and is_literal(right, 1.0):
+                    return left
+            if (operator == TokenType.STAR and is_literal(left, 1.0)
+                    and static_type(right) == float):
+                return right
+        elif operator == TokenType.PLUS:
+            if is_literal(right, "") and static_type(left) == str:
+                return left
+            if is_literal(left, "") and static_type(right) == str:
+                return right
+        return expr
+
+
+DEFAULT_PASSES = (GroupingElimination, ConstantFolding, AlgebraicSimplification)
+
+
+class Optimizer:
+    passes: Iterable[Pass]
+    eliminated: Dict[str, int]
+
+    def __init__(self, passes: Optional[Iterable[Pass]] = None):
+        if passes is None:
+            passes = [pass_() for pass_ in DEFAULT_PASSES]
+        self.passes = list(passes)
+        self.eliminated = {type(pass_).__name__: 0 for pass_ in self.passes}
+
+    @property
+    def total_eliminated(self) -> int:
+        return sum(self.eliminated.values())
+
+    def optimize(self, expr: Expression) -> Expression:
+        count = count_nodes(expr)
+        for pass_ in self.passes:
+            expr = pass_.run(expr)
+            new_count = count_nodes(expr)
+            self.eliminated[type(pass_).__name__] += count - new_count
+            count = new_count
+        return expr
@@ -0,0 +1,83 @@
+import atexit
+import weakref
+from time import monotonic
+from typing import BinaryIO, List, Optional
+
+BUFFER_SIZE = 1 << 16
+FLUSH_INTERVAL = 1.0
+
+# Outputs not closed yet, flushed at exit. The set holds them weakly, so an
+# output that is dropped is not kept alive until then.
+_open_outputs: "weakref.WeakSet[BufferedOutput]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_outputs() -> None:
+    for output in list(_open_outputs):
+        output.flush()
+
+
+class BufferedOutput:
+    """A text sink that batches writes into one binary stream.
+
+    Pending text is encoded and written out once `buffer_size` characters
+    have built up, on the first write `flush_interval` seconds after the
+    last flush, on `flush` or `close`, and when the interpreter exits.
+    """
+    encoding: str
+    buffer_size: int
+    flush_interval: Optional[float]
+    _stream: BinaryIO
+    _pending: List[str]
+    _size: int
+    _last_flush: float
+    _closed: bool
+
+    def __init__(self,
+                 stream: BinaryIO,
+                 buffer_size: int = BUFFER_SIZE,
+                 flush_interval: Optional[float] = FLUSH_INTERVAL,
+                 encoding: str = "utf-8"):
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._stream = stream
+        self._pending = []
+        self._size = 0
+        self._last_flush = monotonic()
+        self._closed = False
+        _open_outputs.add(self)
+
+    def write(self, text: str) -> int:
+        if self._closed:
+            raise ValueError("write to closed BufferedOutput")
+        self._pending.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size or (
+                self.flush_interval is not None
+                and monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        self._last_flush = monotonic()
+        if not self._pending:
+            return
+        data = "".join(self._pending).encode(self.encoding)
+        self._pending = []
+        self._size = 0
+        self._stream.write(data)
+        self._stream.flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        _open_outputs.discard(self)
+
+    def __enter__(self) -> "BufferedOutput":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,155 +1,264 @@
-from typing import Tuple
-
-import lox
-from lox.token import Token
-from lox.token_type import TokenType
-from lox.ast import (
-    BinaryExpression,
-    Expression,
-    GroupingExpression,
-    LiteralExpression,
-    UnaryExpression,
-)
-
-
-class Parser:
-    _tokens: Tuple[Token, ...]
-    _current: int
-
-    class ParseError(Exception):
-        pass
-
-    def __init__(self, tokens: Tuple[Token, ...]):
-        self._tokens = tokens
-        self._current = 0
-
-    def parse(self):
-        try:
-            return self._expression()
-        except Parser.ParseError:
-            return None
-
-    def _expression(self) -> Expression:
-        return self._equality()
-
-    def _equality(self) -> Expression:
-        expr = self._comparison()
-        while self._match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self._previous()
-            right = self._comparison()
-            expr = BinaryExpression(expr, operator, right)
-
-        return expr
-
-    def _comparison(self) -> Expression:
-        expr = self._term()
-        while self._match(
-                TokenType.GREATER,
-                TokenType.GREATER_EQUAL,
-                TokenType.LESS,
-                TokenType.LESS_EQUAL,
-        ):
-            operator = self._previous()
-            right = self._term()
-            expr = BinaryExpression(expr, operator, right)
-
-        return expr
-
-    def _term(self) -> Expression:
-        expr = self._factor()
-        while self._match(TokenType.MINUS, TokenType.PLUS):
-            operator = self._previous()
-            right = self._factor()
-            expr = BinaryExpression(expr, operator, right)
-
-        return expr
-
-    def _factor(self) -> Expression:
-        expr = self._unary()
-        while self._match(TokenType.SLASH, TokenType.STAR):
-            operator = self._previous()
-            right = self._unary()
-            expr = BinaryExpression(expr, operator, right)
-
-        return expr
-
-    def _unary(self) -> Expression:
-        if self._match(TokenType.BANG, TokenType.MINUS):
-            operator = self._previous()
-            right = self._unary()
-            return UnaryExpression(operator, right)
-
-        return self._primary()
-
-    def _primary(self) -> Expression:
-        if self._match(TokenType.FALSE):
-            return LiteralExpression(False)
-        if self._match(TokenType.TRUE):
-            return LiteralExpression(True)
-        if self._match(TokenType.NIL):
-            return LiteralExpression(None)
-        if self._match(TokenType.NUMBER, TokenType.STRING):
-            return LiteralExpression(self._previous().literal)
-        if self._match(TokenType.LEFT_PAREN):
-            expr = self._expression()
-            self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return GroupingExpression(expr)
-        raise self._error(self._peek(), "Expect expression.")
-
-    def _match(self, *types) -> bool:
-        for type in types:
-            if self._check(type):
-                self._advance()
-                return True
-
-        return False
-
-    def _consume(self, type: TokenType, message: str) -> Token:
-        if self._check(type):
-            return self._advance()
-
-        raise self._error(self._peek(), message)
-
-    def _error(self, token: Token, message: str) -> ParseError:
-        lox.error(token, message)
-        return Parser.ParseError()
-
-    def _check(self, type: TokenType) -> bool:
-        if self._at_end():
-            return False
-        return self._peek().type == type
-
-    def _advance(self) -> Token:
-        if not self._at_end():
-            self._current += 1
-        return self._previous()
-
-    def _at_end(self) -> bool:
-        return self._peek().type == TokenType.EOF
-
-    def _peek(self) -> Token:
-        return self._tokens[self._current]
-
-    def _previous(self) -> Token:
-        return self._tokens[self._current - 1]
-
-    def _synchronize(self) -> None:
-        self._advance()
-
-        while not self._at_end():
-            if self._previous().type == TokenType.SEMICOLON:
-                return
-
-            if self._peek() in (
-                    TokenType.CLASS,
-                    TokenType.FUN,
-                    TokenType.VAR,
-                    TokenType.FOR,
-                    TokenType.IF,
-                    TokenType.WHILE,
-                    TokenType.PRINT,
-                    TokenType.RETURN,
-            ):
-                return
-
-            self._advance()
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lox.diagnostics import GLOBAL_DIAGNOSTICS, Diagnostics
+from lox.token import Token
+from lox.token_type import TokenType
+from lox.ast import Expression
+from lox.ast.factory import NodeFactory
+
+# Open parentheses bind looser and prefix operators tighter than any binary
+# operator.
+GROUP_PRECEDENCE = 0
+UNARY_PRECEDENCE = 5
+
+# Every operator's precedence as a prefix and as an infix (binary) operator.
+# All binary operators associate to the left.
+OPERATORS: Dict[TokenType, Tuple[Optional[int], Optional[int]]] = {
+    TokenType.BANG_EQUAL: (None, 1),
+    TokenType.EQUAL_EQUAL: (None, 1),
+    TokenType.GREATER: (None, 2),
+    TokenType.GREATER_EQUAL: (None, 2),
+    TokenType.LESS: (None, 2),
+    TokenType.LESS_EQUAL: (None, 2),
+    TokenType.MINUS: (UNARY_PRECEDENCE, 3),
+    TokenType.PLUS: (None, 3),
+    TokenType.SLASH: (None, 4),
+    TokenType.STAR: (None, 4),
+    TokenType.BANG: (UNARY_PRECEDENCE, None),
+}
+
+BINARY_PRECEDENCE = {
+    type: infix
+    for type, (_, infix) in OPERATORS.items() if infix is not None
+}
+
+# Binding powers for the Pratt parser. An infix operator binds a little
+# tighter to its right than to its left, which makes it left-associative.
+# An open parenthesis holds its contents with the weakest binding power.
+INFIX_BINDING_POWERS = {
+    type: (2 * infix, 2 * infix + 1)
+    for type, infix in BINARY_PRECEDENCE.items()
+}
+PREFIX_BINDING_POWERS = {
+    type: 2 * prefix + 1
+    for type, (prefix, _) in OPERATORS.items() if prefix is not None
+}
+PREFIX_BINDING_POWERS[TokenType.LEFT_PAREN] = 2 * GROUP_PRECEDENCE
+
+LITERAL_TOKENS = frozenset((TokenType.NUMBER, TokenType.STRING))
+CONSTANT_TOKENS = {
+    TokenType.FALSE: False,
+    TokenType.TRUE: True,
+    TokenType.NIL: None,
+}
+
+
+class Parser:
+    # Only the current and previous tokens are kept, so the token stream
+    # can be a lazy iterator as well as a tuple.
+    _tokens: Iterator[Token]
+    _current: Token
+    _previous: Optional[Token]
+    _factory: NodeFactory
+    _diagnostics: Diagnostics
+    _pratt: bool
+
+    class ParseError(Exception):
+        pass
+
+    def __init__(self,
+                 tokens: Iterable[Token],
+                 factory: Optional[NodeFactory] = None,
+                 diagnostics: Optional[Diagnostics] = None,
+                 pratt: bool = False):
+        self._tokens = iter(tokens)
+        self._current = next(self._tokens)
+        self._previous = None
+        self._factory = factory if factory is not None else NodeFactory()
+        self._diagnostics = (diagnostics if diagnostics is not None else
+                             GLOBAL_DIAGNOSTICS)
+        self._pratt = pratt
+
+    def parse(self):
+        try:
+            if self._pratt:
+                return self._factory.finish(self._pratt_expression())
+            return self._factory.finish(self._expression())
+        except Parser.ParseError:
+            return None
+
+    def parse_to_end(self):
+        """Like `parse`, but the expression has to use up every token."""
+        expr = self.parse()
+        if expr is not None and not self._at_end():
+            self._error(self._current, "Expect end of expression.")
+            return None
+        return expr
+
+    def _pratt_expression(self) -> Expression:
+        # A Pratt parser driven by the binding power tables. Like
+        # `_expression`, it keeps pending operators on an explicit stack and
+        # builds the same nodes in the same order, but it dispatches on the
+        # token type directly and keeps the token stream in locals.
+        factory = self._factory
+        tokens = self._tokens
+        current = self._current
+        previous = self._previous
+        # (binding power, left operand, operator) for each open operator.
+        pending: List[Tuple[int, Any, Token]] = []
+        try:
+            while True:
+                type = current.type
+                power = PREFIX_BINDING_POWERS.get(type)
+                while power is not None:
+                    pending.append((power, None, current))
+                    previous = current
+                    current = next(tokens)
+                    type = current.type
+                    power = PREFIX_BINDING_POWERS.get(type)
+
+                if type in LITERAL_TOKENS:
+                    expr = factory.literal(current.literal)
+                elif type in CONSTANT_TOKENS:
+                    expr = factory.literal(CONSTANT_TOKENS[type])
+                elif type == TokenType.IDENTIFIER:
+                    expr = factory.variable(current)
+                else:
+                    raise self._error(current, "Expect expression.")
+                previous = current
+                current = next(tokens)
+
+                while True:
+                    powers = INFIX_BINDING_POWERS.get(current.type)
+                    left_power = powers[0] if powers is not None else 0
+                    while pending and pending[-1][0] > left_power:
+                        power, left, operator = pending.pop()
+                        if left is None:
+                            expr = factory.unary(operator, expr)
+                        else:
+                            expr = factory.binary(left, operator, expr)
+                    if powers is not None:
+                        pending.append((powers[1], expr, current))
+                        previous = current
+                        current = next(tokens)
+                        break
+
+                    if not pending:
+                        return expr
+                    if current.type != TokenType.RIGHT_PAREN:
+                        raise self._error(current,
+                                          "Expect ')' after expression.")
+                    pending.pop()
+                    expr = factory.grouping(expr)
+                    previous = current
+                    current = next(tokens)
+        finally:
+            self._current = current
+            self._previous = previous
+
+    def _expression(self) -> Expression:
+        # Operator precedence parsing over an explicit stack, so nesting
+        # depth is not limited by Python's recursion limit. Nodes are built
+        # in the same order as by recursive descent.
+        factory = self._factory
+        pending: List[Tuple[int, Any, Token]] = []
+        while True:
+            while True:
+                if self._match(TokenType.BANG, TokenType.MINUS):
+                    pending.append((UNARY_PRECEDENCE, None, self._previous))
+                elif self._match(TokenType.LEFT_PAREN):
+                    pending.append((GROUP_PRECEDENCE, None, self._previous))
+                else:
+                    break
+            expr = self._primary()
+
+            while True:
+                while pending and pending[-1][0] == UNARY_PRECEDENCE:
+                    expr = factory.unary(pending.pop()[2], expr)
+
+                precedence = BINARY_PRECEDENCE.get(self._peek().type)
+                if precedence is not None:
+                    while pending and pending[-1][0] >= precedence:
+                        _, left, operator = pending.pop()
+                        expr = factory.binary(left, operator, expr)
+                    pending.append((precedence, expr, self._advance()))
+                    break
+
+                while pending and pending[-1][0] > GROUP_PRECEDENCE:
+                    _, left, operator = pending.pop()
+                    expr = factory.binary(left, operator, expr)
+                if not pending:
+                    return expr
+                self._consume(TokenType.RIGHT_PAREN,
+                              "Expect ')' after expression.")
+                pending.pop()
+                expr = factory.grouping(expr)
+
+    def _primary(self) -> Expression:
+        if self._match(TokenType.FALSE):
+            return self._factory.literal(False)
+        if self._match(TokenType.TRUE):
+            return self._factory.literal(True)
+        if self._match(TokenType.NIL):
+            return self._factory.literal(None)
+        if self._match(TokenType.NUMBER, TokenType.STRING):
+            return self._factory.literal(self._previous.literal)
+        if self._match(TokenType.IDENTIFIER):
+            return self._factory.variable(self._previous)
+        raise self._error(self._peek(), "Expect expression.")
+
+    def _match(self, *types) -> bool:
+        for type in types:
+            if self._check(type):
+                self._advance()
+                return True
+
+        return False
+
+    def _consume(self, type: TokenType, message: str) -> Token:
+        if self._check(type):
+            return self._advance()
+
+        raise self._error(self._peek(), message)
+
+    def _error(self, token: Token, message: str) -> ParseError:
+        self._diagnostics.error(token, message)
+        return Parser.ParseError()
+
+    def _check(self, type: TokenType) -> bool:
+        if self._at_end():
+            return False
+        return self._peek().type == type
+
+    def _advance(self) -> Token:
+        if not self._at_end():
+            self._previous = self._current
+            self._current = next(self._tokens)
+        return self._previous
+
+    def _at_end(self) -> bool:
+        return self._current.type == TokenType.EOF
+
+    def _peek(self) -> Token:
+        return self._current
+
+    def _synchronize(self) -> None:
+        self._advance()
+
+        while not self._at_end():
+            if self._previous.type == TokenType.SEMICOLON:
+                return
+
+            if self._peek() in (
+                    TokenType.CLASS,
+                    TokenType.FUN,
+                    TokenType.VAR,
+                    TokenType.FOR,
+                    TokenType.IF,
+                    TokenType.WHILE,
+                    TokenType.PRINT,
+                    TokenType.RETURN,
+            ):
+                return
+
+            self._advance()
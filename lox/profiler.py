@@ -0,0 +1,200 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from time import perf_counter_ns
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from lox.ast import BinaryExpression, Expression, GroupingExpression, UnaryExpression
+from lox.interpreter import Interpreter
+from lox.token_type import TokenType
+
+
+@dataclass
+class ProfileEntry:
+    calls: int = 0
+    self_ns: int = 0
+    cumulative_ns: int = 0
+
+
+class EvaluationProfile:
+    """Counts and times per node class, operator and source line.
+
+    Cumulative time is only counted for the outermost active evaluation of
+    a key, so nested nodes of the same kind are not counted twice.
+    """
+    by_node: Dict[str, ProfileEntry]
+    by_operator: Dict[TokenType, ProfileEntry]
+    by_line: Dict[int, ProfileEntry]
+    _paths: Dict[Tuple[int, str], int]
+    _path_frames: List[Tuple[int, str]]
+    _path_ns: Counter
+
+    def __init__(self) -> None:
+        self.by_node = defaultdict(ProfileEntry)
+        self.by_operator = defaultdict(ProfileEntry)
+        self.by_line = defaultdict(ProfileEntry)
+        self._paths = {}
+        self._path_frames = []
+        self._path_ns = Counter()
+
+    @property
+    def stacks(self) -> Counter:
+        """Self time in nanoseconds per stack of frames, outermost first."""
+        stacks: Counter = Counter()
+        for path, self_ns in self._path_ns.items():
+            frames = []
+            while path >= 0:
+                path, frame = self._path_frames[path]
+                frames.append(frame)
+            stacks[tuple(reversed(frames))] += self_ns
+        return stacks
+
+    def path(self, parent: int, frame: str) -> int:
+        """Returns the id of stack `parent` plus `frame`; -1 is no stack."""
+        key = (parent, frame)
+        path = self._paths.get(key)
+        if path is None:
+            path = self._paths[key] = len(self._path_frames)
+            self._path_frames.append(key)
+        return path
+
+    def add_stack_time(self, path: int, self_ns: int) -> None:
+        self._path_ns[path] += self_ns
+
+    def print_table(self, file: TextIO, top: int = 10) -> None:
+        sections = (
+            ("node", dict(self.by_node)),
+            ("operator", {
+                type.name: entry
+                for type, entry in self.by_operator.items()
+            }),
+            ("line", {
+                str(line): entry
+                for line, entry in self.by_line.items()
+            }),
+        )
+        for title, entries in sections:
+            ranked = sorted(entries.items(),
+                            key=lambda item: item[1].self_ns,
+                            reverse=True)[:top]
+            print(f"{title:<24} {'calls':>10} {'self ms':>12} {'cum ms':>12}",
+                  file=file)
+            for name, entry in ranked:
+                print(f"{name:<24} {entry.calls:>10} "
+                      f"{entry.self_ns / 1e6:>12.3f} "
+                      f"{entry.cumulative_ns / 1e6:>12.3f}",
+                      file=file)
+            print(file=file)
+
+    def write_collapsed(self, file: TextIO) -> None:
+        """Writes `frame;frame;frame microseconds` lines for flamegraph.pl."""
+        for stack, self_ns in sorted(self.stacks.items()):
+            print(f"{';'.join(stack)} {self_ns // 1000}", file=file)
+
+
+def frame_name(expr: Expression) -> str:
+    operator = getattr(expr, "operator", None)
+    name = type(expr).__name__
+    if operator is not None:
+        return f"{name}({operator.lexeme})"
+    return name
+
+
+class ProfilingInterpreter(Interpreter):
+    """An Interpreter that records an EvaluationProfile as it evaluates.
+
+    The plain Interpreter is left untouched, so profiling costs nothing
+    unless this class is used. Each node is timed from the moment the walk
+    reaches it until its value is known, and closure compilation is
+    disabled.
+    """
+    profile: EvaluationProfile
+    _paths: List[int]
+    _lines: List[int]
+    _child_ns: List[int]
+    _active: Counter
+    _open: List[Tuple[List[ProfileEntry], List[int], int]]
+
+    def __init__(self, profile: Optional[EvaluationProfile] = None, **kwargs):
+        kwargs["closures"] = False
+        super().__init__(**kwargs)
+        self.profile = profile if profile is not None else EvaluationProfile()
+        self._paths = []
+        self._lines = []
+        self._child_ns = []
+        self._active = Counter()
+        self._open = []
+
+    def _evaluate(self, expr: Expression) -> object:
+        # The same post-order walk as Interpreter._evaluate, with every node
+        # entered when it is reached and exited once its value is known.
+        # Groupings get a marker too, so that they stay open around their
+        # inner expression.
+        depth = len(self._open)
+        values: List[object] = []
+        pending: List[Optional[Expression]] = [expr]
+        try:
+            while pending:
+                node = pending.pop()
+                if node is None:
+                    node = pending.pop()
+                    if isinstance(node, BinaryExpression):
+                        right = values.pop()
+                        values[-1] = self._binary(node.operator, values[-1],
+                                                  right)
+                    elif isinstance(node, UnaryExpression):
+                        values[-1] = self._unary(node.operator, values[-1])
+                    self._exit()
+                    continue
+                self._enter(node)
+                if isinstance(node, BinaryExpression):
+                    pending.extend((node, None, node.right, node.left))
+                elif isinstance(node, GroupingExpression):
+                    pending.extend((node, None, node.expression))
+                elif isinstance(node, UnaryExpression):
+                    pending.extend((node, None, node.right))
+                else:
+                    values.append(self.visit(node))
+                    self._exit()
+            return values[0]
+        finally:
+            # A runtime error leaves the nodes around it open.
+            while len(self._open) > depth:
+                self._exit()
+
+    def _enter(self, expr: Expression) -> None:
+        operator = getattr(expr, "operator", None)
+        token = operator if operator is not None else getattr(
+            expr, "name", None)
+        # Literals and groupings carry no token; charge their enclosing line.
+        if token is not None:
+            line = token.line
+        else:
+            line = self._lines[-1] if self._lines else 0
+
+        profile = self.profile
+        entries = [profile.by_node[type(expr).__name__], profile.by_line[line]]
+        if operator is not None:
+            entries.append(profile.by_operator[operator.type])
+        keys = [id(entry) for entry in entries]
+
+        parent = self._paths[-1] if self._paths else -1
+        self._paths.append(profile.path(parent, frame_name(expr)))
+        self._lines.append(line)
+        self._child_ns.append(0)
+        self._active.update(keys)
+        self._open.append((entries, keys, perf_counter_ns()))
+
+    def _exit(self) -> None:
+        entries, keys, start = self._open.pop()
+        elapsed = perf_counter_ns() - start
+        self_ns = elapsed - self._child_ns.pop()
+        if self._child_ns:
+            self._child_ns[-1] += elapsed
+        self.profile.add_stack_time(self._paths.pop(), self_ns)
+        self._lines.pop()
+        self._active.subtract(keys)
+        for key, entry in zip(keys, entries):
+            entry.calls += 1
+            entry.self_ns += self_ns
+            if not self._active[key]:
+                entry.cumulative_ns += elapsed
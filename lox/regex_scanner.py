@@ -0,0 +1,192 @@
+import codecs
+import re
+from mmap import mmap
+from typing import BinaryIO, Generator, Iterator, List, Optional, TextIO, Tuple, Union
+
+from lox.diagnostics import GLOBAL_DIAGNOSTICS, Diagnostics
+from lox.scanner import KEYWORDS
+from lox.token import Token
+from lox.token_buffer import TokenBuffer
+from lox.token_type import TokenType
+
+OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+# Alternatives are tried in order, so comments have to come before the
+# slash operator and terminated strings before unterminated ones.
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<SPACE>[ \t\r\n]+)
+  | (?P<COMMENT>//[^\n]*)
+  | (?P<OPERATOR>[!=<>]=?|[(){},.\-+;*/])
+  | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+  | (?P<IDENTIFIER>[A-Za-z_][A-Za-z_0-9]*)
+  | (?P<STRING>"[^"]*")
+  | (?P<UNTERMINATED>"[^"]*)
+  | (?P<UNEXPECTED>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# A number needs to see both a '.' and the digit after it before it knows
+# where it ends; every other token needs at most one character.
+LOOKAHEAD = 2
+
+CHUNK_SIZE = 1 << 16
+
+
+def _scan(source: str, line: int, final: bool,
+          diagnostics: Diagnostics) -> Generator[Token, None, Tuple[int, int]]:
+    """Yields the tokens of `source`, returning where scanning stopped.
+
+    Unless `final` is set, a match that might still grow if more input
+    followed is left unscanned, and its start offset is returned along
+    with the line number at that point.
+    """
+    limit = len(source) if final else len(source) - LOOKAHEAD
+
+    for match in TOKEN_PATTERN.finditer(source):
+        if match.end() > limit:
+            return match.start(), line
+        kind = match.lastgroup
+        if kind == "SPACE":
+            line += source.count("\n", match.start(), match.end())
+        elif kind == "OPERATOR":
+            lexeme = match.group()
+            yield Token(OPERATORS[lexeme], lexeme, None, line)
+        elif kind == "NUMBER":
+            lexeme = match.group()
+            yield Token(TokenType.NUMBER, lexeme, float(lexeme), line)
+        elif kind == "IDENTIFIER":
+            lexeme = match.group()
+            yield Token(KEYWORDS.get(lexeme, TokenType.IDENTIFIER), lexeme,
+                        None, line)
+        elif kind == "STRING":
+            lexeme = match.group()
+            line += lexeme.count("\n")
+            yield Token(TokenType.STRING, lexeme, lexeme[1:-1], line)
+        elif kind == "COMMENT":
+            pass
+        elif kind == "UNTERMINATED":
+            line += source.count("\n", match.start(), match.end())
+            diagnostics.error(line, "Unterminated string.")
+        else:
+            diagnostics.error(line, "Unexpected character.")
+
+    return len(source), line
+
+
+def stream_tokens(
+        file: Union[TextIO, BinaryIO, mmap],
+        chunk_size: int = CHUNK_SIZE,
+        diagnostics: Optional[Diagnostics] = None) -> Iterator[Token]:
+    """Lazily scans a text file, binary file or mmap one chunk at a time.
+
+    Binary input is decoded as UTF-8. Only the current chunk and the
+    unfinished token at its end are held in memory.
+    """
+    if diagnostics is None:
+        diagnostics = GLOBAL_DIAGNOSTICS
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    line = 1
+
+    while True:
+        chunk = file.read(chunk_size)
+        final = not chunk
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = decoder.decode(chunk, final=final)
+        pending += chunk
+        end, line = yield from _scan(pending, line, final, diagnostics)
+        pending = pending[end:]
+        if final:
+            break
+
+    yield Token(TokenType.EOF, "", None, line)
+
+
+class RegexScanner:
+    _source: str
+    _tokens: List[Token]
+    _line: int
+    _diagnostics: Diagnostics
+
+    def __init__(self,
+                 source: str,
+                 diagnostics: Optional[Diagnostics] = None) -> None:
+        self._source = source
+        self._tokens = []
+        self._line = 1
+        self._diagnostics = (diagnostics if diagnostics is not None else
+                             GLOBAL_DIAGNOSTICS)
+
+    def scan_tokens(self) -> Tuple[Token, ...]:
+        self._tokens.extend(self._scan_source())
+        self._tokens.append(Token(TokenType.EOF, "", None, self._line))
+        return tuple(self._tokens)
+
+    def scan_buffer(self) -> TokenBuffer:
+        source = self._source
+        buffer = TokenBuffer(source)
+        kinds = buffer.kinds.append
+        starts = buffer.starts.append
+        ends = buffer.ends.append
+        lines = buffer.lines.append
+        line = self._line
+        error = self._diagnostics.error
+
+        for match in TOKEN_PATTERN.finditer(source):
+            kind = match.lastgroup
+            start, end = match.span()
+            if kind == "SPACE":
+                line += source.count("\n", start, end)
+                continue
+            elif kind == "OPERATOR":
+                type = OPERATORS[match.group()]
+            elif kind == "NUMBER":
+                type = TokenType.NUMBER
+            elif kind == "IDENTIFIER":
+                type = KEYWORDS.get(match.group(), TokenType.IDENTIFIER)
+            elif kind == "STRING":
+                line += source.count("\n", start, end)
+                type = TokenType.STRING
+            elif kind == "COMMENT":
+                continue
+            elif kind == "UNTERMINATED":
+                line += source.count("\n", start, end)
+                error(line, "Unterminated string.")
+                continue
+            else:
+                error(line, "Unexpected character.")
+                continue
+            kinds(type.value)
+            starts(start)
+            ends(end)
+            lines(line)
+
+        self._line = line
+        buffer.append(TokenType.EOF, len(source), len(source), line)
+        return buffer
+
+    def _scan_source(self) -> Iterator[Token]:
+        _, self._line = yield from _scan(self._source, self._line, True,
+                                         self._diagnostics)
@@ -1,8 +1,8 @@
-from lox.token import Token
-
-
-class LoxRuntimeError(RuntimeError):
-
-    def __init__(self, token: Token, message: str):
-        super(message)
-        self.token = token
+from lox.token import Token
+
+
+class LoxRuntimeError(RuntimeError):
+
+    def __init__(self, token: Token, message: str):
+        super().__init__(message)
+        self.token = token
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import io
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from lox.diagnostics import Diagnostics
+from lox.runtime_error import LoxRuntimeError
+from lox.session import BACKENDS, LoxSession
+
+DEFAULT_MAX_PENDING = 64
+LINE_LIMIT = 16 << 20
+
+
+def evaluate_request(source: str, backend: str = "tree",
+                     optimize: bool = False) -> Dict[str, Any]:
+    output = io.StringIO()
+    diagnostics = Diagnostics(io.StringIO())
+    session = LoxSession(backend,
+                         optimize,
+                         output=output,
+                         diagnostics=diagnostics)
+    session.run(source)
+    return {
+        "output": output.getvalue(),
+        "diagnostics": [{
+            "line": diagnostic.line,
+            "where": diagnostic.where,
+            "message": diagnostic.message,
+            "runtime": diagnostic.runtime,
+        } for diagnostic in diagnostics.records or []],
+        "exit_code": session.exit_code,
+    }
+
+
+class LoxServer:
+    """Evaluates JSON-lines requests on a bounded pool of workers.
+
+    Each request is an object with "source" and optionally "id", "backend",
+    "optimize" and "timeout" (seconds); {"op": "stats"} reports the queue.
+    Requests on one connection are pipelined and answered as they finish,
+    tagged with their id. Once `max_pending` requests are in flight the
+    server stops reading from clients until one completes; a request that
+    timed out counts as in flight until its worker has finished it. Bad
+    requests and timeouts are answered with an "error" field.
+    """
+    executor: Executor
+    max_pending: int
+    default_timeout: Optional[float]
+    completed: int
+    _pending: int
+    _slots: asyncio.Semaphore
+
+    def __init__(self,
+                 executor: Optional[Executor] = None,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 default_timeout: Optional[float] = None):
+        self.executor = executor if executor is not None else ThreadPoolExecutor()
+        self.max_pending = max_pending
+        self.default_timeout = default_timeout
+        self.completed = 0
+        self._pending = 0
+        self._slots = asyncio.Semaphore(max_pending)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queue_depth": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+        }
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection,
+                                          host,
+                                          port,
+                                          limit=LINE_LIMIT)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.handle_connection,
+                                               path,
+                                               limit=LINE_LIMIT)
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        tasks: Set[asyncio.Task] = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError) as e:
+                    await self._write(writer, write_lock, {"error": str(e)})
+                    break
+                if not line:
+                    break
+                # A slot is only taken once a request has arrived, so idle
+                # connections do not hold any.
+                await self._slots.acquire()
+                task = asyncio.create_task(
+                    self._respond(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter,
+                       write_lock: asyncio.Lock) -> None:
+        self._pending += 1
+        running = None
+        try:
+            response, running = await self._evaluate(line)
+        finally:
+            # A job that timed out keeps its slot until its worker is done
+            # with it, so that timeouts cannot get around `max_pending`.
+            if running is None:
+                self._release()
+            else:
+                running.add_done_callback(lambda _: self._release())
+        self.completed += 1
+        response["queue_depth"] = self._pending
+        await self._write(writer, write_lock, response)
+
+    def _release(self) -> None:
+        self._pending -= 1
+        self._slots.release()
+
+    async def _evaluate(
+            self,
+            line: bytes) -> Tuple[Dict[str, Any], Optional[asyncio.Future]]:
+        """The response to `line`, and the job if it is still running."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            return {"id": None, "error": f"invalid request: {e}"}, None
+
+        response: Dict[str, Any] = {"id": request.get("id")}
+        if request.get("op") == "stats":
+            response.update(self.stats())
+            return response, None
+
+        source = request.get("source")
+        backend = request.get("backend", "tree")
+        timeout = request.get("timeout", self.default_timeout)
+        if not isinstance(source, str):
+            response["error"] = "invalid request: 'source' must be a string"
+            return response, None
+        if backend not in BACKENDS:
+            response["error"] = f"invalid request: unknown backend '{backend}'"
+            return response, None
+        if timeout is not None and (isinstance(timeout, bool)
+                                    or not isinstance(timeout, (int, float))
+                                    or not timeout > 0):
+            response["error"] = (
+                "invalid request: 'timeout' must be a positive number")
+            return response, None
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, evaluate_request, source,
+                                      backend, bool(request.get("optimize")))
+        done, _ = await asyncio.wait({future}, timeout=timeout)
+        if not done:
+            response["error"] = "timeout"
+            return response, future
+        try:
+            response.update(future.result())
+        except LoxRuntimeError as e:
+            response["error"] = f"runtime error: {e}"
+        return response, None
+
+    async def _write(self, writer: asyncio.StreamWriter,
+                     write_lock: asyncio.Lock, response: Dict[str,
+                                                              Any]) -> None:
+        async with write_lock:
+            writer.write(json.dumps(response).encode() + b"\n")
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+
+async def serve(args: argparse.Namespace) -> None:
+    if args.processes:
+        executor: Executor = ProcessPoolExecutor(max_workers=args.workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=args.workers)
+    server = LoxServer(executor, args.max_pending, args.timeout)
+    if args.unix is not None:
+        listener = await server.start_unix(args.unix)
+    else:
+        host, _, port = args.tcp.rpartition(":")
+        listener = await server.start_tcp(host or "127.0.0.1", int(port))
+    with executor:
+        async with listener:
+            await listener.serve_forever()
+
+
+def main(argv: List[str], parser: argparse.ArgumentParser) -> None:
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--tcp", metavar="[HOST:]PORT")
+    address.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--processes",
+                        action="store_true",
+                        help="evaluate in worker processes instead of threads")
+    parser.add_argument("--max-pending",
+                        type=int,
+                        default=DEFAULT_MAX_PENDING)
+    parser.add_argument("--timeout",
+                        type=float,
+                        help="default per-request timeout in seconds")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,266 @@
+import io
+from functools import cached_property
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, TextIO, Union, cast
+
+from lox.ast import Expression
+from lox.diagnostics import Diagnostics
+from lox.interpreter import Interpreter
+from lox.parser import Parser
+from lox.regex_scanner import RegexScanner, stream_tokens
+from lox.token import Token
+
+# Everything beyond the tree backend is imported when it is first used.
+if TYPE_CHECKING:
+    from lox.adaptive import AdaptiveInterpreter
+    from lox.ast.hashcons import SharingStatistics
+    from lox.cache import CompileCache
+    from lox.optimizer import Optimizer
+    from lox.telemetry import Telemetry
+    from lox.vm import VM
+
+BACKENDS = ("tree", "closure", "vm", "adaptive")
+
+
+def _text_file(data: bytes) -> TextIO:
+    """`data` read as `open` would read a script in text mode."""
+    return io.TextIOWrapper(io.BytesIO(data))
+
+
+class LoxSession:
+    """Everything one pipeline needs: diagnostics, output and backends.
+
+    Sessions share no mutable state, so separate sessions can scan, parse
+    and evaluate on different threads at the same time. A single session
+    is not meant to be used from several threads at once. Backends other
+    than the tree interpreter are created the first time they are used.
+    """
+    diagnostics: Diagnostics
+    environment: Dict[str, object]
+    backend: str
+    optimize: bool
+    interpreter: Interpreter
+    telemetry: Optional["Telemetry"]
+    hash_cons: bool
+    sharing: Optional["SharingStatistics"]
+    _output: Optional[TextIO]
+
+    def __init__(self,
+                 backend: str = "tree",
+                 optimize: bool = False,
+                 output: Optional[TextIO] = None,
+                 errors: Optional[TextIO] = None,
+                 diagnostics: Optional[Diagnostics] = None,
+                 environment: Optional[Dict[str, object]] = None,
+                 telemetry: Optional["Telemetry"] = None,
+                 hash_cons: bool = False):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend '{backend}'")
+        self.diagnostics = (diagnostics if diagnostics is not None else
+                            Diagnostics(errors))
+        self.environment = environment if environment is not None else {}
+        self.backend = backend
+        self.optimize = optimize
+        self.interpreter = Interpreter(environment=self.environment,
+                                       diagnostics=self.diagnostics,
+                                       output=output,
+                                       memoize=hash_cons)
+        self._output = output
+        self.diagnostics.output = output
+        self.telemetry = telemetry
+        self.hash_cons = hash_cons
+        self.sharing = None
+
+    @property
+    def exit_code(self) -> int:
+        if self.diagnostics.had_error:
+            return 65
+        if self.diagnostics.had_runtime_error:
+            return 70
+        return 0
+
+    @cached_property
+    def closure_interpreter(self) -> Interpreter:
+        return Interpreter(closures=True,
+                           environment=self.environment,
+                           diagnostics=self.diagnostics,
+                           output=self._output)
+
+    @cached_property
+    def adaptive_interpreter(self) -> "AdaptiveInterpreter":
+        from lox.adaptive import AdaptiveInterpreter
+        return AdaptiveInterpreter(environment=self.environment,
+                                   diagnostics=self.diagnostics,
+                                   output=self._output)
+
+    @cached_property
+    def vm(self) -> "VM":
+        from lox.vm import VM
+        return VM(self.environment, self.diagnostics, self._output)
+
+    @cached_property
+    def optimizer(self) -> "Optimizer":
+        from lox.optimizer import Optimizer
+        return Optimizer()
+
+    @property
+    def output(self) -> Optional[TextIO]:
+        return self._output
+
+    @output.setter
+    def output(self, output: Optional[TextIO]) -> None:
+        """Sends every backend's results to `output` (stdout if None).
+
+        Diagnostics flush `output` before they are printed, so results and
+        errors stay in order even when `output` buffers.
+        """
+        self._output = output
+        self.diagnostics.output = output
+        self.interpreter._output = output
+        for name in ("closure_interpreter", "adaptive_interpreter", "vm"):
+            if name in self.__dict__:
+                self.__dict__[name]._output = output
+
+    def run(self,
+            source: str,
+            backend: Optional[str] = None,
+            optimize: Optional[bool] = None) -> None:
+        if self.telemetry is not None:
+            self._run_measured("<string>", lambda: source, backend, optimize)
+            return
+        scanner = RegexScanner(source, self.diagnostics)
+        self.run_tokens(scanner.scan_buffer(), backend, optimize)
+
+    def run_tokens(self,
+                   tokens: Iterable[Token],
+                   backend: Optional[str] = None,
+                   optimize: Optional[bool] = None) -> None:
+        expr = self.parse_tokens(tokens, optimize)
+        if expr is not None:
+            self.evaluate(expr, backend)
+
+    def parse(self,
+              source: str,
+              optimize: Optional[bool] = None) -> Optional[Expression]:
+        scanner = RegexScanner(source, self.diagnostics)
+        return self.parse_tokens(scanner.scan_buffer(), optimize)
+
+    def parse_tokens(self,
+                     tokens: Iterable[Token],
+                     optimize: Optional[bool] = None) -> Optional[Expression]:
+        tokens = iter(tokens)
+        factory = None
+        if self.hash_cons:
+            from lox.ast.hashcons import HashConsingFactory
+            factory = HashConsingFactory()
+        parser = Parser(tokens, factory, self.diagnostics, pratt=True)
+        expr = parser.parse()
+        if factory is not None:
+            self.sharing = factory.statistics
+        # Drain whatever the parser did not need so that scan errors further
+        # down a lazy token stream are still reported.
+        for _ in tokens:
+            pass
+
+        if self.diagnostics.had_error:
+            return None
+
+        if self.optimize if optimize is None else optimize:
+            expr = self.optimizer.optimize(expr)
+        return expr
+
+    def evaluate(self, expr: Expression, backend: Optional[str] = None) -> None:
+        backend = backend or self.backend
+        if backend == "vm":
+            from lox.compiler import Compiler
+            self.vm.interpret(Compiler().compile(expr))
+        elif backend == "closure":
+            self.closure_interpreter.interpret(expr)
+        elif backend == "adaptive":
+            self.adaptive_interpreter.interpret(expr)
+        elif backend == "tree":
+            self.interpreter.interpret(expr)
+        else:
+            raise ValueError(f"unknown backend '{backend}'")
+
+    def run_file(self,
+                 file_name: str,
+                 backend: Optional[str] = None,
+                 optimize: Optional[bool] = None,
+                 cache: Optional["CompileCache"] = None) -> int:
+        optimize = self.optimize if optimize is None else optimize
+        if self.telemetry is not None:
+
+            def read() -> bytes:
+                with open(file_name, "rb") as source_file:
+                    return source_file.read()
+
+            self._run_measured(file_name, read, backend, optimize, cache)
+        elif cache is None:
+            with open(file_name) as source_file:
+                self.run_tokens(
+                    stream_tokens(source_file, diagnostics=self.diagnostics),
+                    backend, optimize)
+        else:
+            # The file is read once, so that what is parsed is what was
+            # hashed even if the file changes in between.
+            with open(file_name, "rb") as source_file:
+                data = source_file.read()
+            key = cache.source_key(data, optimize)
+            expr = cache.load(key, optimize)
+            if expr is None:
+                expr = self.parse_tokens(
+                    stream_tokens(_text_file(data),
+                                  diagnostics=self.diagnostics), optimize)
+                if expr is not None:
+                    cache.store(key, optimize, expr)
+            if expr is not None:
+                self.evaluate(expr, backend)
+        return self.exit_code
+
+    def _run_measured(self,
+                      name: str,
+                      read: Callable[[], Union[str, bytes]],
+                      backend: Optional[str],
+                      optimize: Optional[bool],
+                      cache: Optional["CompileCache"] = None) -> None:
+        # Scanning and parsing are kept apart here, rather than streamed into
+        # each other, so that each phase can be measured on its own. With a
+        # cache, `read` must return bytes, which are both hashed and parsed.
+        from lox.optimizer import count_nodes
+        telemetry = self.telemetry
+        assert telemetry is not None
+        optimize = self.optimize if optimize is None else optimize
+        with telemetry.run(name) as record:
+            expr = None
+            data = None
+            if cache is not None:
+                with telemetry.phase(record, "load"):
+                    data = read()
+                    key = cache.source_key(cast(bytes, data), optimize)
+                    expr = cache.load(key, optimize)
+                if expr is not None:
+                    record.nodes = count_nodes(expr)
+            if expr is None:
+                with telemetry.phase(record, "scan"):
+                    if data is None:
+                        data = read()
+                    source = (data if isinstance(data, str) else
+                              _text_file(data).read())
+                    tokens = RegexScanner(source,
+                                          self.diagnostics).scan_buffer()
+                record.characters = len(source)
+                record.tokens = len(tokens)
+                with telemetry.phase(record, "parse"):
+                    expr = self.parse_tokens(tokens, optimize=False)
+                if expr is not None:
+                    record.nodes = count_nodes(expr)
+                if expr is not None and optimize:
+                    with telemetry.phase(record, "optimize"):
+                        expr = self.optimizer.optimize(expr)
+                if expr is not None and cache is not None:
+                    with telemetry.phase(record, "store"):
+                        cache.store(key, optimize, expr)
+            if expr is not None:
+                with telemetry.phase(record, "evaluate"):
+                    self.evaluate(expr, backend)
+            record.exit_code = self.exit_code
@@ -1,88 +1,98 @@
-from typing import Optional
-
-from lox.token_type import TokenType
-
-
-def text_for_type(type: TokenType) -> Optional[str]:
-    return {
-        TokenType.LEFT_PAREN: "(",
-        TokenType.RIGHT_PAREN: ")",
-        TokenType.LEFT_BRACE: "{",
-        TokenType.RIGHT_BRACE: "}",
-        TokenType.COMMA: ",",
-        TokenType.DOT: ".",
-        TokenType.MINUS: "-",
-        TokenType.PLUS: "+",
-        TokenType.SEMICOLON: ";",
-        TokenType.SLASH: "/",
-        TokenType.STAR: "*",
-        TokenType.BANG: "!",
-        TokenType.BANG_EQUAL: "!=",
-        TokenType.EQUAL: "=",
-        TokenType.EQUAL_EQUAL: "==",
-        TokenType.GREATER: ">",
-        TokenType.GREATER_EQUAL: ">=",
-        TokenType.LESS: "<",
-        TokenType.LESS_EQUAL: "<=",
-        TokenType.IDENTIFIER: None,
-        TokenType.STRING: None,
-        TokenType.NUMBER: None,
-        TokenType.AND: "and",
-        TokenType.CLASS: "class",
-        TokenType.ELSE: "else",
-        TokenType.FALSE: "false",
-        TokenType.FOR: "for",
-        TokenType.FUN: "fun",
-        TokenType.IF: "if",
-        TokenType.NIL: "nil",
-        TokenType.OR: "or",
-        TokenType.PRINT: "print",
-        TokenType.RETURN: "return",
-        TokenType.SUPER: "super",
-        TokenType.THIS: "this",
-        TokenType.TRUE: "true",
-        TokenType.VAR: "var",
-        TokenType.WHILE: "while",
-    }[type]
-
-
-def is_keyword(type: TokenType) -> bool:
-    return type in (
-        TokenType.AND,
-        TokenType.CLASS,
-        TokenType.ELSE,
-        TokenType.FALSE,
-        TokenType.FOR,
-        TokenType.FUN,
-        TokenType.IF,
-        TokenType.NIL,
-        TokenType.OR,
-        TokenType.PRINT,
-        TokenType.RETURN,
-        TokenType.SUPER,
-        TokenType.THIS,
-        TokenType.TRUE,
-        TokenType.VAR,
-        TokenType.WHILE,
-    )
-
-
-def requires_separator(left: TokenType, right: TokenType) -> bool:
-    return (
-        is_keyword(left)
-        and is_keyword(right)
-        or left == TokenType.IDENTIFIER
-        and is_keyword(right)
-        or is_keyword(left)
-        and right == TokenType.IDENTIFIER
-        or left == TokenType.BANG
-        and right in (TokenType.EQUAL, TokenType.EQUAL_EQUAL)
-        or left == TokenType.EQUAL
-        and right in (TokenType.EQUAL, TokenType.EQUAL_EQUAL)
-        or left == TokenType.LESS
-        and right in (TokenType.EQUAL, TokenType.EQUAL_EQUAL)
-        or left == TokenType.GREATER
-        and right in (TokenType.EQUAL, TokenType.EQUAL_EQUAL)
-        or left == TokenType.SLASH
-        and right == TokenType.SLASH
-    )
+from typing import Dict, Optional, Tuple
+
+from lox.token_type import TokenType
+
+TEXTS: Dict[TokenType, Optional[str]] = {
+    TokenType.LEFT_PAREN: "(",
+    TokenType.RIGHT_PAREN: ")",
+    TokenType.LEFT_BRACE: "{",
+    TokenType.RIGHT_BRACE: "}",
+    TokenType.COMMA: ",",
+    TokenType.DOT: ".",
+    TokenType.MINUS: "-",
+    TokenType.PLUS: "+",
+    TokenType.SEMICOLON: ";",
+    TokenType.SLASH: "/",
+    TokenType.STAR: "*",
+    TokenType.BANG: "!",
+    TokenType.BANG_EQUAL: "!=",
+    TokenType.EQUAL: "=",
+    TokenType.EQUAL_EQUAL: "==",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.IDENTIFIER: None,
+    TokenType.STRING: None,
+    TokenType.NUMBER: None,
+    TokenType.AND: "and",
+    TokenType.CLASS: "class",
+    TokenType.ELSE: "else",
+    TokenType.FALSE: "false",
+    TokenType.FOR: "for",
+    TokenType.FUN: "fun",
+    TokenType.IF: "if",
+    TokenType.NIL: "nil",
+    TokenType.OR: "or",
+    TokenType.PRINT: "print",
+    TokenType.RETURN: "return",
+    TokenType.SUPER: "super",
+    TokenType.THIS: "this",
+    TokenType.TRUE: "true",
+    TokenType.VAR: "var",
+    TokenType.WHILE: "while",
+}
+
+KEYWORD_TYPES = frozenset(type for type, text in TEXTS.items()
+                          if text is not None and text.isalpha())
+
+# Tokens that run together when written without a space between them:
+# words and numbers, an operator and a following '=' or '==', and '//'.
+# A number followed by a word would not, but is kept apart all the same.
+_WORDS = KEYWORD_TYPES | {TokenType.IDENTIFIER, TokenType.NUMBER}
+_BEFORE_EQUAL = (TokenType.BANG, TokenType.EQUAL, TokenType.LESS,
+                 TokenType.GREATER)
+_EQUALS = (TokenType.EQUAL, TokenType.EQUAL_EQUAL)
+
+
+def _needs_separator(left: TokenType, right: TokenType) -> bool:
+    if left in _WORDS and right in _WORDS:
+        return True
+    if left == TokenType.NUMBER:
+        # '1' '.' '5' would come back as the single number '1.5'.
+        return right == TokenType.DOT
+    if left in _BEFORE_EQUAL:
+        return right in _EQUALS
+    return left == TokenType.SLASH and right == TokenType.SLASH
+
+
+# The tables below are indexed by kind code (TokenType.value, what a
+# TokenBuffer stores), so that hot loops never hash an enum member.
+_TYPES = {type.value: type for type in TokenType}
+KIND_COUNT = max(_TYPES) + 1
+
+KIND_TEXTS: Tuple[Optional[str], ...] = tuple(
+    TEXTS.get(_TYPES[kind]) if kind in _TYPES else None
+    for kind in range(KIND_COUNT))
+
+IS_KEYWORD: Tuple[bool, ...] = tuple(
+    _TYPES.get(kind) in KEYWORD_TYPES for kind in range(KIND_COUNT))
+
+# SEPARATORS[left * KIND_COUNT + right] is " " where the two tokens would
+# scan differently if written next to each other, and "" elsewhere.
+SEPARATORS: Tuple[str, ...] = tuple(
+    " " if left in _TYPES and right in _TYPES
+    and _needs_separator(_TYPES[left], _TYPES[right]) else ""
+    for left in range(KIND_COUNT) for right in range(KIND_COUNT))
+
+
+def text_for_type(type: TokenType) -> Optional[str]:
+    return TEXTS[type]
+
+
+def is_keyword(type: TokenType) -> bool:
+    return IS_KEYWORD[type.value]
+
+
+def requires_separator(left: TokenType, right: TokenType) -> bool:
+    return SEPARATORS[left.value * KIND_COUNT + right.value] != ""
@@ -0,0 +1,92 @@
+import json
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from time import perf_counter, process_time
+from typing import Callable, Dict, Iterator, Optional, TextIO
+
+
+@dataclass
+class PhaseTelemetry:
+    """Cost of one pipeline phase.
+
+    `allocated_bytes` is the memory the phase left allocated when it ended
+    and `peak_bytes` the most it had allocated at once, both relative to
+    the start of the phase. They are None when memory is not traced.
+    """
+    wall_seconds: float
+    cpu_seconds: float
+    allocated_bytes: Optional[int] = None
+    peak_bytes: Optional[int] = None
+
+
+@dataclass
+class RunTelemetry:
+    source: str
+    characters: int = 0
+    tokens: int = 0
+    nodes: int = 0
+    exit_code: int = 0
+    phases: Dict[str, PhaseTelemetry] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class Telemetry:
+    """Measures every run of a pipeline and hands a RunTelemetry to `sink`.
+
+    With `memory` set, tracemalloc is started for the duration of each run
+    unless it is already tracing, which makes the run several times slower.
+    """
+    sink: Callable[[RunTelemetry], None]
+    memory: bool
+
+    def __init__(self,
+                 sink: Callable[[RunTelemetry], None],
+                 memory: bool = True):
+        self.sink = sink
+        self.memory = memory
+
+    @contextmanager
+    def run(self, source: str) -> Iterator[RunTelemetry]:
+        started = self.memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        record = RunTelemetry(source)
+        try:
+            yield record
+        finally:
+            if started:
+                tracemalloc.stop()
+            self.sink(record)
+
+    @contextmanager
+    def phase(self, record: RunTelemetry, name: str) -> Iterator[None]:
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        wall = perf_counter()
+        cpu = process_time()
+        try:
+            yield
+        finally:
+            phase = PhaseTelemetry(perf_counter() - wall, process_time() - cpu)
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                phase.allocated_bytes = current - before
+                phase.peak_bytes = peak - before
+            record.phases[name] = phase
+
+
+def json_lines_sink(
+        stream: Optional[TextIO] = None) -> Callable[[RunTelemetry], None]:
+    """A sink writing each record as one JSON line to `stream` (stderr)."""
+
+    def sink(record: RunTelemetry) -> None:
+        out = stream if stream is not None else sys.stderr
+        print(json.dumps(record.to_dict()), file=out, flush=True)
+
+    return sink
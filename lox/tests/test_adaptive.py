@@ -0,0 +1,96 @@
+import io
+
+from pytest import mark
+
+from lox.adaptive import AdaptiveInterpreter, GenericBinaryExpression, SPECIALIZE_AFTER
+from lox.ast import BinaryExpression
+from lox.ast.arena import AstArena
+from lox.ast.printer import AstPrinter
+from lox.diagnostics import Diagnostics
+from lox.interpreter import Interpreter
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.tests.test_vm import EXPRESSIONS, run
+
+
+def parse(text: str, factory=None):
+    return Parser(Scanner(text).scan_tokens(), factory).parse()
+
+
+def repeat(interpreter: Interpreter, expr, times: int = SPECIALIZE_AFTER + 2):
+    output = io.StringIO()
+    errors = io.StringIO()
+    interpreter._output = output
+    interpreter._diagnostics = Diagnostics(errors)
+    for _ in range(times):
+        interpreter.interpret(expr)
+    return output.getvalue(), errors.getvalue()
+
+
+@mark.parametrize("text", EXPRESSIONS)
+def test_adaptive_matches_interpreter(capsys, text: str):
+    assert run(capsys, text, "adaptive") == run(capsys, text, "tree")
+
+
+@mark.parametrize("text", EXPRESSIONS)
+def test_specialized_nodes_match_interpreter(text: str):
+    expr = parse(text)
+    expected = repeat(Interpreter(), expr)
+    assert repeat(AdaptiveInterpreter(), expr) == expected
+    # Rewritten nodes print and evaluate just like the originals.
+    assert repeat(Interpreter(), expr) == expected
+    assert AstPrinter().visit(expr) == AstPrinter().visit(parse(text))
+
+
+def test_nodes_specialize_after_feedback():
+    interpreter = AdaptiveInterpreter()
+    expr = parse('-(1 + 2) * 3 == !nil != ("a" + "b" == 1)')
+    original = parse('-(1 + 2) * 3 == !nil != ("a" + "b" == 1)')
+    repeat(interpreter, expr, SPECIALIZE_AFTER - 1)
+    assert interpreter.specializations == 0
+    assert type(expr) is BinaryExpression
+
+    repeat(interpreter, expr, 1)
+    assert type(expr).__name__ == "NotEqualExpression"
+    assert type(expr.left.left).__name__ == "FloatMultiplyExpression"
+    assert type(expr.left.left.left).__name__ == "FloatNegateExpression"
+    assert type(expr.left.right).__name__ == "NotExpression"
+    assert type(expr.right.expression).__name__ == "EqualExpression"
+    assert type(expr.right.expression.left).__name__ == "StringConcatExpression"
+    assert interpreter.specializations == 8
+    assert expr == original
+    assert original == expr
+
+
+def test_mixed_types_stay_generic():
+    interpreter = AdaptiveInterpreter()
+    expr = parse('1 + "a"')
+    _, errors = repeat(interpreter, expr)
+    assert errors.count("Operands must be two numbers or two strings.") == 4
+    assert type(expr) is GenericBinaryExpression
+    assert interpreter.specializations == 0
+
+
+def test_guard_failure_falls_back():
+    environment = {"x": 1.0}
+    interpreter = AdaptiveInterpreter(environment=environment)
+    expr = parse("x + x")
+    assert repeat(interpreter, expr) == ("2\n" * 4, "")
+    assert type(expr).__name__ == "FloatAddExpression"
+
+    environment["x"] = "a"
+    assert repeat(interpreter, expr, 1) == ("aa\n", "")
+    assert interpreter.deoptimizations == 1
+    assert type(expr) is GenericBinaryExpression
+
+    environment["x"] = 1.0
+    assert repeat(interpreter, expr) == ("2\n" * 4, "")
+    assert type(expr) is GenericBinaryExpression
+
+
+def test_arena_views_are_not_rewritten():
+    arena = AstArena()
+    expr = parse("1 + 2", arena)
+    view_type = type(expr)
+    assert repeat(AdaptiveInterpreter(), expr) == ("3\n" * 4, "")
+    assert type(expr) is view_type
@@ -0,0 +1,45 @@
+from pytest import mark
+
+import lox
+from lox.ast import BinaryExpression
+from lox.ast.arena import AstArena
+from lox.ast.printer import AstPrinter
+from lox.interpreter import Interpreter
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.tests.test_vm import EXPRESSIONS
+
+
+def parse(text: str, factory=None):
+    return Parser(Scanner(text).scan_tokens(), factory).parse()
+
+
+@mark.parametrize("text", EXPRESSIONS)
+def test_arena_prints_like_tree(text: str):
+    assert AstPrinter().visit(parse(text, AstArena())) == AstPrinter().visit(
+        parse(text))
+
+
+@mark.parametrize("text", EXPRESSIONS)
+def test_arena_interprets_like_tree(capsys, text: str):
+    lox.s_had_runtime_error = False
+    Interpreter().interpret(parse(text))
+    expected = capsys.readouterr()
+    Interpreter().interpret(parse(text, AstArena()))
+    assert capsys.readouterr() == expected
+
+
+def test_arena_layout():
+    arena = AstArena()
+    root = parse("1 + 1 * -(1)", arena)
+    assert isinstance(root, BinaryExpression)
+    assert len(arena) == 7
+    assert arena.literals == [1.0]
+    assert root.operator.line == 1
+    assert root.right.right.right.expression.value == 1.0
+
+
+def test_nodes_have_no_dict():
+    arena = AstArena()
+    assert not hasattr(parse("1 + 2", arena), "__dict__")
+    assert not hasattr(parse("1 + 2"), "__dict__")
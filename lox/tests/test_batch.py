@@ -0,0 +1,87 @@
+import subprocess
+import sys
+
+from lox.batch import ScriptResult, batch_exit_code, read_manifest, run_batch, run_script, run_scripts
+
+
+def write_scripts(tmp_path):
+    scripts = {"ok.lox": "1 + 2", "runtime.lox": '"a" + 1', "parse.lox": "1 +"}
+    for name, text in scripts.items():
+        (tmp_path / name).write_text(text)
+    return [str(tmp_path / name) for name in scripts]
+
+
+def test_run_script_collects_output(tmp_path):
+    ok, runtime, parse = write_scripts(tmp_path)
+    result = run_script(ok)
+    assert (result.exit_code, result.stdout, result.stderr) == (0, "3\n", "")
+    result = run_script(runtime)
+    assert result.exit_code == 70
+    assert result.stderr == "Operands must be two numbers or two strings.\n[line 1]\n"
+    assert run_script(parse).exit_code == 65
+    assert run_script(ok).exit_code == 0
+
+
+def test_missing_script(tmp_path):
+    result = run_script(str(tmp_path / "missing.lox"))
+    assert result.exit_code == 66
+    assert "missing.lox" in result.stderr
+
+
+def test_run_scripts_in_pool_keeps_order(tmp_path):
+    paths = write_scripts(tmp_path) * 3
+    results = list(run_scripts(paths, jobs=2))
+    assert [result.path for result in results] == paths
+    assert [result.exit_code for result in results] == [0, 70, 65] * 3
+    assert batch_exit_code(results) == 70
+
+
+def test_read_manifest(tmp_path):
+    (tmp_path / "manifest.txt").write_text("a.lox\n\n# skipped\n  sub/b.lox\n")
+    assert read_manifest(str(tmp_path / "manifest.txt")) == [
+        str(tmp_path / "a.lox"),
+        str(tmp_path / "sub" / "b.lox"),
+    ]
+
+
+def test_batch_exit_code_of_clean_batch():
+    assert batch_exit_code([ScriptResult("a", 0, "", "", 0.0)]) == 0
+    assert batch_exit_code([]) == 0
+
+
+def test_crashing_script_does_not_stop_the_batch(tmp_path, capsys):
+    ok, _, _ = write_scripts(tmp_path)
+    (tmp_path / "zero.lox").write_text("1 / 0 + nil")
+    zero = str(tmp_path / "zero.lox")
+    result = run_script(zero)
+    assert result.exit_code == 70
+    assert "Operands must be two numbers or two strings." in result.stderr
+    assert run_batch([ok, zero, ok], jobs=2) == 70
+    captured = capsys.readouterr()
+    assert captured.out.count("3\n") == 2
+    assert "3 scripts, 1 failed" in captured.err
+    assert "ms wall time" in captured.err
+
+
+def test_local_cache_per_script(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    paths = [str(tmp_path / "a" / "one.lox"), str(tmp_path / "b" / "two.lox")]
+    for path in paths:
+        with open(path, "w") as script:
+            script.write("1 + 2")
+    results = list(run_scripts(paths, jobs=1, local_cache=True))
+    assert [result.stdout for result in results] == ["3\n", "3\n"]
+    assert any((tmp_path / "a" / "__loxcache__").iterdir())
+    assert any((tmp_path / "b" / "__loxcache__").iterdir())
+
+
+def test_jobs_must_be_positive(tmp_path):
+    scripts = write_scripts(tmp_path)
+    for jobs in ("0", "-2"):
+        result = subprocess.run(
+            [sys.executable, "-m", "lox", "-j", jobs] + scripts,
+            capture_output=True,
+            text=True)
+        assert result.returncode == 64
+        assert f"must be at least 1, not {jobs}" in result.stderr
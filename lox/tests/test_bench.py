@@ -0,0 +1,83 @@
+import subprocess
+import sys
+
+from lox.bench import compare, generate, generate_all, regressions, run_benchmarks, to_json
+from lox.bench.startup import measure_startup, parse_import_times
+from lox.parser import Parser
+from lox.scanner import Scanner
+
+
+def test_corpora_are_reproducible():
+    assert generate_all(0.01) == generate_all(0.01)
+    assert generate("wide_sum", 0.01, seed=1) != generate("wide_sum", 0.01, seed=2)
+
+
+def test_parsable_corpora_parse(capsys):
+    for corpus in generate_all(0.05).values():
+        expr = Parser(Scanner(corpus.source).scan_tokens()).parse()
+        assert (expr is not None) == corpus.parses
+    capsys.readouterr()
+
+
+def test_run_and_compare():
+    corpora = [generate("wide_sum", 0.01), generate("keyword_dense", 0.01)]
+    limit = sys.getrecursionlimit()
+    results = to_json(run_benchmarks(corpora, repeat=2, warmup=0, number=1))
+    assert sys.getrecursionlimit() == limit
+    assert set(results["results"]) == {
+        "wide_sum/scan",
+        "wide_sum/minify",
+        "wide_sum/pretty",
+        "wide_sum/parse",
+        "wide_sum/pratt",
+        "wide_sum/interpret",
+        "wide_sum/adaptive",
+        "wide_sum/print",
+        "wide_sum/edit",
+        "keyword_dense/scan",
+        "keyword_dense/minify",
+        "keyword_dense/pretty",
+    }
+    scan = results["results"]["wide_sum/scan"]
+    assert scan["peak_bytes"] >= scan["allocated_bytes"] > 0
+    slower = {
+        "results": {
+            key: dict(values, median=values["median"] * 2)
+            for key, values in results["results"].items()
+        }
+    }
+    assert regressions(compare(results, results), 0.1) == []
+    assert len(regressions(compare(slower, results), 0.1)) == 12
+
+
+def test_import_times_keep_top_level_modules():
+    report = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       100 |        100 |   lox.token_type\n"
+              "import time:       200 |        300 | lox.token\n"
+              "import time:        50 |         50 | argparse\n")
+    assert parse_import_times(report) == [("lox.token", 300), ("argparse", 50)]
+
+
+def test_startup_measures_lox(tmp_path):
+    script = tmp_path / "one.lox"
+    script.write_text("1 + 2 * 3\n")
+    measurement = measure_startup(str(script), 1)
+    assert measurement.median > 0
+    assert measurement.baseline > 0
+    assert measurement.overhead == measurement.median - measurement.baseline
+    assert "lox" in dict(measurement.imports)
+
+
+def test_running_a_script_skips_unused_modules():
+    code = ("import sys, lox; lox.run('1 + 2'); "
+            "print(' '.join(sorted(sys.modules)))")
+    result = subprocess.run([sys.executable, "-c", code],
+                            capture_output=True,
+                            text=True,
+                            check=True)
+    modules = set(result.stdout.split()[1:])
+    assert "lox.interpreter" in modules
+    assert modules.isdisjoint({
+        "lox.adaptive", "lox.batch", "lox.cache", "lox.closure_compiler",
+        "lox.compiler", "lox.optimizer", "lox.telemetry", "lox.vm"
+    })
@@ -0,0 +1,110 @@
+import io
+import os
+
+from pytest import mark, raises
+
+import lox
+from lox.ast.printer import AstPrinter
+from lox.ast.serialize import SerializationError, dumps, loads
+from lox.cache import CompileCache
+from lox.session import LoxSession
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.tests.test_vm import EXPRESSIONS
+
+
+def parse(text: str):
+    return Parser(Scanner(text).scan_tokens()).parse()
+
+
+@mark.parametrize("text", EXPRESSIONS + ['"é\nü" == "x"'])
+def test_serialize_round_trip(text: str):
+    expr = parse(text)
+    assert loads(dumps(expr)) == expr
+
+
+def test_serialize_deep_tree():
+    expr = parse("-" * 300 + "1")
+    assert loads(dumps(expr)) == expr
+
+
+def test_loads_rejects_garbage():
+    with raises(SerializationError):
+        loads(b"Bxx")
+    with raises(SerializationError):
+        loads(dumps(parse("1 + 2"))[:-1])
+
+
+def write_script(tmp_path, text: str):
+    path = tmp_path / "script.lox"
+    path.write_text(text)
+    return path
+
+
+def test_store_and_load(tmp_path):
+    cache = CompileCache(tmp_path / "cache")
+    script = write_script(tmp_path, "(1 + 2) * 3")
+    key = cache.key(script, False)
+    assert cache.load(key, False) is None
+    cache.store(key, False, parse("(1 + 2) * 3"))
+    assert AstPrinter().visit(cache.load(key, False)) == "(* (group (+ 1 2)) 3)"
+    assert cache.load(key, True) is None
+    assert cache.key(script, True) != key
+
+
+def test_corrupt_entry_is_discarded(tmp_path):
+    cache = CompileCache(tmp_path)
+    key = b"\0" * 32
+    cache.store(key, False, parse("1 + 2"))
+    (entry, ) = tmp_path.glob("*.loxc")
+    entry.write_bytes(entry.read_bytes()[:-1] + b"\xff")
+    assert cache.load(key, False) is None
+    assert not entry.exists()
+
+
+def test_version_mismatch_is_a_miss(tmp_path, monkeypatch):
+    cache = CompileCache(tmp_path)
+    key = b"\0" * 32
+    cache.store(key, False, parse("1"))
+    monkeypatch.setattr(lox, "LOX_VERSION", "99.0.0")
+    assert cache.load(key, False) is None
+
+
+def test_eviction_keeps_newest(tmp_path):
+    cache = CompileCache(tmp_path, max_bytes=200)
+    for i in range(10):
+        key = bytes([i]) * 32
+        cache.store(key, False, parse(" + ".join(["1"] * 5)))
+        os.utime(cache._path(key), (i, i))
+    entries = list(tmp_path.glob("*.loxc"))
+    assert 0 < len(entries) < 10
+    assert cache.load(bytes([9]) * 32, False) is not None
+
+
+def test_warm_run_skips_parsing(tmp_path, capsys, monkeypatch):
+    cache = CompileCache(tmp_path / "cache")
+    script = write_script(tmp_path, "1 + 2")
+    monkeypatch.setattr(lox, "s_had_error", False)
+    monkeypatch.setattr(lox, "s_had_runtime_error", False)
+    lox.run_file(str(script), cache=cache)
+    monkeypatch.setattr(LoxSession, "parse_tokens", None)
+    lox.run_file(str(script), cache=cache)
+    assert capsys.readouterr().out == "3\n3\n"
+
+
+def test_parsed_source_is_the_hashed_source(tmp_path, monkeypatch):
+    cache = CompileCache(tmp_path / "cache")
+    script = write_script(tmp_path, "1 + 2")
+    source_key = CompileCache.source_key
+
+    def edit_after_hashing(self, source, optimized):
+        script.write_text("3 * 4")
+        return source_key(self, source, optimized)
+
+    monkeypatch.setattr(CompileCache, "source_key", edit_after_hashing)
+    output = io.StringIO()
+    LoxSession(output=output).run_file(str(script), cache=cache)
+    assert output.getvalue() == "3\n"
+    monkeypatch.undo()
+    key = cache.source_key(b"1 + 2", False)
+    assert AstPrinter().visit(cache.load(key, False)) == "(+ 1 2)"
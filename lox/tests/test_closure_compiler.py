@@ -0,0 +1,56 @@
+from pytest import mark, raises
+
+from lox.interpreter import Interpreter
+from lox.parser import Parser
+from lox.runtime_error import LoxRuntimeError
+from lox.scanner import Scanner
+from lox.tests.test_vm import EXPRESSIONS, run
+
+
+def parse(text: str):
+    return Parser(Scanner(text).scan_tokens()).parse()
+
+
+@mark.parametrize("text", EXPRESSIONS)
+def test_closure_matches_interpreter(capsys, text: str):
+    assert run(capsys, text, "closure") == run(capsys, text, "tree")
+
+
+def test_compiled_closure_is_reusable():
+    closure = Interpreter().compile(parse("(1 + 2) * 3 - 4 / 2"))
+    assert closure() == 7.0
+    assert closure() == 7.0
+
+
+def test_compiled_closure_raises_on_operator():
+    closure = Interpreter().compile(parse("1 +\n-nil"))
+    with raises(LoxRuntimeError) as e:
+        closure()
+    assert e.value.token.line == 2
+    assert str(e.value) == "Operand must be a number."
+
+
+def test_interpret_caches_compiled_closure(capsys):
+    interpreter = Interpreter(closures=True)
+    expr = parse("1 + 2")
+    interpreter.interpret(expr)
+    closure = interpreter._compiled_closure(expr)
+    interpreter.interpret(expr)
+    assert interpreter._compiled_closure(expr) is closure
+    assert capsys.readouterr().out == "3\n3\n"
+
+
+def test_compiled_closure_handles_wide_sums():
+    expr = parse(" + ".join(["1"] * 5000))
+    closure = Interpreter(closures=True).compile(expr)
+    assert closure() == 5000.0
+    assert closure() == 5000.0
+
+
+def test_wide_sums_raise_in_evaluation_order():
+    lines = ["1"] * 3000 + ["-nil"] + ["x"] * 3000
+    closure = Interpreter().compile(parse(" +\n".join(lines)))
+    with raises(LoxRuntimeError) as e:
+        closure()
+    assert e.value.token.line == 3001
+    assert str(e.value) == "Operand must be a number."
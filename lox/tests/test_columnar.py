@@ -0,0 +1,91 @@
+from pytest import importorskip, raises
+
+from lox.parser import Parser
+from lox.runtime_error import LoxRuntimeError
+from lox.scanner import Scanner
+
+np = importorskip("numpy")
+from lox.columnar import ColumnarEvaluator  # noqa: E402
+
+
+def evaluate(text: str, **columns):
+    expr = Parser(Scanner(text).scan_tokens()).parse()
+    return ColumnarEvaluator().evaluate(expr, columns)
+
+
+def test_arithmetic():
+    result = evaluate("(x + 1) * y - -2 / 4", x=[1, 2, 3], y=[1.5, 2.0, 0.0])
+    assert result.values.tolist() == [3.5, 6.5, 0.5]
+    assert result.errors == {}
+
+
+def test_comparison_and_equality():
+    result = evaluate("x > 1 == !(y == \"b\")", x=[0.0, 2.0], y=["a", "a"])
+    assert result.values.tolist() == [False, True]
+
+
+def test_truthiness_matches_interpreter():
+    result = evaluate("!x", x=[0.0, 1.0, float("nan")])
+    assert result.values.tolist() == [True, False, False]
+
+
+def test_string_concatenation():
+    result = evaluate('s + "!"', s=["a", "bc"])
+    assert result.values.tolist() == ["a!", "bc!"]
+
+
+def test_column_type_error():
+    with raises(LoxRuntimeError) as e:
+        evaluate("x - s", x=[1.0], s=["a"])
+    assert str(e.value) == "Operands must be numbers."
+
+
+def test_mixed_plus_is_column_error():
+    with raises(LoxRuntimeError) as e:
+        evaluate("x + s", x=[1.0], s=["a"])
+    assert str(e.value) == "Operands must be two numbers or two strings."
+
+
+def test_object_column_reports_per_row():
+    result = evaluate("x + 1", x=np.array([1.0, "a", 2], dtype=object))
+    assert result.values.tolist() == [2.0, None, 3.0]
+    assert list(result.errors) == [1]
+    assert str(result.errors[1]) == (
+        "Operands must be two numbers or two strings.")
+
+
+def test_undefined_variable():
+    with raises(LoxRuntimeError) as e:
+        evaluate("x + y", x=[1.0])
+    assert str(e.value) == "Undefined variable 'y'."
+
+
+def test_narrow_floats_are_widened():
+    for dtype in (np.float16, np.float32):
+        x = np.array([0.1, 3.0], dtype=dtype)
+        result = evaluate("x + 0", x=x)
+        assert result.values.dtype == np.float64
+        assert result.values.tolist() == x.astype(np.float64).tolist()
+
+
+def test_unsupported_columns_are_rejected():
+    for values in (np.array(["2024-01-01"], dtype="datetime64[D]"),
+                   np.array([1 + 2j]), [[1.0], [2.0]]):
+        with raises(ValueError, match="column 'when'"):
+            evaluate("when", when=values)
+
+
+def test_constant_expression_broadcasts():
+    result = evaluate("1 + 2", x=[0.0, 0.0])
+    assert result.values.tolist() == [3.0, 3.0]
+
+
+def test_division_by_zero_is_ieee_on_every_path():
+    expected = [float("inf"), float("-inf")]
+    for x in ([1.0, -1.0], np.array([1.0, -1], dtype=object)):
+        result = evaluate("x / (y - y)", x=x, y=[2.0, 2.0])
+        assert result.values.tolist() == expected
+        assert result.errors == {}
+    result = evaluate("0 / 0 == 0 / 0", x=[1.0])
+    assert result.values.tolist() == [False]
+    assert evaluate("-1 / 0", x=[1.0]).values.tolist() == [float("-inf")]
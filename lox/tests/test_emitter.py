@@ -0,0 +1,130 @@
+import io
+import itertools
+import random
+
+import pytest
+
+from lox.bench.corpus import generate_all
+from lox.diagnostics import Diagnostics
+from lox.emitter import main, minify, minify_source, prettify, prettify_source
+from lox.regex_scanner import RegexScanner
+from lox.syntax_facts import IS_KEYWORD, KIND_TEXTS, TEXTS, is_keyword, requires_separator
+from lox.token_type import TokenType
+
+WORDS = [text for text in TEXTS.values() if text is not None] + [
+    "x", "y1", "_a", "1", "2.5", "10", '"s"', '"a\nb"', '""', '"//"'
+]
+GAPS = [" ", "", "", "\n", '  // a "comment"\n', "\n\n \n", "\r\n", "\t"]
+
+
+def scan(source: str):
+    diagnostics = Diagnostics(io.StringIO())
+    tokens = RegexScanner(source, diagnostics).scan_tokens()
+    assert not diagnostics.had_error
+    return tokens
+
+
+def lexemes(source: str):
+    return [(token.type, token.lexeme) for token in scan(source)]
+
+
+def lines(source: str):
+    """The lexemes of each line that a token starts on."""
+    grouped = {}
+    for token in scan(source)[:-1]:
+        start = token.line - token.lexeme.count("\n")
+        grouped.setdefault(start, []).append(token.lexeme)
+    return list(grouped.values())
+
+
+def random_source(seed: int) -> str:
+    rng = random.Random(seed)
+    return "".join(
+        rng.choice(WORDS) + rng.choice(GAPS)
+        for _ in range(rng.randint(0, 30)))
+
+
+def test_tables_match_token_types():
+    for type in TokenType:
+        assert KIND_TEXTS[type.value] == TEXTS.get(type)
+        assert IS_KEYWORD[type.value] == is_keyword(type)
+    assert is_keyword(TokenType.WHILE)
+    assert not is_keyword(TokenType.IDENTIFIER)
+    assert requires_separator(TokenType.IDENTIFIER, TokenType.NUMBER)
+    assert requires_separator(TokenType.NUMBER, TokenType.DOT)
+    assert not requires_separator(TokenType.NUMBER, TokenType.PLUS)
+
+
+def test_minify():
+    source = "var  x = 1 ;// note\nprint x\t==\n-2.5 / (y);"
+    assert "".join(minify(scan(source))) == "var x=1;print x==-2.5/(y);"
+    assert "".join(minify(scan(source), keep_lines=True)) == (
+        "var x=1;\nprint x==\n-2.5/(y);\n")
+
+
+def test_pretty():
+    source = "f( a,b )+-( 1--2 )*!x\n\n\n(1 +\n2\n)-x.y;{var a=1;}"
+    assert "".join(prettify(scan(source))) == (
+        "f(a, b) + -(1 - -2) * !x\n"
+        "\n"
+        "(1 +\n"
+        "    2\n"
+        ") - x.y; { var a = 1; }\n")
+    assert prettify_source(source) == "".join(prettify(scan(source)))
+
+
+def test_minify_source():
+    source = '1 . 5 "a  b" // c "d\nx1 .y  = =  a'
+    assert minify_source(source) == '1 .5"a  b"x1 .y= =a'
+    assert minify_source(source, keep_lines=True) == '1 .5"a  b"\nx1 .y= =a\n'
+    assert minify_source(" \n// only a comment\n") == ""
+    assert minify_source(" \n// only a comment\n", keep_lines=True) == ""
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_output_scans_to_the_same_tokens(seed: int):
+    source = random_source(seed)
+    tokens = scan(source)
+    expected = lexemes(source)
+    for text in ("".join(minify(tokens)), "".join(prettify(tokens)),
+                 prettify_source(source), minify_source(source)):
+        assert lexemes(text) == expected
+    for text in ("".join(minify(tokens, keep_lines=True)),
+                 minify_source(source, keep_lines=True)):
+        assert lexemes(text) == expected
+        assert lines(text) == lines(source)
+
+
+def test_minify_source_agrees_with_minify_on_every_pair():
+    # WORDS covers every token kind in syntax_facts, so this checks the
+    # character-level rules of minify_source against SEPARATORS.
+    for left, right in itertools.product(WORDS, repeat=2):
+        for gap in (" ", "\n", "\t", "  // c\n"):
+            source = left + gap + right
+            expected = "".join(minify(scan(source)))
+            minified = minify_source(source)
+            assert lexemes(minified) == lexemes(source)
+            # It may keep one space that minify finds it can drop.
+            assert len(minified) - len(expected) in (0, 1)
+
+
+def test_minify_source_agrees_with_minify_on_bench_corpora():
+    for corpus in generate_all(scale=0.05).values():
+        assert minify_source(corpus.source) == "".join(
+            minify(scan(corpus.source)))
+
+
+def test_emitter_main(tmp_path):
+    script = tmp_path / "script.lox"
+    script.write_text("1+ 2 // sum\n* -3\n")
+    output = io.StringIO()
+    assert main([str(script), "--minify"], output) == 0
+    assert output.getvalue() == "1+2*-3"
+    output = io.StringIO()
+    assert main([str(script)], output) == 0
+    assert output.getvalue() == "1 + 2\n* -3\n"
+
+
+def test_emitter_main_reports_missing_script(tmp_path, capsys):
+    assert main([str(tmp_path / "missing.lox")], io.StringIO()) == 66
+    assert capsys.readouterr().err.startswith("lox.py: ")
@@ -0,0 +1,114 @@
+import io
+
+from lox.ast.hashcons import HashConsingFactory
+from lox.ast.printer import AstPrinter
+from lox.ast.serialize import dumps, loads
+from lox.diagnostics import Diagnostics
+from lox.interpreter import Interpreter
+from lox.optimizer import Optimizer, count_nodes
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.session import LoxSession
+from lox.token import Token
+from lox.token_type import TokenType
+
+
+def parse(text: str, factory=None):
+    return Parser(Scanner(text).scan_tokens(), factory).parse()
+
+
+def doubled(depth: int) -> str:
+    text = "1"
+    for i in range(depth):
+        text = f"({text} + {text} * {i})"
+    return text
+
+
+def doubled_tree(depth: int):
+    """`doubled(depth)` around an x instead of a 1, built with sharing."""
+    factory = HashConsingFactory()
+    plus = Token(TokenType.PLUS, "+", None, 1)
+    star = Token(TokenType.STAR, "*", None, 1)
+    expr = factory.variable(Token(TokenType.IDENTIFIER, "x", None, 1))
+    for i in range(depth):
+        product = factory.binary(expr, star, factory.literal(float(i)))
+        expr = factory.grouping(factory.binary(expr, plus, product))
+    return expr
+
+
+def test_identical_subtrees_are_shared():
+    factory = HashConsingFactory()
+    expr = parse("(1 + x) * (1 + x) - (1 + x) * (1 + x)", factory)
+    assert expr.left is expr.right
+    assert expr.left.left is expr.left.right
+    assert factory.statistics.requested == 19
+    assert factory.statistics.distinct == 6
+    assert factory.statistics.shared == 13
+
+
+def test_literals_are_shared_by_type():
+    factory = HashConsingFactory()
+    expr = parse("1 == true", factory)
+    assert expr.left is not expr.right
+    assert expr.left.value == 1.0
+    assert expr.right.value is True
+
+
+def test_distinct_nodes_grow_with_distinct_subexpressions():
+    factory = HashConsingFactory()
+    text = doubled(12)
+    expr = parse(text, factory)
+    assert len(text) > 40000
+    # A grouping, two operators and a new literal per level, except that
+    # the first level's literal is the innermost 1.
+    assert factory.statistics.distinct == 4 * 12
+    assert AstPrinter().visit(expr) == AstPrinter().visit(parse(text))
+
+
+def test_memoized_evaluation_matches():
+    expr = parse(doubled(12), HashConsingFactory())
+    interpreter = Interpreter(memoize=True)
+    assert interpreter._evaluate(expr) == Interpreter()._evaluate(
+        parse(doubled(12)))
+    # Every level but the innermost reuses the operator inside its group.
+    assert interpreter.memo_hits == 12 - 1
+    assert interpreter._evaluate(expr) == interpreter._evaluate(expr)
+
+
+def test_errors_keep_first_line():
+    text = '1 + (2 -\n"a")\n* ((2 -\n"a"))'
+    results = []
+    for hash_cons in (False, True):
+        errors = io.StringIO()
+        session = LoxSession(errors=errors, hash_cons=hash_cons)
+        session.run(text)
+        results.append((errors.getvalue(), session.exit_code))
+    assert results[0] == results[1] == (
+        "Operands must be numbers.\n[line 1]\n", 70)
+
+
+def test_session_exposes_sharing():
+    output = io.StringIO()
+    session = LoxSession(output=output, hash_cons=True)
+    assert session.sharing is None
+    session.run("1 + 1")
+    session.run('"ab" + "ab"')
+    assert output.getvalue() == "2\nabab\n"
+    assert session.sharing.requested == 3
+    assert session.sharing.distinct == 2
+    assert session.interpreter.memo_hits == 0
+
+
+def test_shared_subtrees_are_walked_once():
+    # As a tree, this has about 2 ** 60 times as many nodes as it has
+    # distinct ones.
+    expr = doubled_tree(60)
+    assert count_nodes(doubled_tree(3)) == count_nodes(parse(doubled(3)))
+    assert count_nodes(expr) == 5 * 2**60 - 4
+    optimized = Optimizer().optimize(expr)
+    assert count_nodes(optimized) == 4 * 2**60 - 3
+    assert optimized.left is optimized.right.left
+    assert loads(dumps(doubled_tree(3))) == doubled_tree(3)
+    loaded = loads(dumps(expr))
+    assert loaded.expression.left is loaded.expression.right.left
+    assert dumps(loaded) == dumps(expr)
@@ -0,0 +1,124 @@
+import io
+import random
+
+import pytest
+
+from lox.ast.printer import AstPrinter
+from lox.ast.serialize import dumps
+from lox.diagnostics import Diagnostics
+from lox.incremental import IncrementalDocument
+from lox.parser import Parser
+from lox.regex_scanner import RegexScanner
+
+PIECES = ("1", "7", ".5", " ", "\n", "x", "-", "*", "+", "(", ")", "!",
+          "==", '"s"', '"', "//c\n", "nil", "- 2", "a b")
+
+SOURCE = '(1 + 2.5 * (3 - x)) / "a\nb" // note\n- !y + (4)'
+
+
+def document(source: str) -> IncrementalDocument:
+    return IncrementalDocument(source, Diagnostics(io.StringIO()))
+
+
+def assert_matches_full_parse(doc: IncrementalDocument) -> None:
+    diagnostics = Diagnostics(io.StringIO())
+    tokens = RegexScanner(doc.source, diagnostics).scan_tokens()
+    scan_error = diagnostics.had_error
+    expr = Parser(tokens, diagnostics=diagnostics, pratt=True).parse()
+    assert tuple(doc.tokens) == tokens
+    # Dataclass equality recurses, so compare the trees' encodings.
+    if expr is None:
+        assert doc.expression is None
+    else:
+        assert dumps(doc.expression) == dumps(expr)
+    assert doc.had_error == (scan_error or expr is None)
+    assert [doc.token_offset(i) for i in range(len(tokens))] == [
+        doc.source.index(token.lexeme, doc.token_offset(i))
+        for i, token in enumerate(tokens)
+    ]
+
+
+def test_literal_edit_reparses_one_token():
+    doc = document(" + ".join(str(i) for i in range(1000)))
+    offset = doc.token_offset(1000)
+    doc.edit(offset, 1, "42")
+    assert doc.statistics.rescanned <= 2
+    assert doc.statistics.reparsed == 1
+    assert not doc.statistics.full_reparse
+    assert_matches_full_parse(doc)
+
+
+def test_operator_swap_reparses_nothing():
+    doc = document("1 + 2 * 3 - 4")
+    doc.edit(doc.token_offset(5), 1, "+")
+    assert doc.statistics.reparsed == 0
+    assert AstPrinter().visit(doc.expression) == "(+ (+ 1 (* 2 3)) 4)"
+    doc.edit(doc.token_offset(3), 1, "+")
+    assert doc.statistics.full_reparse
+    assert_matches_full_parse(doc)
+
+
+def test_edit_inside_group_reparses_the_group():
+    doc = document("1 * (2 + 3) - 4")
+    doc.edit(doc.token_offset(4), 1, "+ 5 / 6 -")
+    assert doc.statistics.reparsed == 7
+    assert AstPrinter().visit(doc.expression) == (
+        "(- (* 1 (group (- (+ 2 (/ 5 6)) 3))) 4)")
+    assert_matches_full_parse(doc)
+
+
+def test_new_line_moves_later_tokens():
+    doc = document("1 +\nx * y")
+    doc.edit(0, 0, "\n\n")
+    assert [token.line for token in doc.tokens] == [3, 3, 4, 4, 4, 4]
+    assert doc.expression.right.left.name.line == 4
+    assert_matches_full_parse(doc)
+
+
+@pytest.mark.parametrize("edit", [
+    (12, 0, '"'),
+    (1, 0, "//"),
+    (21, 1, ""),
+    (0, len(SOURCE), ""),
+])
+def test_strings_and_comments_resynchronize(edit):
+    doc = document(SOURCE)
+    doc.edit(*edit)
+    assert_matches_full_parse(doc)
+
+
+def test_expression_is_new_after_each_edit():
+    doc = document("1 + 2")
+    before = doc.expression
+    doc.edit(0, 1, "3")
+    assert doc.expression is not before
+    assert AstPrinter().visit(doc.expression) == "(+ 3 2)"
+
+
+def test_scan_errors_clear_when_edited_away():
+    doc = document("1 + @")
+    assert doc.had_error
+    doc.edit(4, 1, "2")
+    assert not doc.had_error
+    assert_matches_full_parse(doc)
+
+
+def test_edit_outside_source_is_rejected():
+    with pytest.raises(ValueError):
+        document("1").edit(1, 1, "")
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_edits_match_full_parse(seed):
+    rng = random.Random(seed)
+    doc = document(SOURCE)
+    for _ in range(100):
+        offset = rng.randint(0, len(doc.source))
+        removed = rng.randint(0, min(3, len(doc.source) - offset))
+        inserted = rng.choice(PIECES)
+        undo = (offset, len(inserted), doc.source[offset:offset + removed])
+        doc.edit(offset, removed, inserted)
+        assert_matches_full_parse(doc)
+        if doc.had_error:
+            doc.edit(*undo)
+            assert_matches_full_parse(doc)
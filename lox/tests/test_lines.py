@@ -0,0 +1,125 @@
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from lox.lines import run_lines
+from lox.session import BACKENDS
+
+LINES = [
+    "1 + 2\n",
+    "\n",
+    "// just a comment\n",
+    '"a" + "b"\n',
+    "1 +\n",
+    "-nil\n",
+    "1 2\n",
+    "@\n",
+    "10 / 4",
+]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_each_line_is_evaluated_on_its_own(backend: str):
+    output = io.StringIO()
+    statistics = run_lines(LINES, output, backend)
+    assert output.getvalue().splitlines() == [
+        "1\t3",
+        "4\tab",
+        "5\terror at end: Expect expression.",
+        "6\terror: Operand must be a number.",
+        "7\terror at '2': Expect end of expression.",
+        "8\terror: Unexpected character.",
+        "9\t2.5",
+    ]
+    assert (statistics.lines, statistics.results, statistics.errors,
+            statistics.runtime_errors) == (9, 3, 3, 1)
+    assert statistics.exit_code == 65
+
+
+def test_json_lines():
+    output = io.StringIO()
+    statistics = run_lines(["1 < 2\n", "-true\n", "3 * 4\n"], output,
+                           format="json")
+    assert [json.loads(line) for line in output.getvalue().splitlines()
+            ] == [
+                {"line": 1, "value": "True"},
+                {"line": 2, "error": "Operand must be a number."},
+                {"line": 3, "value": "12"},
+            ]
+    assert statistics.exit_code == 70
+
+
+def test_optimized_lines_match():
+    plain = io.StringIO()
+    optimized = io.StringIO()
+    run_lines(LINES, plain)
+    run_lines(LINES, optimized, optimize=True)
+    assert optimized.getvalue() == plain.getvalue()
+
+
+def test_lines_are_consumed_lazily():
+    consumed = []
+
+    def lines():
+        for number in range(3):
+            consumed.append(number)
+            yield f"{number} + 1\n"
+
+    output = io.StringIO()
+    statistics = run_lines(lines(), output)
+    assert consumed == [0, 1, 2]
+    assert output.getvalue() == "1\t1\n2\t2\n3\t3\n"
+    assert statistics.exit_code == 0
+    assert statistics.lines_per_second > 0
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_every_backend_streams_unusual_lines(backend: str):
+    deep = "-" * 50000 + "1\n"
+    output = io.StringIO()
+    statistics = run_lines(["1 / 0\n", deep, "2 + 2\n"], output, backend,
+                           optimize=True)
+    first, second, third = output.getvalue().splitlines()
+    assert first == "1\tinf"
+    assert second.startswith("2\t")
+    assert third == "3\t4"
+    assert statistics.runtime_errors == 0
+    assert statistics.results == 3
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        run_lines([], io.StringIO(), format="xml")
+
+
+def test_each_line_from_stdin():
+    result = subprocess.run(
+        [sys.executable, "-m", "lox", "--each-line", "--stats", "-"],
+        input="2 * 3\n(1\n",
+        capture_output=True,
+        text=True)
+    assert result.stdout == "1\t6\n2\terror at end: " \
+        "Expect ')' after expression.\n"
+    assert result.stderr.startswith("2 lines, 1 results, 1 errors in ")
+    assert result.returncode == 65
+
+
+def test_stdin_results_are_written_before_the_next_line():
+    process = subprocess.Popen(
+        [sys.executable, "-m", "lox", "--each-line", "-"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True)
+    try:
+        process.stdin.write("2 * 3\n")
+        process.stdin.flush()
+        assert process.stdout.readline() == "1\t6\n"
+        process.stdin.write("1 + 1\n")
+        process.stdin.close()
+        assert process.stdout.read() == "2\t2\n"
+    finally:
+        process.kill()
+        process.wait()
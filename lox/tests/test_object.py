@@ -0,0 +1,65 @@
+import pytest
+
+from lox.interpreter import Interpreter
+from lox.object import LoxObject, divide, format_number, format_value
+from lox.parser import Parser
+from lox.scanner import Scanner
+
+
+@pytest.mark.parametrize("value,text", [
+    (None, "nil"),
+    (True, "True"),
+    (3.0, "3"),
+    (2.5, "2.5"),
+    ("hi", "hi"),
+])
+def test_format_value(value: object, text: str):
+    assert format_value(value) == text
+    assert str(LoxObject(value)) == text
+
+
+@pytest.mark.parametrize("value,text", [
+    (10.05, "10.05"),
+    (100.0, "100"),
+    (-0.0, "-0"),
+    (0.5, "0.5"),
+    (1e16, "1e+16"),
+    (1e300, "1e+300"),
+    (2.5e-07, "2.5e-07"),
+    (float("inf"), "inf"),
+])
+def test_format_number(value: float, text: str):
+    assert format_number(value) == text
+    assert format_value(value) == text
+
+
+@pytest.mark.parametrize("left,right,quotient", [
+    (1.0, 4.0, 0.25),
+    (1.0, 0.0, float("inf")),
+    (-1.0, 0.0, float("-inf")),
+    (1.0, -0.0, float("-inf")),
+    (-1.0, -0.0, float("inf")),
+])
+def test_divide(left: float, right: float, quotient: float):
+    assert divide(left, right) == quotient
+
+
+def test_divide_without_a_quotient_is_nan():
+    for left in (0.0, -0.0, float("nan")):
+        quotient = divide(left, 0.0)
+        assert quotient != quotient
+
+
+def test_lox_object_is_slotted():
+    obj = LoxObject(1.0)
+    assert not hasattr(obj, "__dict__")
+    with pytest.raises(AttributeError):
+        obj.other = 2
+
+
+def test_interpreter_evaluates_to_native_values():
+    interpreter = Interpreter()
+    expr = Parser(Scanner('"a" + "b" == "ab"').scan_tokens()).parse()
+    assert interpreter._evaluate(expr) is True
+    expr = Parser(Scanner("-(1 + 2)").scan_tokens()).parse()
+    assert interpreter._evaluate(expr) == -3.0
@@ -0,0 +1,70 @@
+from pytest import mark
+
+from lox.ast.printer import AstPrinter
+from lox.optimizer import AlgebraicSimplification, ConstantFolding, GroupingElimination, Optimizer
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.tests.test_vm import EXPRESSIONS, run
+
+
+def parse(text: str):
+    return Parser(Scanner(text).scan_tokens()).parse()
+
+
+def optimized(text: str, *passes) -> str:
+    optimizer = Optimizer([pass_() for pass_ in passes] or None)
+    return AstPrinter().visit(optimizer.optimize(parse(text)))
+
+
+@mark.parametrize("text,expected", [
+    ("(1 + 2) * 3", "9"),
+    ('"a" + "b" == "ab"', "True"),
+    ("!nil", "True"),
+    ("1 + (2 * nil)", "(+ 1 (* 2 nil))"),
+    ("1 / 0", "inf"),
+    ('-(-(1 < "a"))', '(- (- (< 1 a)))'),
+])
+def test_constant_folding(text: str, expected: str):
+    assert optimized(text) == expected
+
+
+@mark.parametrize("text,expected", [
+    ("((1))", "1"),
+    ("-(1 + 2)", "(- (+ 1 2))"),
+])
+def test_grouping_elimination(text: str, expected: str):
+    assert optimized(text, GroupingElimination) == expected
+
+
+@mark.parametrize("text,expected", [
+    ("-(-(1 - nil))", "(- 1 nil)"),
+    ("!!(1 < nil)", "(< 1 nil)"),
+    ("!!nil", "(! (! nil))"),
+    ("-(-(nil))", "(- (- nil))"),
+    ("(1 * nil) * 1", "(* 1 nil)"),
+    ("1 * (1 / nil)", "(/ 1 nil)"),
+    ("(1 - nil) - 0", "(- 1 nil)"),
+    ("(1 - nil) + 0", "(+ (- 1 nil) 0)"),
+    ("nil * 1", "(* nil 1)"),
+])
+def test_algebraic_simplification(text: str, expected: str):
+    assert optimized(text, GroupingElimination,
+                     AlgebraicSimplification) == expected
+
+
+@mark.parametrize("text", EXPRESSIONS)
+def test_optimized_matches_unoptimized(capsys, text: str):
+    for backend in ("tree", "vm"):
+        expected = run(capsys, text, backend)
+        assert run(capsys, text, backend, optimize=True) == expected
+
+
+def test_reports_eliminated_nodes():
+    optimizer = Optimizer()
+    optimizer.optimize(parse("(1 + 2) * -(-(3 - nil))"))
+    assert optimizer.eliminated == {
+        "GroupingElimination": 3,
+        "ConstantFolding": 2,
+        "AlgebraicSimplification": 2,
+    }
+    assert optimizer.total_eliminated == 7
@@ -0,0 +1,101 @@
+import gc
+import io
+import weakref
+
+from pytest import raises
+
+from lox.output import BufferedOutput, _flush_open_outputs, _open_outputs
+from lox.session import LoxSession
+
+
+class CountingStream(io.BytesIO):
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data: bytes) -> int:
+        self.writes += 1
+        return super().write(data)
+
+
+def test_writes_are_batched_until_flush():
+    stream = CountingStream()
+    output = BufferedOutput(stream, flush_interval=None)
+    for i in range(100):
+        output.write(f"{i}\n")
+    assert stream.writes == 0
+    output.flush()
+    assert stream.writes == 1
+    assert stream.getvalue() == "".join(f"{i}\n" for i in range(100)).encode()
+    output.close()
+
+
+def test_flushes_when_buffer_fills():
+    stream = CountingStream()
+    output = BufferedOutput(stream, buffer_size=10, flush_interval=None)
+    output.write("12345")
+    assert stream.writes == 0
+    output.write("67890")
+    assert stream.writes == 1
+    output.close()
+
+
+def test_flushes_after_interval():
+    stream = CountingStream()
+    output = BufferedOutput(stream, flush_interval=0)
+    output.write("a")
+    output.write("b")
+    assert stream.writes == 2
+    output.close()
+
+
+def test_close_flushes_and_unregisters():
+    stream = io.BytesIO()
+    with BufferedOutput(stream, encoding="utf-16-le") as output:
+        output.write("é")
+    assert stream.getvalue() == "é".encode("utf-16-le")
+    with raises(ValueError):
+        output.write("more")
+    assert output not in _open_outputs
+
+
+def test_open_outputs_are_flushed_at_exit():
+    stream = io.BytesIO()
+    output = BufferedOutput(stream, flush_interval=None)
+    output.write("pending")
+    _flush_open_outputs()
+    assert stream.getvalue() == b"pending"
+    output.close()
+
+
+def test_dropped_outputs_are_not_kept_alive():
+    output = BufferedOutput(io.BytesIO())
+    reference = weakref.ref(output)
+    del output
+    gc.collect()
+    assert reference() is None
+
+
+def test_session_output_can_be_buffered():
+    stream = io.BytesIO()
+    session = LoxSession()
+    session.output = BufferedOutput(stream, flush_interval=None)
+    for backend in ("tree", "closure", "vm", "adaptive"):
+        session.run("10.05 * 2", backend)
+    assert stream.getvalue() == b""
+    session.output.close()
+    assert stream.getvalue() == b"20.1\n" * 4
+
+
+def test_diagnostics_flush_buffered_results_first():
+    stream = io.BytesIO()
+    errors = io.StringIO()
+    session = LoxSession(errors=errors)
+    session.output = BufferedOutput(stream, flush_interval=None)
+    session.run("1 + 2")
+    assert stream.getvalue() == b""
+    session.run("-nil")
+    assert stream.getvalue() == b"3\n"
+    assert errors.getvalue() == "Operand must be a number.\n[line 1]\n"
+    session.output.close()
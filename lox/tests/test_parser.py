@@ -1,22 +1,89 @@
-import pytest
-
-from lox import s_had_error
-from lox.ast.printer import AstPrinter
-from lox.scanner import Scanner
-from lox.parser import Parser
-
-
-@pytest.mark.parametrize("text,expected", [
-    ("1", "1"),
-    ("1 + 2", "(+ 1 2)"),
-    ("1 + 2 * 3", "(+ 1 (* 2 3))"),
-    ("(1 + 2) * 3", "(* (group (+ 1 2)) 3)"),
-])
-def test_arithmetic_expressions(text: str, expected: str):
-    scanner = Scanner(text)
-    tokens = scanner.scan_tokens()
-    parser = Parser(tokens)
-    expr = parser.parse()
-    assert not s_had_error
-    printed = AstPrinter().visit(expr)
-    assert printed == expected
+import io
+import sys
+
+import pytest
+
+from lox import s_had_error
+from lox.ast.printer import AstPrinter
+from lox.diagnostics import Diagnostics
+from lox.interpreter import Interpreter
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.token_type import TokenType
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("1", "1"),
+    ("1 + 2", "(+ 1 2)"),
+    ("1 + 2 * 3", "(+ 1 (* 2 3))"),
+    ("(1 + 2) * 3", "(* (group (+ 1 2)) 3)"),
+    ("-1 * -(2 - 3) - 4", "(- (* (- 1) (- (group (- 2 3)))) 4)"),
+    ("1 == 2 < 3 + 4 / !5", "(== 1 (< 2 (+ 3 (/ 4 (! 5)))))"),
+    ("1 / 2 + 3 < 4 != 5", "(!= (< (+ (/ 1 2) 3) 4) 5)"),
+    ('10.05 + "1.0"', "(+ 10.05 1.0)"),
+])
+@pytest.mark.parametrize("pratt", [False, True])
+def test_arithmetic_expressions(text: str, expected: str, pratt: bool):
+    scanner = Scanner(text)
+    tokens = scanner.scan_tokens()
+    parser = Parser(tokens, pratt=pratt)
+    expr = parser.parse()
+    assert not s_had_error
+    printed = AstPrinter().visit(expr)
+    assert printed == expected
+    assert expr == Parser(tokens, pratt=not pratt).parse()
+
+
+@pytest.mark.parametrize("pratt", [False, True])
+def test_parse_lazy_token_stream(pratt: bool):
+    tokens = iter(Scanner("1 + 2 * 3 4 5").scan_tokens())
+    expr = Parser(tokens, pratt=pratt).parse()
+    assert AstPrinter().visit(expr) == "(+ 1 (* 2 3))"
+    assert next(tokens).lexeme == "5"
+    assert next(tokens).type == TokenType.EOF
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("(1", "[line 1] Error at end: Expect ')' after expression."),
+    ("(1 2)", "[line 1] Error at '2': Expect ')' after expression."),
+    ("1 + * 2", "[line 1] Error at '*': Expect expression."),
+    ("-", "[line 1] Error at end: Expect expression."),
+])
+@pytest.mark.parametrize("pratt", [False, True])
+def test_parse_errors(text: str, expected: str, pratt: bool):
+    diagnostics = Diagnostics(io.StringIO())
+    assert Parser(Scanner(text).scan_tokens(),
+                  diagnostics=diagnostics,
+                  pratt=pratt).parse() is None
+    assert [str(record) for record in diagnostics.records] == [expected]
+
+
+DEPTH = 20 * sys.getrecursionlimit()
+
+
+@pytest.mark.parametrize("text,printed,value", [
+    ("-" * DEPTH + "1", "(- " * DEPTH + "1" + ")" * DEPTH, 1.0),
+    ("!" * (DEPTH + 1) + "nil", "(! " * (DEPTH + 1) + "nil" +
+     ")" * (DEPTH + 1), True),
+    ("(" * DEPTH + "2" + ")" * DEPTH, "(group " * DEPTH + "2" + ")" * DEPTH,
+     2.0),
+    ("1" + " + 1" * DEPTH, "(+ " * DEPTH + "1" + " 1)" * DEPTH, DEPTH + 1.0),
+])
+@pytest.mark.parametrize("pratt", [False, True])
+def test_deep_expressions_do_not_recurse(text: str, printed: str,
+                                         value: object, pratt: bool):
+    expr = Parser(Scanner(text).scan_tokens(), pratt=pratt).parse()
+    assert AstPrinter().visit(expr) == printed
+    assert Interpreter()._evaluate(expr) == value
+
+
+@pytest.mark.parametrize("pratt", [False, True])
+def test_parse_to_end_rejects_trailing_tokens(pratt: bool):
+    diagnostics = Diagnostics(io.StringIO())
+    tokens = Scanner("1 + 2 3").scan_tokens()
+    assert Parser(tokens, diagnostics=diagnostics,
+                  pratt=pratt).parse_to_end() is None
+    assert [str(record) for record in diagnostics.records
+            ] == ["[line 1] Error at '3': Expect end of expression."]
+    expr = Parser(tokens[:3] + tokens[-1:], pratt=pratt).parse_to_end()
+    assert AstPrinter().visit(expr) == "(+ 1 2)"
@@ -0,0 +1,95 @@
+import io
+
+from lox.diagnostics import Diagnostics
+from lox.parser import Parser
+from lox.profiler import EvaluationProfile, ProfilingInterpreter
+from lox.regex_scanner import RegexScanner
+from lox.token_type import TokenType
+
+
+def profile(text: str, **kwargs) -> tuple:
+    output = io.StringIO()
+    interpreter = ProfilingInterpreter(output=output,
+                                       diagnostics=Diagnostics(io.StringIO()),
+                                       **kwargs)
+    expr = Parser(RegexScanner(text).scan_tokens()).parse()
+    interpreter.interpret(expr)
+    return interpreter.profile, output.getvalue()
+
+
+def test_profile_counts_nodes_and_operators():
+    result, output = profile("1 + 2 * (3 - -4)")
+    assert output == "15\n"
+    assert result.by_node["BinaryExpression"].calls == 3
+    assert result.by_node["LiteralExpression"].calls == 4
+    assert result.by_node["GroupingExpression"].calls == 1
+    assert result.by_node["UnaryExpression"].calls == 1
+    assert result.by_operator[TokenType.MINUS].calls == 2
+    assert result.by_operator[TokenType.PLUS].calls == 1
+    assert TokenType.NUMBER not in result.by_operator
+
+
+def test_profile_cumulative_time_is_not_double_counted():
+    result, _ = profile("1 + 2 + 3 + 4")
+    root = result.by_operator[TokenType.PLUS]
+    assert root.calls == 3
+    assert root.cumulative_ns >= root.self_ns
+    total = sum(entry.self_ns for entry in result.by_node.values())
+    assert result.by_node["BinaryExpression"].cumulative_ns == total
+
+
+def test_profile_charges_literals_to_enclosing_line():
+    result, _ = profile("1 +\n2 *\n3")
+    assert result.by_line[1].calls == 2
+    assert result.by_line[2].calls == 3
+    assert 0 not in result.by_line
+
+
+def test_profile_records_variables_and_errors():
+    result, output = profile("answer + nil", environment={"answer": 42.0})
+    assert output == ""
+    assert result.by_node["VariableExpression"].calls == 1
+    assert result.by_operator[TokenType.PLUS].calls == 1
+
+
+def test_profile_exports_collapsed_stacks():
+    result, _ = profile("-(1)")
+    collapsed = io.StringIO()
+    result.write_collapsed(collapsed)
+    frames = [
+        line.rsplit(" ", 1)[0] for line in collapsed.getvalue().splitlines()
+    ]
+    assert frames == [
+        "UnaryExpression(-)",
+        "UnaryExpression(-);GroupingExpression",
+        "UnaryExpression(-);GroupingExpression;LiteralExpression",
+    ]
+
+
+def test_profile_table_lists_each_section():
+    result, _ = profile("1 == 2")
+    table = io.StringIO()
+    result.print_table(table)
+    text = table.getvalue()
+    assert "BinaryExpression" in text
+    assert "EQUAL_EQUAL" in text
+    assert "line" in text
+
+
+def test_empty_profile_writes_nothing():
+    collapsed = io.StringIO()
+    EvaluationProfile().write_collapsed(collapsed)
+    assert collapsed.getvalue() == ""
+
+
+def test_deep_expressions_are_still_evaluated():
+    result, output = profile("-" * 20000 + "(1 + 2)")
+    assert output == "3\n"
+    assert result.by_node["UnaryExpression"].calls == 20000
+
+
+def test_wide_sums_are_profiled():
+    result, output = profile(" + ".join(["1"] * 5000))
+    assert output == "5000\n"
+    assert result.by_operator[TokenType.PLUS].calls == 4999
+    assert result.by_node["LiteralExpression"].calls == 5000
@@ -0,0 +1,68 @@
+import io
+import mmap
+
+from pytest import mark
+
+import lox
+from lox.regex_scanner import RegexScanner, stream_tokens
+from lox.scanner import Scanner
+
+SOURCES = [
+    "",
+    "1 + 2 * (3 - 4) / 5",
+    "1.5 123. .5 1.2.3",
+    "!= == <= >= ! = < > // comment\n/ / /",
+    "and class else false for fun if nil or print return super this true var while",
+    "foo _bar baz123 whiles classy",
+    '"multi\nline\nstring" + "x"\n1',
+    "// only a comment",
+    "a\r\n\tb\n\n\nc",
+    "{ } , . ; - +",
+]
+
+ERROR_SOURCES = [
+    '"unterminated\nstring',
+    "1 @ 2\n# $",
+    "é",
+]
+
+
+def scan(scanner_class, text: str, capsys):
+    lox.s_had_error = False
+    tokens = scanner_class(text).scan_tokens()
+    return tokens, capsys.readouterr().err, lox.s_had_error
+
+
+@mark.parametrize("text", SOURCES + ERROR_SOURCES)
+def test_regex_scanner_matches_scanner(capsys, text: str):
+    assert scan(RegexScanner, text, capsys) == scan(Scanner, text, capsys)
+
+
+@mark.parametrize("text", ERROR_SOURCES)
+def test_regex_scanner_reports_errors(capsys, text: str):
+    _, err, had_error = scan(RegexScanner, text, capsys)
+    assert had_error
+    assert err.startswith("[line ")
+
+
+def stream(file, chunk_size: int, capsys):
+    lox.s_had_error = False
+    tokens = tuple(stream_tokens(file, chunk_size))
+    return tokens, capsys.readouterr().err, lox.s_had_error
+
+
+@mark.parametrize("chunk_size", [1, 2, 3, 7, 4096])
+@mark.parametrize("text", SOURCES + ERROR_SOURCES)
+def test_stream_tokens_matches_scanner(capsys, text: str, chunk_size: int):
+    expected = scan(RegexScanner, text, capsys)
+    assert stream(io.StringIO(text), chunk_size, capsys) == expected
+    assert stream(io.BytesIO(text.encode()), chunk_size, capsys) == expected
+
+
+def test_stream_tokens_from_mmap(capsys, tmp_path):
+    text = "1.5 + 2 // comment\n* \"é\" != nil"
+    path = tmp_path / "script.lox"
+    path.write_bytes(text.encode())
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0,
+                                             access=mmap.ACCESS_READ) as mm:
+        assert stream(mm, 3, capsys) == scan(RegexScanner, text, capsys)
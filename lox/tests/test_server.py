@@ -0,0 +1,155 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from lox.server import LoxServer, evaluate_request
+
+
+def test_evaluate_request_structures_diagnostics():
+    assert evaluate_request("1 + 2") == {
+        "output": "3\n",
+        "diagnostics": [],
+        "exit_code": 0,
+    }
+    response = evaluate_request("1 +\n", "vm")
+    assert response["exit_code"] == 65
+    assert response["diagnostics"] == [{
+        "line": 2,
+        "where": " at end",
+        "message": "Expect expression.",
+        "runtime": False,
+    }]
+
+
+async def exchange(requests, **server_options):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        server = LoxServer(executor, **server_options)
+        listener = await server.start_tcp("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for request in requests:
+                line = request if isinstance(request, str) else json.dumps(request)
+                writer.write(line.encode() + b"\n")
+            await writer.drain()
+            writer.write_eof()
+            responses = []
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                responses.append(json.loads(line))
+            writer.close()
+        return {response["id"]: response for response in responses}
+
+
+def test_pipelined_requests():
+    responses = asyncio.run(
+        exchange([{
+            "id": i,
+            "source": f"{i} * 2",
+            "backend": ("tree", "closure", "vm")[i % 3],
+        } for i in range(20)],
+                 max_pending=4))
+    assert len(responses) == 20
+    for i, response in responses.items():
+        assert response["output"] == f"{i * 2}\n"
+        assert response["exit_code"] == 0
+        assert 0 <= response["queue_depth"] <= 4
+
+
+def test_runtime_error_is_structured():
+    responses = asyncio.run(exchange([{"id": "a", "source": '"a" + 1'}]))
+    assert responses["a"]["exit_code"] == 70
+    assert responses["a"]["diagnostics"] == [{
+        "line": 1,
+        "where": "",
+        "message": "Operands must be two numbers or two strings.",
+        "runtime": True,
+    }]
+
+
+def test_bad_requests():
+    responses = asyncio.run(
+        exchange([
+            "not json",
+            {"id": 1},
+            {"id": 2, "source": "1", "backend": "jit"},
+        ]))
+    assert responses[None]["error"].startswith("invalid request")
+    assert "source" in responses[1]["error"]
+    assert "jit" in responses[2]["error"]
+
+
+def test_stats_and_timeout():
+    slow = " + ".join(["1"] * 100000)
+    responses = asyncio.run(
+        exchange([{"id": "s", "op": "stats"}, {"id": "t", "source": slow, "timeout": 1e-3}],
+                 max_pending=8))
+    assert responses["s"]["max_pending"] == 8
+    assert responses["t"]["error"] == "timeout"
+
+
+def test_invalid_timeouts_are_rejected():
+    responses = asyncio.run(
+        exchange([{"id": i, "source": "1", "timeout": timeout}
+                  for i, timeout in enumerate([0, -1, "1", True])]))
+    for response in responses.values():
+        assert "timeout" in response["error"]
+        assert response["error"].startswith("invalid request")
+
+
+def test_failed_evaluation_still_gets_a_response():
+    responses = asyncio.run(
+        exchange([{"id": "z", "source": "1 / 0 + nil"},
+                  {"id": "ok", "source": "2"}],
+                 max_pending=1))
+    assert responses["z"]["exit_code"] == 70
+    assert responses["ok"]["output"] == "2\n"
+
+
+def test_timed_out_job_keeps_its_slot():
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            server = LoxServer(executor, max_pending=1)
+            listener = await server.start_tcp("127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            async with listener:
+                reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", port)
+                request = {"source": " + ".join(["1"] * 100000),
+                           "timeout": 1e-3}
+                writer.write(json.dumps(request).encode() + b"\n")
+                response = json.loads(await reader.readline())
+                assert response["error"] == "timeout"
+                assert server.queue_depth == 1
+                while server.queue_depth:
+                    await asyncio.sleep(0.01)
+                writer.write(b'{"source": "3"}\n')
+                response = json.loads(await reader.readline())
+                assert response["output"] == "3\n"
+                writer.close()
+
+    asyncio.run(run())
+
+
+def test_idle_connection_holds_no_slot():
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            server = LoxServer(executor, max_pending=1)
+            listener = await server.start_tcp("127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            async with listener:
+                _, idle = await asyncio.open_connection("127.0.0.1", port)
+                reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", port)
+                writer.write(b'{"id": 1, "source": "1 + 1"}\n')
+                response = json.loads(await asyncio.wait_for(
+                    reader.readline(), 5))
+                assert response["output"] == "2\n"
+                writer.close()
+                idle.close()
+
+    asyncio.run(run())
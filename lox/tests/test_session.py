@@ -0,0 +1,118 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from pytest import mark, raises
+
+import lox
+from lox.diagnostics import RECORD_LIMIT, Diagnostic
+from lox.session import LoxSession
+
+
+def session_run(text: str, backend: str = "tree"):
+    output = io.StringIO()
+    errors = io.StringIO()
+    session = LoxSession(backend, output=output, errors=errors)
+    session.run(text)
+    return output.getvalue(), errors.getvalue(), session.exit_code
+
+
+def test_session_output_and_exit_code():
+    assert session_run("1 + 2") == ("3\n", "", 0)
+    assert session_run('"a" + 1') == (
+        "", "Operands must be two numbers or two strings.\n[line 1]\n", 70)
+    assert session_run("1 +") == (
+        "", "[line 1] Error at end: Expect expression.\n", 65)
+    assert session_run("1 @") == (
+        "", "[line 1] Error: Unexpected character.\n", 65)
+
+
+def test_session_does_not_touch_globals():
+    lox.s_had_error = False
+    lox.s_had_runtime_error = False
+    session_run("1 + @")
+    session_run("-nil")
+    assert not lox.s_had_error
+    assert not lox.s_had_runtime_error
+
+
+def test_session_records_diagnostics():
+    session = LoxSession(errors=io.StringIO())
+    session.run("1 +\n")
+    assert session.diagnostics.records == [
+        Diagnostic(2, " at end", "Expect expression.")
+    ]
+    session.diagnostics.reset()
+    assert session.exit_code == 0
+
+
+def test_session_environment():
+    output = io.StringIO()
+    session = LoxSession("vm", output=output, environment={"x": 2.0})
+    session.run("x * 3")
+    assert output.getvalue() == "6\n"
+
+
+
+@mark.parametrize("backend", ["tree", "closure", "vm", "adaptive"])
+@mark.parametrize("optimize", [False, True])
+def test_deep_expressions_on_every_backend(backend: str, optimize: bool):
+    session = LoxSession(backend,
+                         optimize,
+                         output=io.StringIO(),
+                         errors=io.StringIO())
+    session.run("-" * 20000 + "(" * 5000 + "1 + 2" + ")" * 5000)
+    session.run("!" * 20001 + "nil")
+    session.run("-" * 20000 + "nil")
+    assert session.output.getvalue() == "3\nTrue\n"
+    assert session.diagnostics.records == [
+        Diagnostic(1, "", "Operand must be a number.", runtime=True)
+    ]
+
+
+@mark.parametrize("backend", ["tree", "closure", "vm", "adaptive"])
+@mark.parametrize("optimize", [False, True])
+def test_wide_sums_on_every_backend(backend: str, optimize: bool):
+    output = io.StringIO()
+    session = LoxSession(backend, optimize, output=output)
+    for _ in range(3):
+        session.run(" + ".join(["1"] * 5000))
+        session.run(" - ".join(["(1 * 2)"] * 2000))
+    assert output.getvalue() == "5000\n-3996\n" * 3
+    assert session.exit_code == 0
+
+
+@mark.parametrize("backend", ["tree", "closure", "vm", "adaptive"])
+@mark.parametrize("optimize", [False, True])
+def test_division_by_zero_on_every_backend(backend: str, optimize: bool):
+    output = io.StringIO()
+    session = LoxSession(backend, optimize, output=output)
+    for text in ("1 / 0", "-1 / 0", "1 / -0", "0 / 0 == 0 / 0"):
+        session.run(text)
+    assert output.getvalue() == "inf\n-inf\n-inf\nFalse\n"
+    assert session.exit_code == 0
+
+
+def test_unknown_backend():
+    with raises(ValueError):
+        LoxSession("jit")
+    session = LoxSession(output=io.StringIO())
+    with raises(ValueError):
+        session.run("1 + 2", backend="jit")
+    assert session.output.getvalue() == ""
+
+
+def test_recorded_diagnostics_are_capped():
+    session = LoxSession(output=io.StringIO(), errors=io.StringIO())
+    for line in range(1, RECORD_LIMIT + 11):
+        session.run("\n" * (line - 1) + "-nil")
+    records = session.diagnostics.records
+    assert len(records) == RECORD_LIMIT
+    assert records[0].line == 11
+    assert records[-1].line == RECORD_LIMIT + 10
+
+
+def test_concurrent_sessions():
+    programs = ["1 + 2", '"a" + 1', "1 +", "-nil", '"x" + "y"'] * 40
+    expected = [session_run(text) for text in programs]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(session_run, programs)) == expected
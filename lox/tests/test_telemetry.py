@@ -0,0 +1,114 @@
+import io
+import json
+import subprocess
+import sys
+import tracemalloc
+
+from lox.cache import CompileCache
+from lox.session import LoxSession
+from lox.telemetry import RunTelemetry, Telemetry, json_lines_sink
+
+
+def measured_session(memory: bool = True, **kwargs):
+    records = []
+    session = LoxSession(output=io.StringIO(),
+                         errors=io.StringIO(),
+                         telemetry=Telemetry(records.append, memory),
+                         **kwargs)
+    return session, records
+
+
+def test_run_records_each_phase():
+    session, records = measured_session()
+    session.run("1 + 2 * (3 - 4)")
+    assert session.interpreter._output.getvalue() == "-1\n"
+    [record] = records
+    assert record.source == "<string>"
+    assert record.characters == 15
+    assert record.tokens == 10
+    assert record.nodes == 8
+    assert record.exit_code == 0
+    assert list(record.phases) == ["scan", "parse", "evaluate"]
+    for phase in record.phases.values():
+        assert phase.wall_seconds >= 0
+        assert phase.cpu_seconds >= 0
+        assert phase.peak_bytes >= phase.allocated_bytes
+    assert not tracemalloc.is_tracing()
+
+
+def test_optimize_is_its_own_phase():
+    session, records = measured_session(optimize=True)
+    session.run("1 + 2")
+    assert list(records[0].phases) == ["scan", "parse", "optimize", "evaluate"]
+    assert records[0].nodes == 3
+
+
+def test_errors_are_recorded():
+    session, records = measured_session()
+    session.run("1 +")
+    session.diagnostics.reset()
+    session.run("-nil")
+    assert [record.exit_code for record in records] == [65, 70]
+    assert list(records[0].phases) == ["scan", "parse"]
+    assert records[1].phases["evaluate"]
+
+
+
+def test_deep_expressions_are_counted():
+    session, records = measured_session(memory=False)
+    session.run("-" * 20000 + "1")
+    assert records[0].nodes == 20001
+    assert records[0].exit_code == 0
+
+def test_memory_tracing_can_be_disabled():
+    session, records = measured_session(memory=False)
+    session.run('"a" + "b"')
+    phase = records[0].phases["scan"]
+    assert phase.allocated_bytes is None
+    assert phase.peak_bytes is None
+
+
+def test_run_file_uses_cache(tmp_path):
+    script = tmp_path / "script.lox"
+    script.write_text("2 * 3")
+    cache = CompileCache(tmp_path / "cache")
+    session, records = measured_session()
+    assert session.run_file(str(script), cache=cache) == 0
+    assert session.run_file(str(script), cache=cache) == 0
+    assert list(records[0].phases) == [
+        "load", "scan", "parse", "store", "evaluate"
+    ]
+    assert list(records[1].phases) == ["load", "evaluate"]
+    assert records[1].nodes == 3
+    assert records[0].source == str(script)
+
+
+def test_json_lines_sink():
+    stream = io.StringIO()
+    record = RunTelemetry("<string>", tokens=4)
+    json_lines_sink(stream)(record)
+    assert json.loads(stream.getvalue()) == record.to_dict()
+
+
+def test_cli_appends_records_to_file(tmp_path):
+    script = tmp_path / "script.lox"
+    script.write_text("1 + 2\n")
+    records = tmp_path / "telemetry.jsonl"
+    command = [sys.executable, "-m", "lox", "--telemetry", str(records)]
+    for _ in range(2):
+        subprocess.run(command + [str(script)],
+                       capture_output=True,
+                       check=True)
+    lines = records.read_text().splitlines()
+    assert [json.loads(line)["source"] for line in lines] == [str(script)] * 2
+
+
+def test_cli_rejects_telemetry_for_several_scripts(tmp_path):
+    script = tmp_path / "script.lox"
+    script.write_text("1\n")
+    command = [sys.executable, "-m", "lox", "--telemetry", "-"]
+    result = subprocess.run(command + [str(script), str(script)],
+                            capture_output=True,
+                            text=True)
+    assert result.returncode == 64
+    assert "telemetry needs at most one script" in result.stderr
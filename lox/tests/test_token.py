@@ -1,10 +1,19 @@
-import pytest
-
-from lox.token_type import TokenType
-from lox.token import Token
-
-
-@pytest.mark.parametrize("type", TokenType)
-def test_string(type: TokenType):
-    tok = Token(type, "blah", 3, 123)
-    assert str(tok) == f"{type} blah 3"
+import pytest
+
+from lox.token_type import TokenType
+from lox.token import Token
+
+
+@pytest.mark.parametrize("type", TokenType)
+def test_string(type: TokenType):
+    tok = Token(type, "blah", 3, 123)
+    assert str(tok) == f"{type} blah 3"
+
+
+def test_string_formats_literals():
+    assert str(Token(TokenType.NUMBER, "10.05", 10.05, 1)) == (
+        "NUMBER 10.05 10.05")
+    assert str(Token(TokenType.NUMBER, "7.0", 7.0, 1)) == (
+        "NUMBER 7.0 7")
+    assert str(Token(TokenType.STRING, '"1.05"', "1.05", 1)) == (
+        'STRING "1.05" 1.05')
@@ -0,0 +1,37 @@
+from pytest import mark
+
+from lox.ast.printer import AstPrinter
+from lox.parser import Parser
+from lox.regex_scanner import RegexScanner
+from lox.tests.test_regex_scanner import ERROR_SOURCES, SOURCES
+from lox.token_type import TokenType
+
+
+@mark.parametrize("text", SOURCES + ERROR_SOURCES)
+def test_buffer_matches_tokens(capsys, text: str):
+    buffer = RegexScanner(text).scan_buffer()
+    tokens = RegexScanner(text).scan_tokens()
+    assert len(buffer) == len(tokens)
+    assert tuple(buffer) == tokens
+    assert buffer[:] == tokens
+
+
+def test_lazy_accessors():
+    buffer = RegexScanner('foo "bar"\n1.5').scan_buffer()
+    assert buffer.type(0) == TokenType.IDENTIFIER
+    assert buffer.lexeme(1) == '"bar"'
+    assert buffer.literal(1) == "bar"
+    assert buffer.literal(2) == 1.5
+    assert buffer.line(2) == 2
+    assert buffer[-1].type == TokenType.EOF
+
+
+def test_parse_buffer():
+    buffer = RegexScanner("(1 + 2) * 3").scan_buffer()
+    expr = Parser(buffer).parse()
+    assert AstPrinter().visit(expr) == "(* (group (+ 1 2)) 3)"
+
+
+def test_buffer_is_compact():
+    buffer = RegexScanner("1 + 2 * 3 - 4").scan_buffer()
+    assert buffer.nbytes <= 13 * len(buffer)
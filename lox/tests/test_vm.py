@@ -0,0 +1,59 @@
+from pytest import mark
+
+import lox
+from lox.compiler import Compiler
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.vm import VM
+
+EXPRESSIONS = [
+    "1",
+    "1 + 2 * 3",
+    "(1 + 2) * 3 / 4 - 5",
+    "-(-3)",
+    "!true",
+    "!nil",
+    '"foo" + "bar"',
+    "1 < 2",
+    "2 <= 2",
+    "3 > 4",
+    "3 >= 4",
+    "1 == 1",
+    '"a" != "a"',
+    "nil == false",
+    '"a" + 1',
+    '-"a"',
+    "1 < true",
+    "1 +\n2 * nil",
+    "1 + foo",
+    "1 / 0",
+    "-1 / 0 < 0 / 0",
+    "1 / -0 == -1 / 0",
+]
+
+
+def run(capsys, text: str, backend: str, optimize: bool = False):
+    lox.s_had_error = False
+    lox.s_had_runtime_error = False
+    lox.run(text, backend, optimize)
+    captured = capsys.readouterr()
+    return captured.out, captured.err, lox.s_had_runtime_error
+
+
+@mark.parametrize("text", EXPRESSIONS)
+def test_vm_matches_interpreter(capsys, text: str):
+    assert run(capsys, text, "vm") == run(capsys, text, "tree")
+
+
+def test_runtime_error_line(capsys):
+    out, err, had_runtime_error = run(capsys, "1 +\n2 * nil", "vm")
+    assert out == ""
+    assert err == "Operands must be numbers.\n[line 2]\n"
+    assert had_runtime_error
+
+
+def test_constant_pool():
+    chunk = Compiler().compile(Parser(Scanner("1 + 1 + 2").scan_tokens()).parse())
+    assert chunk.constants == [1.0, 1.0, 2.0]
+    assert len(chunk.code) == 5
+    assert VM().run(chunk) == 4.0
@@ -0,0 +1,83 @@
+from array import array
+from typing import Any, Iterator, Sequence, Union, overload
+
+from lox.token import Token
+from lox.token_type import TokenType
+
+TOKEN_TYPES = {type.value: type for type in TokenType}
+
+# 32-bit offsets and lines cover any source shorter than 4 GiB.
+SMALL_SOURCE_LIMIT = 1 << 32
+
+
+class TokenBuffer(Sequence[Token]):
+    """Tokens stored as parallel arrays of kind codes, offsets and lines.
+
+    Lexemes and literals are sliced out of the source only when a token
+    is looked at, and indexing builds a Token on the fly.
+    """
+    source: str
+    kinds: array
+    starts: array
+    ends: array
+    lines: array
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        offset_type = "I" if len(source) < SMALL_SOURCE_LIMIT else "Q"
+        self.kinds = array("B")
+        self.starts = array(offset_type)
+        self.ends = array(offset_type)
+        self.lines = array(offset_type)
+
+    def append(self, type: TokenType, start: int, end: int, line: int) -> None:
+        self.kinds.append(type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def type(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.kinds[index]]
+
+    def lexeme(self, index: int) -> str:
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def literal(self, index: int) -> Any:
+        kind = self.kinds[index]
+        if kind == TokenType.NUMBER.value:
+            return float(self.lexeme(index))
+        if kind == TokenType.STRING.value:
+            return self.source[self.starts[index] + 1:self.ends[index] - 1]
+        return None
+
+    def line(self, index: int) -> int:
+        return self.lines[index]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            buffer.itemsize * len(buffer)
+            for buffer in (self.kinds, self.starts, self.ends, self.lines))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @overload
+    def __getitem__(self, index: int) -> Token:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[Token]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        return Token(self.type(index), self.lexeme(index), self.literal(index),
+                     self.lines[index])
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self)):
+            yield self[index]
@@ -0,0 +1,115 @@
+import sys
+from typing import Dict, List, Optional, TextIO
+
+from lox.chunk import Chunk, OPCODE_BITS, OPCODE_MASK, OpCode
+from lox.diagnostics import GLOBAL_DIAGNOSTICS, Diagnostics
+from lox.object import divide, format_value, is_truthy
+from lox.runtime_error import LoxRuntimeError
+
+CONSTANT = OpCode.CONSTANT.value
+ADD = OpCode.ADD.value
+SUBTRACT = OpCode.SUBTRACT.value
+MULTIPLY = OpCode.MULTIPLY.value
+DIVIDE = OpCode.DIVIDE.value
+NEGATE = OpCode.NEGATE.value
+NOT = OpCode.NOT.value
+EQUAL = OpCode.EQUAL.value
+NOT_EQUAL = OpCode.NOT_EQUAL.value
+GREATER = OpCode.GREATER.value
+GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+LESS = OpCode.LESS.value
+LESS_EQUAL = OpCode.LESS_EQUAL.value
+GET_VARIABLE = OpCode.GET_VARIABLE.value
+
+
+class VM:
+    environment: Dict[str, object]
+    _diagnostics: Diagnostics
+    _output: Optional[TextIO]
+
+    def __init__(self,
+                 environment: Optional[Dict[str, object]] = None,
+                 diagnostics: Optional[Diagnostics] = None,
+                 output: Optional[TextIO] = None):
+        self.environment = environment if environment is not None else {}
+        self._diagnostics = (diagnostics if diagnostics is not None else
+                             GLOBAL_DIAGNOSTICS)
+        self._output = output
+
+    def interpret(self, chunk: Chunk) -> None:
+        try:
+            value = self.run(chunk)
+            output = self._output if self._output is not None else sys.stdout
+            output.write(format_value(value) + "\n")
+        except LoxRuntimeError as e:
+            self._diagnostics.runtime_error(e)
+
+    def run(self, chunk: Chunk) -> Optional[object]:
+        constants = chunk.constants
+        stack: List[Optional[object]] = []
+        push = stack.append
+        pop = stack.pop
+
+        for instruction in chunk.code:
+            op = instruction & OPCODE_MASK
+            if op == CONSTANT:
+                push(constants[instruction >> OPCODE_BITS])
+                continue
+
+            if op == GET_VARIABLE:
+                name = chunk.tokens[instruction >> OPCODE_BITS]
+                try:
+                    push(self.environment[name.lexeme])
+                except KeyError:
+                    raise LoxRuntimeError(
+                        name, f"Undefined variable '{name.lexeme}'.")
+                continue
+            if op == NEGATE:
+                right = stack[-1]
+                if type(right) is not float:
+                    raise LoxRuntimeError(chunk.tokens[instruction >> OPCODE_BITS],
+                                          "Operand must be a number.")
+                stack[-1] = -right
+                continue
+            if op == NOT:
+                stack[-1] = not is_truthy(stack[-1])
+                continue
+
+            right = pop()
+            left = stack[-1]
+            if op == ADD:
+                if type(left) is float and type(right) is float or type(
+                        left) is str and type(right) is str:
+                    stack[-1] = left + right
+                    continue
+                raise LoxRuntimeError(
+                    chunk.tokens[instruction >> OPCODE_BITS],
+                    "Operands must be two numbers or two strings.")
+            if op == EQUAL:
+                stack[-1] = left == right
+                continue
+            if op == NOT_EQUAL:
+                stack[-1] = left != right
+                continue
+
+            if type(left) is not float or type(right) is not float:
+                raise LoxRuntimeError(chunk.tokens[instruction >> OPCODE_BITS],
+                                      "Operands must be numbers.")
+            if op == SUBTRACT:
+                stack[-1] = left - right
+            elif op == MULTIPLY:
+                stack[-1] = left * right
+            elif op == DIVIDE:
+                stack[-1] = left / right if right else divide(left, right)
+            elif op == GREATER:
+                stack[-1] = left > right
+            elif op == GREATER_EQUAL:
+                stack[-1] = left >= right
+            elif op == LESS:
+                stack[-1] = left < right
+            elif op == LESS_EQUAL:
+                stack[-1] = left <= right
+            else:
+                raise RuntimeError("this was supposed to be unreachable")
+
+        return stack[-1]
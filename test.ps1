@@ -1 +1 @@
-pytest -n auto --picked
+pytest -n auto --picked